@@ -1,46 +1,61 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-
-from ..auth import create_access_token, get_password_hash, verify_password
-from ..db import get_db
+from sqlalchemy import select
+
+from ..auth import (
+    create_access_token,
+    hash_password_async,
+    verify_and_update_password_async,
+)
+from ..db import get_async_db
 from ..models import User
-from ..deps import get_current_user
+from ..deps import get_current_user_cached
 from ..schemas import Token, UserCreate, UserResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=Token)
-def register(user: UserCreate, db: Session = Depends(get_db)) -> Token:
-    existing = db.query(User).filter(User.email == user.email).first()
+async def register(user: UserCreate, db=Depends(get_async_db)) -> Token:
+    existing = await db.scalar(select(User.id).where(User.email == user.email))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    new_user = User(email=user.email, password_hash=get_password_hash(user.password))
+    password_hash = await hash_password_async(user.password)
+    new_user = User(email=user.email, password_hash=password_hash)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     token = create_access_token(new_user.id)
     return Token(access_token=token)
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
 ) -> Token:
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await verify_and_update_password_async(
+            form_data.password, user.password_hash
+        )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
+    if new_hash:
+        # Parametros de Argon2 cambiados (o hash bcrypt viejo): se migra en el login.
+        user.password_hash = new_hash
+        await db.commit()
 
     token = create_access_token(user.id)
     return Token(access_token=token)
 
 
 @router.get("/me", response_model=UserResponse)
-def me(user=Depends(get_current_user)) -> UserResponse:
+def me(user=Depends(get_current_user_cached)) -> UserResponse:
     return UserResponse(id=user.id, email=user.email)
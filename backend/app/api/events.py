@@ -1,49 +1,58 @@
 import asyncio
 import json
-from datetime import datetime, timezone
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 
-from ..db import SessionLocal, get_db
-from ..deps import get_current_user, get_user_id_from_token
-from ..models import AudioSubmission, Event, User
+from ..db import async_session_scope, get_async_db
+from ..deps import get_current_user_id, get_user_id_from_token
+from ..event_bus import event_bus
+from ..event_log import (
+    latest_stream_id,
+    parse_stream_id,
+    read_event_log,
+    stream_id_to_datetime,
+)
+from ..events import serialize_event
+from ..models import AudioSubmission, Event
 from ..schemas import EventResponse
+from ..settings import settings
 
 router = APIRouter(prefix="/events", tags=["events"])
 
 
 @router.get("", response_model=List[EventResponse])
-def list_events(
+async def list_events(
     submission_id: Optional[str] = None,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db=Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id),
 ) -> List[EventResponse]:
-    query = db.query(Event)
+    stmt = select(Event).where(Event.timestamp >= _retention_cutoff())
 
     if submission_id:
-        submission = (
-            db.query(AudioSubmission)
-            .filter(AudioSubmission.id == submission_id, AudioSubmission.user_id == user.id)
-            .first()
+        owned = await db.scalar(
+            select(AudioSubmission.id).where(
+                AudioSubmission.id == submission_id, AudioSubmission.user_id == user_id
+            )
         )
-        if not submission:
+        if not owned:
             raise HTTPException(status_code=404, detail="Submission not found")
-        query = query.filter(Event.submission_id == submission_id)
+        stmt = stmt.where(Event.submission_id == submission_id)
     else:
-        submission_ids = (
-            db.query(AudioSubmission.id)
-            .filter(AudioSubmission.user_id == user.id)
-            .all()
+        result = await db.execute(
+            select(AudioSubmission.id).where(AudioSubmission.user_id == user_id)
         )
-        ids = [item[0] for item in submission_ids]
+        ids = list(result.scalars().all())
         if not ids:
             return []
-        query = query.filter(Event.submission_id.in_(ids))
+        stmt = stmt.where(Event.submission_id.in_(ids))
 
-    events = query.order_by(Event.timestamp.desc()).limit(100).all()
+    result = await db.execute(stmt.order_by(Event.timestamp.desc()).limit(100))
+    events = result.scalars().all()
     return [
         EventResponse(
             id=e.id,
@@ -56,53 +65,158 @@ def list_events(
     ]
 
 
+async def _authorize_stream(user_id: str, submission_id: Optional[str]) -> None:
+    # El usuario sale del token firmado; solo se valida la submission pedida.
+    if not submission_id:
+        return
+    async with async_session_scope() as db:
+        owned = await db.scalar(
+            select(AudioSubmission.id).where(
+                AudioSubmission.id == submission_id,
+                AudioSubmission.user_id == user_id,
+            )
+        )
+    if not owned:
+        raise HTTPException(status_code=404, detail="Submission not found")
+
+
+def _event_to_payload(event: Event) -> dict:
+    return serialize_event(
+        event.id,
+        event.event_name,
+        event.submission_id,
+        event.timestamp,
+        _sanitize_payload(event.payload),
+    )
+
+
 @router.get("/stream")
 async def stream_events(
     token: str = Query(..., description="Access token for SSE auth"),
     submission_id: Optional[str] = None,
     since: Optional[str] = None,
+    last_event_id: Optional[str] = Header(default=None),
 ) -> StreamingResponse:
     user_id = get_user_id_from_token(token)
-
-    with SessionLocal() as db:
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
-        if submission_id:
-            submission = (
-                db.query(AudioSubmission)
-                .filter(
-                    AudioSubmission.id == submission_id,
-                    AudioSubmission.user_id == user_id,
-                )
-                .first()
-            )
-            if not submission:
-                raise HTTPException(status_code=404, detail="Submission not found")
-
+    await _authorize_stream(user_id, submission_id)
     since_dt = _parse_since(since)
 
+    def _matches(message: dict) -> bool:
+        return not submission_id or message.get("submission_id") == submission_id
+
     async def event_stream():
+        # Suscribirse antes de leer el log/DB: lo que llegue en el medio se deduplica.
+        queue = event_bus.subscribe(user_id)
         last_seen = since_dt or datetime.utcnow()
-        yield "retry: 2000\n\n"
-        while True:
-            events = _fetch_events(user_id, submission_id, last_seen)
-            for event in events:
-                last_seen = max(last_seen, event.timestamp)
-                payload = {
-                    "id": event.id,
-                    "event_name": event.event_name,
-                    "submission_id": event.submission_id,
-                    "timestamp": event.timestamp.isoformat(),
-                    "payload": _sanitize_payload(event.payload),
-                }
-                yield _format_sse(payload, event.id)
-            yield ": keepalive\n\n"
-            await asyncio.sleep(2)
+        delivered: set[str] = set()
+        cursor: Optional[Tuple[int, int]] = None
+        try:
+            yield "retry: 2000\n\n"
+            polling = since_dt is not None
+
+            if parse_stream_id(last_event_id):
+                # Reconexion de EventSource: replay desde el Redis Stream, sin Postgres.
+                replay = await run_in_threadpool(read_event_log, user_id, last_event_id)
+                if replay is None:
+                    last_seen = stream_id_to_datetime(last_event_id)
+                    polling = True
+                else:
+                    # Replay completo: el "since" de la URL original ya no aplica y no
+                    # se consulta la DB (solo si el log fue recortado o sin Stream id).
+                    polling = False
+                    last_seen = stream_id_to_datetime(last_event_id)
+                    cursor = parse_stream_id(last_event_id)
+                    for message in replay:
+                        cursor = parse_stream_id(message["stream_id"])
+                        delivered.add(message.get("id"))
+                        if _matches(message):
+                            yield _format_message(message)
+            elif last_event_id:
+                # Id de la DB (modo polling sin Redis): se reanuda por su timestamp.
+                resumed_at = await _event_timestamp(last_event_id)
+                if resumed_at:
+                    last_seen = resumed_at
+                    polling = True
+
+            if cursor is None:
+                tail = await run_in_threadpool(latest_stream_id, user_id)
+                cursor = parse_stream_id(tail)
+            else:
+                tail = None
+
+            while True:
+                if polling or not event_bus.connected:
+                    # Catch-up al conectar, o polling si Redis no esta disponible.
+                    events = await _fetch_events(user_id, submission_id, last_seen)
+                    for event in events:
+                        last_seen = max(last_seen, event.timestamp)
+                        if event.id in delivered:
+                            continue
+                        delivered.add(event.id)
+                        yield _format_sse(
+                            _event_to_payload(event), None if tail else event.id
+                        )
+                    if tail:
+                        # Solo id: el proximo Last-Event-ID apunta al Stream.
+                        yield f"id: {tail}\n\n"
+                        tail = None
+                    polling = False
+                    if not event_bus.connected:
+                        yield ": keepalive\n\n"
+                        await asyncio.sleep(2)
+                        # Al reconectar el bus se vuelve a consultar una vez la DB.
+                        polling = event_bus.connected
+                    continue
+
+                if tail:
+                    yield f"id: {tail}\n\n"
+                    tail = None
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=settings.event_keepalive_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                stream_id = parse_stream_id(message.get("stream_id"))
+                if stream_id and cursor and stream_id <= cursor:
+                    continue
+                if stream_id:
+                    cursor = stream_id
+                if message.get("id") in delivered or not _matches(message):
+                    continue
+                try:
+                    last_seen = max(
+                        last_seen, datetime.fromisoformat(message["timestamp"])
+                    )
+                except (KeyError, TypeError, ValueError):
+                    pass
+                yield _format_message(message)
+        finally:
+            event_bus.unsubscribe(user_id, queue)
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
+def _format_message(message: dict) -> str:
+    stream_id = message.pop("stream_id", None)
+    message["payload"] = _sanitize_payload(message.get("payload"))
+    return _format_sse(message, stream_id or message.get("id"))
+
+
+async def _event_timestamp(event_id: str) -> Optional[datetime]:
+    async with async_session_scope() as db:
+        return await db.scalar(
+            select(Event.timestamp).where(
+                Event.id == event_id, Event.timestamp >= _retention_cutoff()
+            )
+        )
+
+
+def _retention_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(days=settings.event_retention_days)
+
+
 def _parse_since(value: Optional[str]) -> Optional[datetime]:
     if not value:
         return None
@@ -116,20 +230,26 @@ def _parse_since(value: Optional[str]) -> Optional[datetime]:
     return parsed
 
 
-def _fetch_events(
+async def _fetch_events(
     user_id: str, submission_id: Optional[str], since: Optional[datetime]
 ) -> List[Event]:
-    with SessionLocal() as db:
-        query = (
-            db.query(Event)
-            .join(AudioSubmission, Event.submission_id == AudioSubmission.id)
-            .filter(AudioSubmission.user_id == user_id)
-        )
-        if submission_id:
-            query = query.filter(Event.submission_id == submission_id)
-        if since:
-            query = query.filter(Event.timestamp > since)
-        return query.order_by(Event.timestamp.asc(), Event.id.asc()).limit(200).all()
+    stmt = (
+        select(Event)
+        .join(AudioSubmission, Event.submission_id == AudioSubmission.id)
+        .where(AudioSubmission.user_id == user_id)
+    )
+    if submission_id:
+        stmt = stmt.where(Event.submission_id == submission_id)
+    # Solo particiones recientes: lo anterior a la retencion esta archivado.
+    cutoff = _retention_cutoff()
+    if since and since > cutoff:
+        stmt = stmt.where(Event.timestamp > since)
+    else:
+        stmt = stmt.where(Event.timestamp >= cutoff)
+    stmt = stmt.order_by(Event.timestamp.asc(), Event.id.asc()).limit(200)
+    async with async_session_scope() as db:
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
 
 
 def _sanitize_payload(payload: Optional[dict]) -> Optional[dict]:
@@ -1,19 +1,47 @@
+import base64
 import random
-from typing import List, Optional
+import unicodedata
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import cast, func, or_, select
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, cast, func, literal, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import JSONB, REGCONFIG, TSVECTOR
+from sqlalchemy.orm import load_only, undefer_group
 
-from ..db import get_db
+from ..db import get_async_db
+from ..discovery import random_ids, random_tags
+from ..feed_cache import cached_json_response, make_etag
+from ..feed_pages import FEED_PAGE_SIZE, load_first_page, load_related_ids
 from ..models import AudioSubmission, User, Vote
-from ..schemas import FeedItem, StoryResponse
-from ..storage import generate_presigned_get
+from ..responses import FastJSONResponse, render_json
+from ..schemas import FeedItem, StoryBatchResponse, StoryResponse
+from ..storage import generate_presigned_get, stable_public_url
 from ..settings import settings
+from ..trending import load_trending_ids, record_listen
 
 router = APIRouter(prefix="/feed", tags=["feed"])
 
+# Columnas que usa FeedItem; el resto (transcript, moderacion, etc.) no sale de la DB.
+FEED_ITEM_COLUMNS = (
+    AudioSubmission.id,
+    AudioSubmission.user_id,
+    AudioSubmission.title,
+    AudioSubmission.summary,
+    AudioSubmission.tags,
+    AudioSubmission.cover_image_key,
+    AudioSubmission.public_audio_key,
+    AudioSubmission.published_at,
+)
+
+# Configuracion/columna creadas por la migracion 6 (solo Postgres).
+SEARCH_CONFIG = "winivox_es"
+SEARCH_VECTOR = literal_column("audio_submissions.search_vector", TSVECTOR)
+# Pesos A/B/C por defecto de ts_rank_cd, para el fallback en Python.
+SEARCH_WEIGHTS = (("title", 1.0), ("summary", 0.4), ("transcript_preview", 0.2))
+SEARCH_FALLBACK_SCAN = 1000
+
 
 def parse_tags(raw: Optional[str]) -> List[str]:
     if not raw:
@@ -21,7 +49,7 @@ def parse_tags(raw: Optional[str]) -> List[str]:
     return [tag.strip().lower() for tag in raw.split(",") if tag.strip()]
 
 
-def _is_postgres(db: Session) -> bool:
+def _is_postgres(db) -> bool:
     try:
         bind = db.get_bind()
     except Exception:
@@ -42,78 +70,278 @@ def _normalize_tag_list(tags: Optional[List[str]]) -> List[str]:
     return normalized
 
 
-def _build_cover_url(submission: AudioSubmission, profile_image_key: str | None) -> str | None:
-    cover_key = submission.cover_image_key or profile_image_key
+def _cover_url_for_key(cover_key: str | None) -> str | None:
     if not cover_key:
         return None
     return generate_presigned_get(settings.s3_public_bucket, cover_key)
 
 
-@router.get("", response_model=List[FeedItem])
-def get_feed(
-    tags: Optional[str] = Query(default=None),
-    tag: Optional[str] = Query(default=None),
-    db: Session = Depends(get_db),
-) -> List[FeedItem]:
-    tag_list = parse_tags(tags or tag)
-    vote_counts = (
-        db.query(Vote.audio_id, func.count(Vote.id).label("vote_count"))
-        .group_by(Vote.audio_id)
-        .subquery()
+def _build_cover_url(submission: AudioSubmission, profile_image_key: str | None) -> str | None:
+    return _cover_url_for_key(submission.cover_image_key or profile_image_key)
+
+
+def _build_public_url(key: str) -> str:
+    return stable_public_url(key) or generate_presigned_get(
+        settings.s3_public_bucket, key
+    )
+
+
+def _encode_cursor(published_at: datetime, item_id: str) -> str:
+    raw = f"{published_at.isoformat()}|{item_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _encode_offset_cursor(offset: int) -> str:
+    raw = f"offset|{offset}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_offset_cursor(value: Optional[str]) -> int:
+    if not value:
+        return 0
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        prefix, offset = raw.split("|", 1)
+        if prefix != "offset" or int(offset) < 0:
+            raise ValueError(raw)
+        return int(offset)
+    except (ValueError, UnicodeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def _decode_cursor(value: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    if not value:
+        return None
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        published_raw, item_id = raw.split("|", 1)
+        return datetime.fromisoformat(published_raw), item_id
+    except (ValueError, UnicodeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+# Las filas se mapean directo a dicts con la forma de FeedItem (mismas claves y
+# orden): los listados se serializan con orjson sin validar modelo por modelo.
+FeedPayload = Dict[str, Any]
+
+
+def _feed_item(
+    item: AudioSubmission, profile_image_key: str | None, vote_count: Optional[int]
+) -> FeedPayload:
+    return {
+        "id": item.id,
+        "user_id": item.user_id,
+        "transcript_preview": None,
+        "title": item.title,
+        "summary": item.summary,
+        "tags": item.tags,
+        "cover_url": _build_cover_url(item, profile_image_key),
+        "public_url": _build_public_url(item.public_audio_key),
+        "published_at": item.published_at,
+        "vote_count": vote_count or 0,
+    }
+
+
+def _load_materialized_page(
+    tag_list: List[str],
+) -> Optional[Tuple[List[FeedPayload], Optional[str]]]:
+    page = load_first_page(tag_list)
+    if page is None:
+        return None
+    documents, has_more = page
+    items = [
+        {
+            "id": document["id"],
+            "user_id": document["user_id"],
+            "transcript_preview": None,
+            "title": document.get("title"),
+            "summary": document.get("summary"),
+            "tags": document.get("tags"),
+            "cover_url": _cover_url_for_key(document.get("cover_key")),
+            "public_url": _build_public_url(document["public_audio_key"]),
+            "published_at": document.get("published_at"),
+            "vote_count": document.get("vote_count") or 0,
+        }
+        for document in documents
+    ]
+    next_cursor = None
+    if has_more and documents and documents[-1].get("published_at"):
+        last = documents[-1]
+        next_cursor = _encode_cursor(
+            datetime.fromisoformat(last["published_at"]), last["id"]
+        )
+    return items, next_cursor
+
+
+def _feed_items(rows) -> List[FeedPayload]:
+    # Firma URLs (y toca el cache de presign en Redis): se corre en el threadpool.
+    return [_feed_item(*row) for row in rows]
+
+
+def _vote_count_column():
+    # Conteo correlacionado: usa ix_votes_audio_id solo para las filas de la pagina.
+    return (
+        select(func.count())
+        .where(Vote.audio_id == AudioSubmission.id)
+        .correlate(AudioSubmission)
+        .scalar_subquery()
+        .label("vote_count")
+    )
+
+
+def _feed_rows_query():
+    return select(
+        AudioSubmission, User.profile_image_key, _vote_count_column()
+    ).outerjoin(User, AudioSubmission.user_id == User.id)
+
+
+async def _load_rows_by_id(db, ids: List[str]) -> Dict[str, Tuple]:
+    # Lookups por PK para listas de ids que vienen de Redis (trending, random, related).
+    if not ids:
+        return {}
+    result = await db.execute(
+        _feed_rows_query()
+        .options(load_only(*FEED_ITEM_COLUMNS))
+        .where(
+            AudioSubmission.id.in_(ids),
+            AudioSubmission.status == "APPROVED",
+            AudioSubmission.public_audio_key.isnot(None),
+        )
     )
-    query = (
-        db.query(AudioSubmission, User.profile_image_key, vote_counts.c.vote_count)
-        .outerjoin(vote_counts, AudioSubmission.id == vote_counts.c.audio_id)
-        .outerjoin(User, AudioSubmission.user_id == User.id)
-        .filter(AudioSubmission.status == "APPROVED")
+    return {row[0].id: row for row in result.all()}
+
+
+async def _load_feed_page(
+    db,
+    tag_list: List[str],
+    cursor: Optional[Tuple[datetime, str]],
+) -> Tuple[List[FeedPayload], Optional[str]]:
+    stmt = (
+        _feed_rows_query()
+        .options(load_only(*FEED_ITEM_COLUMNS))
+        .where(
+            AudioSubmission.status == "APPROVED",
+            AudioSubmission.public_audio_key.isnot(None),
+        )
     )
+    if cursor:
+        published_at, item_id = cursor
+        stmt = stmt.where(
+            or_(
+                AudioSubmission.published_at < published_at,
+                and_(
+                    AudioSubmission.published_at == published_at,
+                    AudioSubmission.id < item_id,
+                ),
+            )
+        )
     use_postgres = _is_postgres(db)
     if tag_list and use_postgres:
         tag_filters = [
             cast(AudioSubmission.tags, JSONB).contains([tag]) for tag in tag_list
         ]
-        query = query.filter(AudioSubmission.tags.isnot(None), or_(*tag_filters))
+        stmt = stmt.where(AudioSubmission.tags.isnot(None), or_(*tag_filters))
 
-    items = query.order_by(AudioSubmission.published_at.desc()).limit(200).all()
+    result = await db.execute(
+        stmt.order_by(AudioSubmission.published_at.desc(), AudioSubmission.id.desc())
+        .limit(200)
+    )
+    items = result.all()
     if tag_list and not use_postgres:
         filtered = []
         for item, profile_image_key, vote_count in items:
             tags_normalized = _normalize_tag_list(item.tags)
             if any(tag in tags_normalized for tag in tag_list):
                 filtered.append((item, profile_image_key, vote_count))
-        items = filtered[:50]
+        items = filtered[:FEED_PAGE_SIZE]
     else:
-        items = items[:50]
+        items = items[:FEED_PAGE_SIZE]
+
+    next_cursor = None
+    if len(items) == FEED_PAGE_SIZE:
+        last = items[-1][0]
+        next_cursor = _encode_cursor(last.published_at, last.id)
+    return await run_in_threadpool(_feed_items, items), next_cursor
 
-    response: List[FeedItem] = []
-    for item, profile_image_key, vote_count in items:
-        if not item.public_audio_key:
+
+async def _load_trending_page(
+    db, tag_list: List[str], offset: int
+) -> Optional[Tuple[List[FeedPayload], Optional[str]]]:
+    # Orden del zset feed:trending (votos, escuchas y viral_analysis con decaimiento).
+    window = FEED_PAGE_SIZE * 4 if tag_list else FEED_PAGE_SIZE
+    ids = await run_in_threadpool(load_trending_ids, offset, window)
+    if ids is None or (not ids and offset == 0):
+        return None
+    by_id = await _load_rows_by_id(db, ids)
+    rows = []
+    consumed = 0
+    for item_id in ids:
+        consumed += 1
+        row = by_id.get(item_id)
+        if row is None:
             continue
-        public_url = generate_presigned_get(settings.s3_public_bucket, item.public_audio_key)
-        cover_url = _build_cover_url(item, profile_image_key)
-        response.append(
-            FeedItem(
-                id=item.id,
-                user_id=item.user_id,
-                transcript_preview=None,
-                title=item.title,
-                summary=item.summary,
-                tags=item.tags,
-                cover_url=cover_url,
-                public_url=public_url,
-                published_at=item.published_at,
-                vote_count=vote_count or 0,
-            )
-        )
+        if tag_list and not any(tag in _normalize_tag_list(row[0].tags) for tag in tag_list):
+            continue
+        rows.append(row)
+        if len(rows) == FEED_PAGE_SIZE:
+            break
+    next_cursor = None
+    if consumed < len(ids) or len(ids) == window:
+        next_cursor = _encode_offset_cursor(offset + consumed)
+    return await run_in_threadpool(_feed_items, rows), next_cursor
+
+
+@router.get("", response_model=List[FeedItem])
+async def get_feed(
+    request: Request,
+    tags: Optional[str] = Query(default=None),
+    tag: Optional[str] = Query(default=None),
+    cursor: Optional[str] = Query(default=None),
+    sort: str = Query(default="recent", pattern="^(recent|trending)$"),
+    db=Depends(get_async_db),
+) -> Response:
+    tag_list = parse_tags(tags or tag)
+    if sort == "trending":
+        offset = _decode_offset_cursor(cursor)
+
+        async def build_trending():
+            page = await _load_trending_page(db, tag_list, offset)
+            # Sin zset (Redis caido o vacio): orden por recencia.
+            items, next_cursor = page or await _load_feed_page(db, tag_list, None)
+            if page is None:
+                next_cursor = None
+            headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+            return items, headers
+
+        key = ("feed:trending", tuple(sorted(set(tag_list))), cursor or "")
+        return await cached_json_response(request, key, build_trending)
 
-    return response
+    cursor_value = _decode_cursor(cursor)
+
+    async def build():
+        page = None
+        if cursor_value is None:
+            # Primera pagina: documento pre-armado por el worker al publicar.
+            page = await run_in_threadpool(_load_materialized_page, tag_list)
+        items, next_cursor = page or await _load_feed_page(db, tag_list, cursor_value)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        return items, headers
+
+    key = ("feed", tuple(sorted(set(tag_list))), cursor or "")
+    return await cached_json_response(request, key, build)
 
 
 @router.get("/tags", response_model=List[str])
-def get_feed_tags(
+async def get_feed_tags(
     limit: int = Query(default=30, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
 ) -> List[str]:
+    sampled = await run_in_threadpool(random_tags, limit)
+    if sampled:
+        # Set de tags que mantiene el worker: SRANDMEMBER sin leer el catalogo.
+        return sampled if len(sampled) == limit else sorted(sampled)
     if _is_postgres(db):
         tag_expr = func.jsonb_array_elements_text(cast(AudioSubmission.tags, JSONB))
         stmt = (
@@ -121,19 +349,20 @@ def get_feed_tags(
             .where(AudioSubmission.status == "APPROVED")
             .where(AudioSubmission.tags.isnot(None))
         )
-        tags = [tag for tag in db.execute(stmt).scalars().all() if tag]
+        result = await db.execute(stmt)
+        tags = [tag for tag in result.scalars().all() if tag]
         unique_tags = list({tag for tag in tags})
         if len(unique_tags) > limit:
             return random.sample(unique_tags, limit)
         return sorted(unique_tags)
 
-    rows = (
-        db.query(AudioSubmission.tags)
-        .filter(AudioSubmission.status == "APPROVED", AudioSubmission.tags.isnot(None))
-        .all()
+    result = await db.execute(
+        select(AudioSubmission.tags).where(
+            AudioSubmission.status == "APPROVED", AudioSubmission.tags.isnot(None)
+        )
     )
     tags: List[str] = []
-    for row in rows:
+    for row in result.all():
         tags.extend(_normalize_tag_list(row[0]))
     unique_tags = list(set(tags))
     if len(unique_tags) > limit:
@@ -142,85 +371,298 @@ def get_feed_tags(
 
 
 @router.get("/low-serendipia", response_model=List[FeedItem])
-def get_low_serendipia(
+async def get_low_serendipia(
+    request: Request,
     limit: int = Query(default=6, ge=1, le=50),
-    db: Session = Depends(get_db),
-) -> List[FeedItem]:
-    vote_counts = (
-        db.query(Vote.audio_id, func.count(Vote.id).label("vote_count"))
-        .group_by(Vote.audio_id)
-        .subquery()
-    )
-    items = (
-        db.query(AudioSubmission, User.profile_image_key, vote_counts.c.vote_count)
-        .outerjoin(vote_counts, AudioSubmission.id == vote_counts.c.audio_id)
-        .outerjoin(User, AudioSubmission.user_id == User.id)
-        .filter(
+    db=Depends(get_async_db),
+) -> Response:
+    # Muestra al azar de la banda baja de viral_analysis (set en Redis): sin cache,
+    # como /shuffle, para que cada request saque otra.
+    ids = await run_in_threadpool(random_ids, limit, None, "low")
+    if ids:
+        by_id = await _load_rows_by_id(db, ids)
+        rows = [by_id[item_id] for item_id in ids if item_id in by_id]
+        return FastJSONResponse(await run_in_threadpool(_feed_items, rows))
+
+    async def build():
+        # Sin indice: orden determinista por viral_analysis, cacheable.
+        result = await db.execute(
+            _feed_rows_query()
+            .options(load_only(*FEED_ITEM_COLUMNS))
+            .where(
+                AudioSubmission.status == "APPROVED",
+                AudioSubmission.viral_analysis.isnot(None),
+                AudioSubmission.public_audio_key.isnot(None),
+            )
+            .order_by(
+                AudioSubmission.viral_analysis.asc(),
+                AudioSubmission.published_at.desc(),
+            )
+            .limit(limit)
+        )
+        return await run_in_threadpool(_feed_items, result.all()), {}
+
+    return await cached_json_response(request, ("low-serendipia", limit), build)
+
+
+@router.get("/shuffle", response_model=List[FeedItem])
+async def get_shuffle(
+    tags: Optional[str] = Query(default=None),
+    limit: int = Query(default=10, ge=1, le=50),
+    db=Depends(get_async_db),
+) -> Response:
+    tag_list = parse_tags(tags)
+    ids = await run_in_threadpool(random_ids, limit, tag_list)
+    if ids:
+        random.shuffle(ids)
+        by_id = await _load_rows_by_id(db, ids[:limit])
+        rows = [by_id[item_id] for item_id in ids[:limit] if item_id in by_id]
+        return FastJSONResponse(await run_in_threadpool(_feed_items, rows))
+    # Sin indice en Redis: muestra de la primera pagina.
+    items, _ = await _load_feed_page(db, tag_list, None)
+    return FastJSONResponse(random.sample(items, min(limit, len(items))))
+
+
+def _story_response(
+    submission: AudioSubmission, profile_image_key: str | None, vote_count: Optional[int]
+) -> Dict[str, Any]:
+    # Forma de StoryResponse, igual que _feed_item.
+    return {
+        "id": submission.id,
+        "user_id": submission.user_id,
+        "title": submission.title,
+        "summary": submission.summary,
+        "tags": submission.tags,
+        "transcript": submission.transcript_preview,
+        "cover_url": _build_cover_url(submission, profile_image_key),
+        "public_url": _build_public_url(submission.public_audio_key),
+        "published_at": submission.published_at,
+        "vote_count": vote_count or 0,
+    }
+
+
+def _story_batch_items(rows) -> List[Dict[str, Any]]:
+    # Una sola pasada de firma; el ETag se calcula igual que en /feed/{id}.
+    items = []
+    for row in rows:
+        story = _story_response(*row)
+        items.append({"etag": make_etag(render_json(story)), "story": story})
+    return items
+
+
+def _normalize_search_text(value: str) -> str:
+    # Igual que worker/llm.py:_normalize_text (y que la config winivox_es).
+    normalized = unicodedata.normalize("NFD", value.lower())
+    return "".join(ch for ch in normalized if unicodedata.category(ch) != "Mn")
+
+
+def _encode_search_cursor(rank: float, item_id: str) -> str:
+    raw = f"{rank!r}|{item_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_search_cursor(value: Optional[str]) -> Optional[Tuple[float, str]]:
+    if not value:
+        return None
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        rank_raw, item_id = raw.split("|", 1)
+        return float(rank_raw), item_id
+    except (ValueError, UnicodeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+async def _search_postgres(
+    db, query: str, cursor: Optional[Tuple[float, str]]
+) -> List[Tuple[AudioSubmission, Optional[str], int, float]]:
+    tsquery = func.websearch_to_tsquery(cast(literal(SEARCH_CONFIG), REGCONFIG), query)
+    rank = func.ts_rank_cd(SEARCH_VECTOR, tsquery)
+    stmt = (
+        _feed_rows_query()
+        .add_columns(rank.label("rank"))
+        .options(load_only(*FEED_ITEM_COLUMNS))
+        .where(
             AudioSubmission.status == "APPROVED",
-            AudioSubmission.viral_analysis.isnot(None),
+            AudioSubmission.public_audio_key.isnot(None),
+            SEARCH_VECTOR.op("@@")(tsquery),
         )
-        .order_by(AudioSubmission.viral_analysis.asc(), AudioSubmission.published_at.desc())
-        .limit(limit)
-        .all()
     )
+    if cursor:
+        cursor_rank, item_id = cursor
+        stmt = stmt.where(
+            or_(rank < cursor_rank, and_(rank == cursor_rank, AudioSubmission.id < item_id))
+        )
+    result = await db.execute(
+        stmt.order_by(rank.desc(), AudioSubmission.id.desc()).limit(FEED_PAGE_SIZE)
+    )
+    return result.all()
+
 
-    response: List[FeedItem] = []
-    for item, profile_image_key, vote_count in items:
-        if not item.public_audio_key:
+async def _search_fallback(
+    db, query: str, cursor: Optional[Tuple[float, str]]
+) -> List[Tuple[AudioSubmission, Optional[str], int, float]]:
+    # SQLite/tests: todos los terminos tienen que aparecer; rank por campo y frecuencia.
+    terms = _normalize_search_text(query).split()
+    result = await db.execute(
+        _feed_rows_query()
+        .options(load_only(*FEED_ITEM_COLUMNS, AudioSubmission.transcript_preview))
+        .where(
+            AudioSubmission.status == "APPROVED",
+            AudioSubmission.public_audio_key.isnot(None),
+        )
+        .order_by(AudioSubmission.published_at.desc())
+        .limit(SEARCH_FALLBACK_SCAN)
+    )
+    ranked = []
+    for item, profile_image_key, vote_count in result.all():
+        fields = [
+            (_normalize_search_text(getattr(item, name) or ""), weight)
+            for name, weight in SEARCH_WEIGHTS
+        ]
+        if not terms or not all(any(term in text for text, _ in fields) for term in terms):
             continue
-        public_url = generate_presigned_get(
-            settings.s3_public_bucket, item.public_audio_key
-        )
-        cover_url = _build_cover_url(item, profile_image_key)
-        response.append(
-            FeedItem(
-                id=item.id,
-                user_id=item.user_id,
-                transcript_preview=None,
-                title=item.title,
-                summary=item.summary,
-                tags=item.tags,
-                cover_url=cover_url,
-                public_url=public_url,
-                published_at=item.published_at,
-                vote_count=vote_count or 0,
+        rank = sum(weight * text.count(term) for term in terms for text, weight in fields)
+        ranked.append((item, profile_image_key, vote_count, rank))
+    ranked.sort(key=lambda row: (row[3], row[0].id), reverse=True)
+    if cursor:
+        cursor_rank, item_id = cursor
+        ranked = [row for row in ranked if (row[3], row[0].id) < (cursor_rank, item_id)]
+    return ranked[:FEED_PAGE_SIZE]
+
+
+@router.get("/search", response_model=List[FeedItem])
+async def search_feed(
+    request: Request,
+    q: str = Query(min_length=2, max_length=200),
+    cursor: Optional[str] = Query(default=None),
+    db=Depends(get_async_db),
+) -> Response:
+    cursor_value = _decode_search_cursor(cursor)
+    query = " ".join(q.split())
+
+    async def build():
+        search = _search_postgres if _is_postgres(db) else _search_fallback
+        rows = await search(db, query, cursor_value)
+        headers = {}
+        if len(rows) == FEED_PAGE_SIZE:
+            last, rank = rows[-1][0], rows[-1][3]
+            headers["X-Next-Cursor"] = _encode_search_cursor(float(rank), last.id)
+        items = await run_in_threadpool(_feed_items, [row[:3] for row in rows])
+        return items, headers
+
+    key = ("search", _normalize_search_text(query), cursor or "")
+    return await cached_json_response(request, key, build)
+
+
+@router.get("/batch", response_model=StoryBatchResponse)
+async def get_story_batch(
+    request: Request,
+    ids: str = Query(..., min_length=1),
+    db=Depends(get_async_db),
+) -> Response:
+    # Orden del pedido, sin repetidos.
+    id_list = list(dict.fromkeys(item.strip() for item in ids.split(",") if item.strip()))
+    if not id_list:
+        raise HTTPException(status_code=400, detail="No ids")
+    if len(id_list) > settings.feed_batch_max_ids:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.feed_batch_max_ids} ids"
+        )
+
+    async def build():
+        result = await db.execute(
+            _feed_rows_query()
+            .options(undefer_group("detail"))
+            .where(
+                AudioSubmission.id.in_(id_list),
+                AudioSubmission.status == "APPROVED",
+                AudioSubmission.public_audio_key.isnot(None),
             )
         )
-    return response
+        by_id = {row[0].id: row for row in result.all()}
+        rows = [by_id[item_id] for item_id in id_list if item_id in by_id]
+        items = await run_in_threadpool(_story_batch_items, rows)
+        missing = [item_id for item_id in id_list if item_id not in by_id]
+        return {"items": items, "missing": missing}, {}
+
+    return await cached_json_response(request, ("batch", tuple(id_list)), build)
 
 
 @router.get("/{audio_id}", response_model=StoryResponse)
-def get_story(audio_id: str, db: Session = Depends(get_db)) -> StoryResponse:
-    vote_counts = (
-        db.query(Vote.audio_id, func.count(Vote.id).label("vote_count"))
-        .group_by(Vote.audio_id)
-        .subquery()
-    )
-    item = (
-        db.query(AudioSubmission, User.profile_image_key, vote_counts.c.vote_count)
-        .outerjoin(vote_counts, AudioSubmission.id == vote_counts.c.audio_id)
-        .outerjoin(User, AudioSubmission.user_id == User.id)
-        .filter(AudioSubmission.status == "APPROVED", AudioSubmission.id == audio_id)
-        .first()
+async def get_story(
+    audio_id: str, request: Request, db=Depends(get_async_db)
+) -> Response:
+    async def build():
+        result = await db.execute(
+            _feed_rows_query()
+            .options(undefer_group("detail"))
+            .where(AudioSubmission.status == "APPROVED", AudioSubmission.id == audio_id)
+            .limit(1)
+        )
+        item = result.first()
+        if not item:
+            raise HTTPException(status_code=404, detail="Story not found")
+        submission, profile_image_key, vote_count = item
+        if not submission.public_audio_key:
+            raise HTTPException(status_code=404, detail="Story not found")
+        story = await run_in_threadpool(
+            _story_response, submission, profile_image_key, vote_count
+        )
+        return story, {}
+
+    return await cached_json_response(request, ("story", audio_id), build)
+
+
+@router.get("/{audio_id}/next", response_model=List[FeedItem])
+async def get_next_stories(
+    audio_id: str,
+    request: Request,
+    limit: int = Query(default=10, ge=1, le=50),
+    db=Depends(get_async_db),
+) -> Response:
+    async def build():
+        related_ids = await run_in_threadpool(load_related_ids, audio_id)
+        stmt = (
+            _feed_rows_query()
+            .options(load_only(*FEED_ITEM_COLUMNS))
+            .where(
+                AudioSubmission.status == "APPROVED",
+                AudioSubmission.public_audio_key.isnot(None),
+                AudioSubmission.id != audio_id,
+            )
+        )
+        if related_ids:
+            # Lista precalculada por el worker: solo lookups por PK. Se piden
+            # algunos de mas por si alguno ya no esta publicado.
+            candidates = related_ids[: limit * 2]
+            result = await db.execute(stmt.where(AudioSubmission.id.in_(candidates)))
+            position = {item_id: index for index, item_id in enumerate(candidates)}
+            rows = sorted(result.all(), key=lambda row: position[row[0].id])[:limit]
+        else:
+            # Historia recien publicada o sin lista todavia: lo mas reciente.
+            result = await db.execute(
+                stmt.order_by(
+                    AudioSubmission.published_at.desc(), AudioSubmission.id.desc()
+                ).limit(limit)
+            )
+            rows = result.all()
+        return await run_in_threadpool(_feed_items, rows), {}
+
+    return await cached_json_response(request, ("next", audio_id, limit), build)
+
+
+@router.post("/{audio_id}/listen", status_code=204)
+async def record_story_listen(
+    audio_id: str, request: Request, db=Depends(get_async_db)
+) -> Response:
+    exists = await db.scalar(
+        select(AudioSubmission.id).where(
+            AudioSubmission.id == audio_id, AudioSubmission.status == "APPROVED"
+        )
     )
-    if not item:
+    if not exists:
         raise HTTPException(status_code=404, detail="Story not found")
-    submission, profile_image_key, vote_count = item
-    if not submission.public_audio_key:
-        raise HTTPException(status_code=404, detail="Story not found")
-    public_url = generate_presigned_get(
-        settings.s3_public_bucket, submission.public_audio_key
-    )
-    cover_url = _build_cover_url(submission, profile_image_key)
-    return StoryResponse(
-        id=submission.id,
-        user_id=submission.user_id,
-        title=submission.title,
-        summary=submission.summary,
-        tags=submission.tags,
-        transcript=submission.transcript_preview,
-        cover_url=cover_url,
-        public_url=public_url,
-        published_at=submission.published_at,
-        vote_count=vote_count or 0,
-    )
+    listener = request.client.host if request.client else "unknown"
+    await run_in_threadpool(record_listen, audio_id, listener)
+    return Response(status_code=204)
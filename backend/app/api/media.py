@@ -0,0 +1,122 @@
+import re
+from typing import Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from ..cache import TTLCache, etag_matches
+from ..settings import settings
+from ..storage import get_internal_s3_client, is_immutable_key
+
+router = APIRouter(prefix="/media", tags=["media"])
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+# Metadata de objetos (ETag/size/type); las keys versionadas no cambian nunca.
+_head_cache = TTLCache("media_head", maxsize=5000, ttl=60)
+
+
+def _cache_control(key: str) -> str:
+    if is_immutable_key(key):
+        return settings.media_immutable_cache_control
+    return settings.media_default_cache_control
+
+
+def _head_object(key: str) -> dict:
+    cached = _head_cache.get(key)
+    if cached:
+        return cached
+    try:
+        head = get_internal_s3_client().head_object(
+            Bucket=settings.s3_public_bucket, Key=key
+        )
+    except ClientError as exc:
+        code = exc.response.get("Error", {}).get("Code")
+        if code in {"404", "NoSuchKey", "NotFound"}:
+            raise HTTPException(status_code=404, detail="Media not found") from exc
+        raise HTTPException(status_code=502, detail="Storage unavailable") from exc
+    except BotoCoreError as exc:
+        raise HTTPException(status_code=502, detail="Storage unavailable") from exc
+    meta = {
+        "etag": head.get("ETag") or "",
+        "size": int(head.get("ContentLength") or 0),
+        "content_type": head.get("ContentType") or "application/octet-stream",
+    }
+    _head_cache.set(key, meta, ttl=3600 if is_immutable_key(key) else None)
+    return meta
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Multi-range u otros formatos: se sirve el objeto completo.
+        return None
+    start_raw, end_raw = match.groups()
+    if not start_raw and not end_raw:
+        return None
+    if not start_raw:
+        length = int(end_raw)
+        if length == 0:
+            raise HTTPException(
+                status_code=416, headers={"Content-Range": f"bytes */{size}"}
+            )
+        start = max(size - length, 0)
+        end = size - 1
+    else:
+        start = int(start_raw)
+        end = int(end_raw) if end_raw else size - 1
+        end = min(end, size - 1)
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416, headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+@router.api_route("/{key:path}", methods=["GET", "HEAD"])
+def get_media(key: str, request: Request) -> Response:
+    meta = _head_object(key)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": _cache_control(key),
+        "ETag": meta["etag"],
+    }
+    if etag_matches(request.headers.get("if-none-match"), meta["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if not if_range or if_range == meta["etag"]:
+        byte_range = _parse_range(request.headers.get("range"), meta["size"])
+
+    status_code = 200
+    params = {"Bucket": settings.s3_public_bucket, "Key": key}
+    if byte_range:
+        start, end = byte_range
+        params["Range"] = f"bytes={start}-{end}"
+        headers["Content-Range"] = f"bytes {start}-{end}/{meta['size']}"
+        headers["Content-Length"] = str(end - start + 1)
+        status_code = 206
+    else:
+        headers["Content-Length"] = str(meta["size"])
+
+    if request.method == "HEAD":
+        return Response(
+            status_code=status_code, headers=headers, media_type=meta["content_type"]
+        )
+
+    try:
+        obj = get_internal_s3_client().get_object(**params)
+    except (BotoCoreError, ClientError) as exc:
+        raise HTTPException(status_code=502, detail="Storage unavailable") from exc
+
+    return StreamingResponse(
+        obj["Body"].iter_chunks(CHUNK_SIZE),
+        status_code=status_code,
+        headers=headers,
+        media_type=meta["content_type"],
+    )
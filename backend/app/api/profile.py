@@ -5,8 +5,10 @@ from botocore.exceptions import BotoCoreError, ClientError
 from sqlalchemy.orm import Session
 
 from ..db import get_db
-from ..deps import get_current_user
-from ..models import User
+from ..deps import get_current_user, get_current_user_id
+from ..feed_cache import invalidate_feed
+from ..feed_pages import mark_feed_pages_stale
+from ..models import AudioSubmission, User
 from ..schemas import (
     ImageUploadRequest,
     ImageUploadResponse,
@@ -16,6 +18,7 @@ from ..schemas import (
 )
 from ..settings import settings
 from ..storage import generate_presigned_get, generate_presigned_put
+from ..user_cache import invalidate_user
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
@@ -72,6 +75,10 @@ def update_profile(
     user: User = Depends(get_current_user),
 ) -> UserProfileResponse:
     updates = payload.model_dump(exclude_unset=True)
+    photo_changed = (
+        "profile_photo_key" in updates
+        and updates["profile_photo_key"] != user.profile_image_key
+    )
     if "bio" in updates:
         user.bio = updates["bio"]
     if "social_links" in updates:
@@ -79,6 +86,23 @@ def update_profile(
     if "profile_photo_key" in updates:
         user.profile_image_key = updates["profile_photo_key"]
     db.commit()
+    invalidate_user(user.id)
+    if photo_changed:
+        # La foto de perfil es el fallback de portada en el feed: se rearman las
+        # paginas donde aparecen historias del usuario sin portada propia.
+        rows = (
+            db.query(AudioSubmission.tags)
+            .filter(
+                AudioSubmission.user_id == user.id,
+                AudioSubmission.status == "APPROVED",
+                AudioSubmission.public_audio_key.isnot(None),
+                AudioSubmission.cover_image_key.is_(None),
+            )
+            .all()
+        )
+        if rows:
+            mark_feed_pages_stale({tag for (tags,) in rows for tag in tags or []})
+        invalidate_feed()
     db.refresh(user)
     return _build_profile_response(user)
 
@@ -86,12 +110,12 @@ def update_profile(
 @router.post("/photo", response_model=ImageUploadResponse)
 def create_profile_photo_upload(
     payload: ImageUploadRequest,
-    user: User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ) -> ImageUploadResponse:
     if not payload.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Invalid image type")
     ext = os.path.splitext(payload.filename)[1] or ".jpg"
-    object_key = f"{user.id}/profile/photo{ext}"
+    object_key = f"{user_id}/profile/photo{ext}"
     try:
         upload_url = generate_presigned_put(
             settings.s3_public_bucket, object_key, payload.content_type
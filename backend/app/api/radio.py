@@ -0,0 +1,157 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from redis.exceptions import RedisError
+from sqlalchemy import and_, cast, or_, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import load_only
+
+from .. import radio
+from ..db import get_async_db
+from ..models import AudioSubmission
+from ..schemas import RadioResponse
+from ..settings import settings
+from ..trending import record_listen
+from .feed import (
+    FEED_ITEM_COLUMNS,
+    _decode_cursor,
+    _encode_cursor,
+    _feed_items,
+    _feed_rows_query,
+    _is_postgres,
+    _normalize_tag_list,
+    _vote_count_column,
+    parse_tags,
+)
+
+router = APIRouter(prefix="/radio", tags=["radio"])
+
+# Tandas a revisar por refill antes de rendirse (todo escuchado o filtrado).
+MAX_REFILL_BATCHES = 3
+
+
+async def _candidate_batch(
+    db, tag_list: List[str], cursor: Optional[Tuple[datetime, str]]
+) -> Tuple[List[radio.Candidate], Optional[str]]:
+    stmt = select(
+        AudioSubmission.id,
+        AudioSubmission.published_at,
+        AudioSubmission.tags,
+        _vote_count_column(),
+    ).where(
+        AudioSubmission.status == "APPROVED",
+        AudioSubmission.public_audio_key.isnot(None),
+    )
+    if cursor:
+        published_at, item_id = cursor
+        stmt = stmt.where(
+            or_(
+                AudioSubmission.published_at < published_at,
+                and_(
+                    AudioSubmission.published_at == published_at,
+                    AudioSubmission.id < item_id,
+                ),
+            )
+        )
+    use_postgres = _is_postgres(db)
+    if tag_list and use_postgres:
+        stmt = stmt.where(
+            or_(*[cast(AudioSubmission.tags, JSONB).contains([tag]) for tag in tag_list])
+        )
+    result = await db.execute(
+        stmt.order_by(AudioSubmission.published_at.desc(), AudioSubmission.id.desc()).limit(
+            settings.radio_batch_size
+        )
+    )
+    rows = result.all()
+    next_cursor = None
+    if len(rows) == settings.radio_batch_size:
+        next_cursor = _encode_cursor(rows[-1].published_at, rows[-1].id)
+    if tag_list and not use_postgres:
+        rows = [
+            row
+            for row in rows
+            if any(tag in _normalize_tag_list(row.tags) for tag in tag_list)
+        ]
+    return [(row.id, row.published_at, row.vote_count or 0) for row in rows], next_cursor
+
+
+async def _refill(db, session_id: str, session: dict) -> None:
+    tag_list = radio.session_tags(session)
+    cursor = session.get("cursor") or ""
+    lap_started = False
+    for _ in range(MAX_REFILL_BATCHES):
+        candidates, next_cursor = await _candidate_batch(db, tag_list, _decode_cursor(cursor))
+        ranked = radio.rank_candidates(candidates, datetime.utcnow())
+        cursor = next_cursor or ""
+        added = await run_in_threadpool(radio.extend_queue, session_id, ranked, cursor)
+        if added:
+            return
+        if next_cursor is None:
+            # Fin del catalogo sin nada nuevo: nueva vuelta solo si la cola quedo vacia.
+            if lap_started or await run_in_threadpool(radio.queue_length, session_id):
+                return
+            await run_in_threadpool(radio.start_new_lap, session_id)
+            lap_started = True
+
+
+async def _items_by_id(db, ids: List[str]):
+    if not ids:
+        return {}
+    result = await db.execute(
+        _feed_rows_query()
+        .options(load_only(*FEED_ITEM_COLUMNS))
+        .where(
+            AudioSubmission.id.in_(ids),
+            AudioSubmission.status == "APPROVED",
+            AudioSubmission.public_audio_key.isnot(None),
+        )
+    )
+    items = await run_in_threadpool(_feed_items, result.all())
+    return {item["id"]: item for item in items}
+
+
+async def _serve(db, session_id: str, skipped: bool) -> RadioResponse:
+    try:
+        session = await run_in_threadpool(radio.load_session, session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Radio session not found")
+        remaining = await run_in_threadpool(radio.queue_length, session_id)
+        if remaining < settings.radio_refill_threshold:
+            await _refill(db, session_id, session)
+        current, upcoming = await run_in_threadpool(radio.advance, session_id, skipped)
+        if current:
+            await run_in_threadpool(record_listen, current, f"radio:{session_id}")
+    except RedisError as exc:
+        raise HTTPException(status_code=503, detail="Radio unavailable") from exc
+
+    items = await _items_by_id(db, [item_id for item_id in [current, *upcoming] if item_id])
+    return RadioResponse(
+        session_id=session_id,
+        current=items.get(current) if current else None,
+        upcoming=[items[item_id] for item_id in upcoming if item_id in items],
+    )
+
+
+@router.post("/sessions", response_model=RadioResponse)
+async def create_radio_session(
+    tags: Optional[str] = Query(default=None),
+    db=Depends(get_async_db),
+) -> RadioResponse:
+    try:
+        session_id = await run_in_threadpool(radio.create_session, parse_tags(tags))
+    except RedisError as exc:
+        raise HTTPException(status_code=503, detail="Radio unavailable") from exc
+    return await _serve(db, session_id, skipped=False)
+
+
+@router.post("/sessions/{session_id}/next", response_model=RadioResponse)
+async def next_in_radio(session_id: str, db=Depends(get_async_db)) -> RadioResponse:
+    return await _serve(db, session_id, skipped=False)
+
+
+@router.post("/sessions/{session_id}/skip", response_model=RadioResponse)
+async def skip_in_radio(session_id: str, db=Depends(get_async_db)) -> RadioResponse:
+    return await _serve(db, session_id, skipped=True)
@@ -1,16 +1,20 @@
 import os
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from botocore.exceptions import BotoCoreError, ClientError
 from redis.exceptions import RedisError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only, undefer_group
 
-from ..deps import get_current_user
+from ..deps import get_current_user_cached, get_current_user_id
 from ..events import record_event
-from ..models import AudioSubmission, Event, User, Vote
-from ..queue import enqueue_submission
+from ..feed_cache import invalidate_feed
+from ..feed_pages import remove_from_feed_pages
+from ..models import AudioSubmission, Event, Vote
+from ..preflight import UploadInvalid, UploadMissing, preflight_upload
+from ..queue import claim_enqueue, enqueue_submission
+from ..responses import FastJSONResponse
 from ..schemas import (
     ImageUploadRequest,
     ImageUploadResponse,
@@ -21,12 +25,32 @@ from ..schemas import (
 )
 from ..settings import settings
 from ..storage import generate_presigned_get, generate_presigned_put, get_internal_s3_client
+from ..trending import remove_from_trending
+from ..uploads import IncompleteUpload, abort_multipart, finish_multipart
+from ..user_cache import CachedUser
 from ..db import get_db
+from ..discovery import remove_from_discovery
 
 router = APIRouter(prefix="/submissions", tags=["submissions"])
 
 ALLOWED_ANON = {"OFF", "SOFT", "MEDIUM", "STRONG"}
 
+# Columnas del listado; transcript/description/tags_suggested quedan para el detalle.
+SUBMISSION_LIST_COLUMNS = (
+    AudioSubmission.id,
+    AudioSubmission.status,
+    AudioSubmission.processing_step,
+    AudioSubmission.title,
+    AudioSubmission.summary,
+    AudioSubmission.tags,
+    AudioSubmission.viral_analysis,
+    AudioSubmission.moderation_result,
+    AudioSubmission.anonymization_mode,
+    AudioSubmission.cover_image_key,
+    AudioSubmission.created_at,
+    AudioSubmission.published_at,
+)
+
 
 def build_cover_url(submission: AudioSubmission, fallback_key: str | None) -> str | None:
     cover_key = submission.cover_image_key or fallback_key
@@ -39,20 +63,45 @@ def build_submission_response(
     submission: AudioSubmission,
     fallback_key: str | None,
 ) -> SubmissionResponse:
-    payload = SubmissionResponse.model_validate(submission).model_dump()
-    payload["cover_url"] = build_cover_url(submission, fallback_key)
-    return SubmissionResponse(**payload)
+    # Una sola validacion: cover_url se agrega sobre el modelo ya construido.
+    return SubmissionResponse.model_validate(submission).model_copy(
+        update={"cover_url": build_cover_url(submission, fallback_key)}
+    )
+
+
+def build_submission_list_item(
+    submission: AudioSubmission,
+    fallback_key: str | None,
+) -> Dict[str, Any]:
+    # Forma de SubmissionResponse (mismas claves y orden), sin pasar por Pydantic.
+    return {
+        "id": submission.id,
+        "status": submission.status,
+        "processing_step": submission.processing_step,
+        "transcript_preview": None,
+        "title": submission.title,
+        "summary": submission.summary,
+        "tags": submission.tags,
+        "high_potential": submission.high_potential,
+        "moderation_result": submission.moderation_result,
+        "anonymization_mode": submission.anonymization_mode,
+        "description": None,
+        "tags_suggested": None,
+        "cover_url": build_cover_url(submission, fallback_key),
+        "created_at": submission.created_at,
+        "published_at": submission.published_at,
+    }
 
 
 @router.post("", response_model=SubmissionUploadResponse)
 def create_submission(
     payload: SubmissionCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ) -> SubmissionUploadResponse:
     ext = os.path.splitext(payload.filename)[1] or ".bin"
     submission = AudioSubmission(
-        user_id=user.id,
+        user_id=user_id,
         status="CREATED",
         created_at=datetime.utcnow(),
     )
@@ -60,7 +109,7 @@ def create_submission(
     db.commit()
     db.refresh(submission)
 
-    object_key = f"{user.id}/{submission.id}/original{ext}"
+    object_key = f"{user_id}/{submission.id}/original{ext}"
     submission.original_audio_key = object_key
     db.commit()
 
@@ -88,10 +137,11 @@ def mark_uploaded(
     submission_id: str,
     payload: SubmissionUploadedRequest,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CachedUser = Depends(get_current_user_cached),
 ) -> SubmissionResponse:
     submission = (
         db.query(AudioSubmission)
+        .options(undefer_group("upload"))
         .filter(AudioSubmission.id == submission_id, AudioSubmission.user_id == user.id)
         .first()
     )
@@ -102,8 +152,52 @@ def mark_uploaded(
     if payload.anonymization_mode not in ALLOWED_ANON:
         raise HTTPException(status_code=400, detail="Invalid anonymization mode")
 
-    # Actualizar submission con datos de configuración
-    submission.status = "UPLOADED"
+    if submission.upload_id:
+        # Upload multipart sin cerrar: se completa antes de encolar.
+        try:
+            finish_multipart(submission)
+        except IncompleteUpload as exc:
+            db.commit()
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Upload incomplete", "missing_parts": exc.missing},
+            ) from exc
+        except (BotoCoreError, ClientError) as exc:
+            raise HTTPException(status_code=502, detail="Storage unavailable") from exc
+
+    if settings.preflight_enabled:
+        # Archivos vacios, no-audio o de duracion extrema no llegan a la cola.
+        try:
+            preflight_upload(settings.s3_private_bucket, submission.original_audio_key)
+        except UploadMissing as exc:
+            raise HTTPException(status_code=409, detail="Upload not found") from exc
+        except UploadInvalid as exc:
+            submission.status = "INVALID"
+            db.commit()
+            record_event(db, "audio.preflight_failed", submission.id, {"reason": str(exc)})
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+        except (BotoCoreError, ClientError) as exc:
+            raise HTTPException(status_code=502, detail="Storage unavailable") from exc
+
+    # Lock de fila: el worker lee el estado bajo el mismo lock al terminar el
+    # preproceso (worker/processing.py), asi decide si sigue o espera las opciones.
+    current_status = (
+        db.query(AudioSubmission.status)
+        .filter(AudioSubmission.id == submission.id)
+        .with_for_update()
+        .scalar()
+    )
+    should_enqueue = True
+    if current_status == "CREATED":
+        # Si la notificacion de MinIO ya la encolo, ese job sigue al ver UPLOADED.
+        should_enqueue = claim_enqueue(submission.id)
+    elif current_status in {"REJECTED", "QUARANTINED"}:
+        # El preproceso ya la modero: no se reabre ni se vuelve a encolar.
+        should_enqueue = False
+
+    # Actualizar submission con datos de configuración.
+    if current_status not in {"REJECTED", "QUARANTINED"}:
+        submission.status = "UPLOADED"
     submission.processing_step = max(submission.processing_step, 0)
     submission.anonymization_mode = payload.anonymization_mode
     submission.description = payload.description
@@ -118,10 +212,11 @@ def mark_uploaded(
         submission.id,
         {"object_key": submission.original_audio_key},
     )
-    try:
-        enqueue_submission(submission.id)
-    except RedisError as exc:
-        raise HTTPException(status_code=503, detail="Queue unavailable") from exc
+    if should_enqueue:
+        try:
+            enqueue_submission(submission.id)
+        except RedisError as exc:
+            raise HTTPException(status_code=503, detail="Queue unavailable") from exc
 
     db.refresh(submission)
     return build_submission_response(submission, user.profile_image_key)
@@ -131,7 +226,7 @@ def mark_uploaded(
 def reprocess_submission(
     submission_id: str,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CachedUser = Depends(get_current_user_cached),
 ) -> SubmissionResponse:
     submission = (
         db.query(AudioSubmission)
@@ -143,9 +238,11 @@ def reprocess_submission(
     if not submission.original_audio_key:
         raise HTTPException(status_code=400, detail="Submission has no audio")
 
+    previous_tags = submission.tags
     submission.status = "UPLOADED"
     submission.processing_step = 0
-    submission.public_audio_key = None
+    # public_audio_key se conserva: el worker la reemplaza al publicar o la borra si
+    # la moderacion rechaza el reproceso.
     submission.transcript_preview = None
     submission.title = None
     submission.summary = None
@@ -156,6 +253,10 @@ def reprocess_submission(
     db.commit()
 
     record_event(db, "audio.reprocess_requested", submission.id, {})
+    remove_from_feed_pages(submission.id, previous_tags)
+    remove_from_trending(submission.id)
+    remove_from_discovery(submission.id, previous_tags)
+    invalidate_feed()
     enqueue_submission(submission.id)
 
     db.refresh(submission)
@@ -166,10 +267,11 @@ def reprocess_submission(
 def get_submission(
     submission_id: str,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CachedUser = Depends(get_current_user_cached),
 ) -> SubmissionResponse:
     submission = (
         db.query(AudioSubmission)
+        .options(undefer_group("detail"))
         .filter(AudioSubmission.id == submission_id, AudioSubmission.user_id == user.id)
         .first()
     )
@@ -181,17 +283,18 @@ def get_submission(
 @router.get("", response_model=List[SubmissionResponse])
 def list_submissions(
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> List[SubmissionResponse]:
+    user: CachedUser = Depends(get_current_user_cached),
+) -> Response:
     submissions = (
         db.query(AudioSubmission)
+        .options(load_only(*SUBMISSION_LIST_COLUMNS))
         .filter(AudioSubmission.user_id == user.id)
         .order_by(AudioSubmission.created_at.desc())
         .all()
     )
-    return [
-        build_submission_response(item, user.profile_image_key) for item in submissions
-    ]
+    return FastJSONResponse(
+        [build_submission_list_item(item, user.profile_image_key) for item in submissions]
+    )
 
 
 @router.post("/{submission_id}/cover", response_model=ImageUploadResponse)
@@ -199,11 +302,11 @@ def create_cover_upload(
     submission_id: str,
     payload: ImageUploadRequest,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ) -> ImageUploadResponse:
     submission = (
         db.query(AudioSubmission)
-        .filter(AudioSubmission.id == submission_id, AudioSubmission.user_id == user.id)
+        .filter(AudioSubmission.id == submission_id, AudioSubmission.user_id == user_id)
         .first()
     )
     if not submission:
@@ -212,7 +315,7 @@ def create_cover_upload(
         raise HTTPException(status_code=400, detail="Invalid image type")
 
     ext = os.path.splitext(payload.filename)[1] or ".jpg"
-    object_key = f"{user.id}/{submission.id}/cover{ext}"
+    object_key = f"{user_id}/{submission.id}/cover{ext}"
     try:
         upload_url = generate_presigned_put(
             settings.s3_public_bucket, object_key, payload.content_type
@@ -231,11 +334,11 @@ def create_cover_upload(
 def cancel_submission(
     submission_id: str,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
 ) -> dict:
     submission = (
         db.query(AudioSubmission)
-        .filter(AudioSubmission.id == submission_id, AudioSubmission.user_id == user.id)
+        .filter(AudioSubmission.id == submission_id, AudioSubmission.user_id == user_id)
         .first()
     )
     if not submission:
@@ -255,6 +358,12 @@ def cancel_submission(
         (settings.s3_public_bucket, submission.public_audio_key),
         (settings.s3_public_bucket, submission.cover_image_key),
     ]
+    if submission.upload_id:
+        try:
+            abort_multipart(submission)
+        except (BotoCoreError, ClientError):
+            # Ya expirado/completado en MinIO o storage caido: la fila se borra igual.
+            pass
     try:
         client = get_internal_s3_client()
         for bucket, key in keys_to_delete:
@@ -268,7 +377,12 @@ def cancel_submission(
         pass  # Ignorar errores de storage
 
     # Eliminar submission de DB
+    tags = submission.tags
     db.delete(submission)
     db.commit()
+    remove_from_feed_pages(submission_id, tags)
+    remove_from_trending(submission_id)
+    remove_from_discovery(submission_id, tags)
+    invalidate_feed()
 
     return {"status": "deleted"}
@@ -0,0 +1,204 @@
+from typing import Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+from fastapi import APIRouter, Body, Depends, HTTPException
+from sqlalchemy.orm import Session, undefer_group
+
+from ..db import get_db
+from ..deps import get_current_user_cached, get_current_user_id
+from ..models import AudioSubmission
+from ..schemas import (
+    MultipartInitRequest,
+    MultipartPartsReport,
+    MultipartStateResponse,
+    MultipartUrlsRequest,
+    MultipartUrlsResponse,
+    SubmissionResponse,
+    SubmissionUploadedRequest,
+)
+from ..settings import settings
+from ..storage import create_multipart_upload, generate_presigned_upload_part
+from ..uploads import (
+    IncompleteUpload,
+    abort_multipart,
+    clear_multipart,
+    finish_multipart,
+    missing_parts,
+    part_count,
+    part_layout,
+    record_parts,
+    upload_progress,
+)
+from ..user_cache import CachedUser
+from .submissions import build_submission_response, mark_uploaded
+
+# Mismo prefijo que submissions: el upload multipart es parte de una submission.
+router = APIRouter(prefix="/submissions", tags=["uploads"])
+
+STORAGE_ERRORS = (BotoCoreError, ClientError)
+
+
+def _get_submission(
+    db: Session, submission_id: str, user_id: str, lock: bool = False
+) -> AudioSubmission:
+    query = (
+        db.query(AudioSubmission)
+        .options(undefer_group("upload"))
+        .filter(AudioSubmission.id == submission_id, AudioSubmission.user_id == user_id)
+    )
+    if lock:
+        # Reportes de partes en paralelo: lectura-modificacion del JSON de partes.
+        query = query.with_for_update()
+    submission = query.first()
+    if not submission:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return submission
+
+
+def _get_upload(
+    db: Session, submission_id: str, user_id: str, lock: bool = False
+) -> AudioSubmission:
+    submission = _get_submission(db, submission_id, user_id, lock)
+    if not submission.upload_id:
+        raise HTTPException(status_code=404, detail="No multipart upload in progress")
+    return submission
+
+
+def _abort_quietly(submission: AudioSubmission) -> None:
+    try:
+        abort_multipart(submission)
+    except ClientError:
+        # Ya no existe en MinIO (expirado o completado): solo se limpia el estado.
+        clear_multipart(submission)
+
+
+@router.post("/{submission_id}/multipart", response_model=MultipartStateResponse)
+def start_multipart_upload(
+    submission_id: str,
+    payload: MultipartInitRequest,
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+) -> MultipartStateResponse:
+    submission = _get_submission(db, submission_id, user_id)
+    if submission.status != "CREATED":
+        raise HTTPException(status_code=409, detail="Submission already uploaded")
+    if payload.size > settings.upload_max_bytes:
+        raise HTTPException(status_code=413, detail="File too large")
+    if submission.upload_id and submission.upload_size == payload.size:
+        # Reanudar: mismo archivo, se devuelve lo que falta.
+        return MultipartStateResponse(**upload_progress(submission))
+
+    try:
+        if submission.upload_id:
+            _abort_quietly(submission)
+        upload_id = create_multipart_upload(
+            settings.s3_private_bucket, submission.original_audio_key, payload.content_type
+        )
+    except STORAGE_ERRORS as exc:
+        raise HTTPException(status_code=502, detail="Storage unavailable") from exc
+
+    submission.upload_id = upload_id
+    submission.upload_size = payload.size
+    submission.upload_part_size, _ = part_layout(payload.size)
+    submission.upload_parts = []
+    db.commit()
+    return MultipartStateResponse(**upload_progress(submission))
+
+
+@router.get("/{submission_id}/multipart", response_model=MultipartStateResponse)
+def get_multipart_upload(
+    submission_id: str,
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+) -> MultipartStateResponse:
+    submission = _get_upload(db, submission_id, user_id)
+    return MultipartStateResponse(**upload_progress(submission))
+
+
+@router.post("/{submission_id}/multipart/urls", response_model=MultipartUrlsResponse)
+def sign_multipart_parts(
+    submission_id: str,
+    payload: MultipartUrlsRequest,
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+) -> MultipartUrlsResponse:
+    submission = _get_upload(db, submission_id, user_id)
+    batch_size = settings.multipart_url_batch_size
+    part_numbers = payload.part_numbers or missing_parts(submission)[:batch_size]
+    if len(part_numbers) > batch_size:
+        raise HTTPException(status_code=400, detail=f"At most {batch_size} parts")
+    total = part_count(submission)
+    if any(number < 1 or number > total for number in part_numbers):
+        raise HTTPException(status_code=400, detail="Invalid part number")
+
+    try:
+        urls = [
+            {
+                "part_number": number,
+                "url": generate_presigned_upload_part(
+                    settings.s3_private_bucket,
+                    submission.original_audio_key,
+                    submission.upload_id,
+                    number,
+                ),
+            }
+            for number in part_numbers
+        ]
+    except STORAGE_ERRORS as exc:
+        raise HTTPException(status_code=502, detail="Storage unavailable") from exc
+    return MultipartUrlsResponse(urls=urls, expires_in=settings.multipart_url_expires_seconds)
+
+
+@router.post("/{submission_id}/multipart/parts", response_model=MultipartStateResponse)
+def report_multipart_parts(
+    submission_id: str,
+    payload: MultipartPartsReport,
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+) -> MultipartStateResponse:
+    submission = _get_upload(db, submission_id, user_id, lock=True)
+    record_parts(submission, [part.model_dump() for part in payload.parts])
+    db.commit()
+    return MultipartStateResponse(**upload_progress(submission))
+
+
+@router.post("/{submission_id}/multipart/complete", response_model=SubmissionResponse)
+def complete_multipart(
+    submission_id: str,
+    payload: Optional[SubmissionUploadedRequest] = Body(default=None),
+    db: Session = Depends(get_db),
+    user: CachedUser = Depends(get_current_user_cached),
+) -> SubmissionResponse:
+    submission = _get_upload(db, submission_id, user.id, lock=True)
+    try:
+        finish_multipart(submission)
+    except IncompleteUpload as exc:
+        db.commit()
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Upload incomplete", "missing_parts": exc.missing},
+        ) from exc
+    except STORAGE_ERRORS as exc:
+        raise HTTPException(status_code=502, detail="Storage unavailable") from exc
+    db.commit()
+
+    if payload is not None:
+        # Con la configuracion incluida, se encola igual que /uploaded.
+        return mark_uploaded(submission_id, payload, db, user)
+    db.refresh(submission)
+    return build_submission_response(submission, user.profile_image_key)
+
+
+@router.delete("/{submission_id}/multipart")
+def cancel_multipart_upload(
+    submission_id: str,
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+) -> dict:
+    submission = _get_upload(db, submission_id, user_id)
+    try:
+        _abort_quietly(submission)
+    except BotoCoreError as exc:
+        raise HTTPException(status_code=502, detail="Storage unavailable") from exc
+    db.commit()
+    return {"status": "aborted"}
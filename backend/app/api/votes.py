@@ -1,31 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 
-from ..db import get_db
-from ..deps import get_current_user
+from ..db import get_async_db
+from ..deps import get_current_user_id
+from ..feed_cache import invalidate_feed
+from ..feed_pages import increment_vote_count
 from ..models import Vote
 from ..schemas import VoteCreate, VoteResponse
+from ..settings import settings
+from ..trending import bump_trending
 
 router = APIRouter(prefix="/votes", tags=["votes"])
 
 
+def _after_vote(audio_id: str) -> None:
+    increment_vote_count(audio_id)
+    bump_trending(audio_id, settings.trending_vote_weight)
+    invalidate_feed()
+
+
 @router.post("", response_model=VoteResponse)
-def create_vote(
+async def create_vote(
     payload: VoteCreate,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db=Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id),
 ) -> VoteResponse:
-    existing = (
-        db.query(Vote)
-        .filter(Vote.user_id == user.id, Vote.audio_id == payload.audio_id)
-        .first()
+    existing = await db.scalar(
+        select(Vote.id)
+        .where(Vote.user_id == user_id, Vote.audio_id == payload.audio_id)
+        .limit(1)
     )
     if existing:
         raise HTTPException(status_code=409, detail="Already voted")
 
-    vote = Vote(user_id=user.id, audio_id=payload.audio_id)
+    vote = Vote(user_id=user_id, audio_id=payload.audio_id)
     db.add(vote)
-    db.commit()
-    db.refresh(vote)
+    await db.commit()
+    await db.refresh(vote)
+    await run_in_threadpool(_after_vote, vote.audio_id)
 
     return VoteResponse(id=vote.id, audio_id=vote.audio_id, created_at=vote.created_at)
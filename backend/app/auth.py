@@ -1,15 +1,32 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, Tuple, TypeVar
 
 import jwt
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
 from .settings import settings
 
+T = TypeVar("T")
+
+# Hashes con otros parametros (o bcrypt) quedan "deprecated" y se rehashean al loguear.
 _pwd_context = CryptContext(
     schemes=["argon2", "bcrypt"],
     deprecated="auto",
+    argon2__time_cost=settings.argon2_time_cost,
+    argon2__memory_cost=settings.argon2_memory_cost,
+    argon2__parallelism=settings.argon2_parallelism,
+)
+
+# Argon2 es CPU/memoria: pool propio y acotado, fuera del threadpool de la API.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="password-hash"
 )
+_pending = 0
+_pending_lock = threading.Lock()
 
 
 def get_password_hash(password: str) -> str:
@@ -20,6 +37,40 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return _pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return _pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def _run_hashing(fn: Callable[..., T], *args) -> T:
+    global _pending
+    with _pending_lock:
+        if _pending >= settings.password_hash_max_pending:
+            # Mejor rechazar rapido que encolar logins sin limite.
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many login attempts, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing(get_password_hash, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return await _run_hashing(verify_and_update_password, plain_password, hashed_password)
+
+
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta is None:
         expires_delta = timedelta(minutes=settings.access_token_exp_minutes)
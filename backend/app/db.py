@@ -1,6 +1,13 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import declarative_base, sessionmaker
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
 
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+
+from .migrations import run_migrations
 from .settings import settings
 
 engine = create_engine(settings.database_url, pool_pre_ping=True)
@@ -8,6 +15,70 @@ SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
 
+def _async_database_url() -> Optional[str]:
+    if settings.async_database_url:
+        return settings.async_database_url
+    url = make_url(settings.database_url)
+    if url.get_backend_name() != "postgresql":
+        return None
+    return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+_async_url = _async_database_url()
+async_engine = (
+    create_async_engine(
+        _async_url,
+        pool_pre_ping=True,
+        pool_size=settings.async_db_pool_size,
+        max_overflow=settings.async_db_max_overflow,
+    )
+    if _async_url
+    else None
+)
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine
+    else None
+)
+
+
+class SyncSessionAdapter:
+    # Misma interfaz que AsyncSession sobre una Session sync (SQLite/tests); cada llamada va al threadpool.
+
+    def __init__(self, session: Session) -> None:
+        self.sync_session = session
+
+    def get_bind(self):
+        return self.sync_session.get_bind()
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    async def execute(self, statement, params=None):
+        # freeze(): las filas se leen en el thread, no en el event loop.
+        return await run_in_threadpool(
+            lambda: self.sync_session.execute(statement, params).freeze()()
+        )
+
+    async def scalar(self, statement, params=None):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params)
+
+    async def get(self, entity, ident):
+        return await run_in_threadpool(self.sync_session.get, entity, ident)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance: Any) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -16,34 +87,26 @@ def get_db():
         db.close()
 
 
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[Any]:
+    if AsyncSessionLocal is None:
+        db = SyncSessionAdapter(SessionLocal())
+    else:
+        db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def get_async_db() -> AsyncIterator[Any]:
+    async with async_session_scope() as db:
+        yield db
+
+
 def ensure_schema() -> None:
-    with engine.begin() as conn:
-        conn.execute(
-            text("ALTER TABLE users ADD COLUMN IF NOT EXISTS bio TEXT")
-        )
-        conn.execute(
-            text("ALTER TABLE users ADD COLUMN IF NOT EXISTS social_links JSON")
-        )
-        conn.execute(
-            text("ALTER TABLE users ADD COLUMN IF NOT EXISTS profile_image_key TEXT")
-        )
-        conn.execute(
-            text("ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS summary TEXT")
-        )
-        conn.execute(
-            text("ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS title TEXT")
-        )
-        conn.execute(
-            text(
-                "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS viral_analysis INTEGER"
-            )
-        )
-        conn.execute(
-            text("ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS description TEXT")
-        )
-        conn.execute(
-            text("ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS tags_suggested JSON")
-        )
-        conn.execute(
-            text("ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS cover_image_key TEXT")
-        )
+    if engine.dialect.name != "postgresql":
+        # SQLite (dev/tests): sin migraciones versionadas.
+        Base.metadata.create_all(bind=engine)
+        return
+    run_migrations(engine)
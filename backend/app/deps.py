@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from .db import get_db
 from .models import User
 from .settings import settings
+from .user_cache import CachedUser, get_cached_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -25,6 +26,22 @@ def get_current_user(
     return user
 
 
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
+    # Sin DB: el token ya esta firmado; para rutas que solo necesitan el id.
+    return get_user_id_from_token(token)
+
+
+def get_current_user_cached(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> CachedUser:
+    user = get_cached_user(db, get_user_id_from_token(token))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
+        )
+    return user
+
+
 def get_user_id_from_token(token: str) -> str:
     try:
         payload = jwt.decode(
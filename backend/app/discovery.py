@@ -0,0 +1,74 @@
+from typing import Iterable, List, Optional
+
+from .cache import redis_call
+
+# Formato compartido con el worker (worker/discovery.py), que indexa al publicar.
+# Sets de ids por banda de viral_analysis y por tag: SRANDMEMBER es O(count),
+# sin importar el tamano del catalogo.
+DISCOVERY_ALL_KEY = "feed:random:all"
+DISCOVERY_BAND_PREFIX = "feed:random:band:"
+DISCOVERY_TAG_PREFIX = "feed:random:tag:"
+DISCOVERY_TAGS_KEY = "feed:random:tags"
+VIRAL_BANDS = (("low", 0, 40), ("mid", 40, 85), ("high", 85, 101))
+
+
+def band_key(band: str) -> str:
+    return f"{DISCOVERY_BAND_PREFIX}{band}"
+
+
+def tag_key(tag: str) -> str:
+    return f"{DISCOVERY_TAG_PREFIX}{tag}"
+
+
+def random_ids(
+    count: int, tags: Optional[List[str]] = None, band: Optional[str] = None
+) -> Optional[List[str]]:
+    if tags:
+        keys = [tag_key(tag) for tag in tags]
+    elif band:
+        keys = [band_key(band)]
+    else:
+        keys = [DISCOVERY_ALL_KEY]
+
+    def _sample(client) -> List[bytes]:
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.srandmember(key, count)
+        return [item for batch in pipe.execute() for item in batch]
+
+    raw = redis_call(_sample)
+    if raw is None:
+        return None
+    ids: List[str] = []
+    for item in raw:
+        value = item.decode("utf-8")
+        if value not in ids:
+            ids.append(value)
+    return ids
+
+
+def random_tags(count: int) -> Optional[List[str]]:
+    raw = redis_call(lambda client: client.srandmember(DISCOVERY_TAGS_KEY, count))
+    if raw is None:
+        return None
+    return [item.decode("utf-8") for item in raw]
+
+
+def remove_from_discovery(item_id: str, tags: Optional[Iterable]) -> None:
+    normalized = [str(tag).strip().lower() for tag in tags or [] if str(tag).strip()]
+
+    def _remove(client) -> None:
+        pipe = client.pipeline(transaction=False)
+        pipe.srem(DISCOVERY_ALL_KEY, item_id)
+        for band, _, _ in VIRAL_BANDS:
+            pipe.srem(band_key(band), item_id)
+        for tag in normalized:
+            pipe.srem(tag_key(tag), item_id)
+            pipe.scard(tag_key(tag))
+        results = pipe.execute()
+        # Un tag sin historias deja de ofrecerse en /feed/tags.
+        empty = [tag for tag, size in zip(normalized, results[len(VIRAL_BANDS) + 2 :: 2]) if size == 0]
+        if empty:
+            client.srem(DISCOVERY_TAGS_KEY, *empty)
+
+    redis_call(_remove)
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from .settings import settings
+
+# Canal por usuario; lo publican API y worker en record_event.
+EVENTS_CHANNEL_PREFIX = "events:user:"
+
+logger = logging.getLogger("app.event_bus")
+
+
+def user_channel(user_id: str) -> str:
+    return f"{EVENTS_CHANNEL_PREFIX}{user_id}"
+
+
+class EventBus:
+    # Un solo PSUBSCRIBE por proceso; cada conexion SSE recibe sus eventos via una cola local.
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connected = False
+
+    def ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self.connected = False
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.connected = False
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        self.ensure_started()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.event_queue_size)
+        self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            self._subscribers.pop(user_id, None)
+
+    def dispatch(self, user_id: str, event: Dict[str, Any]) -> None:
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning("Dropping event for slow SSE client (user=%s)", user_id)
+
+    async def _run(self) -> None:
+        while True:
+            client = aioredis.from_url(settings.redis_url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{EVENTS_CHANNEL_PREFIX}*")
+                self.connected = True
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    channel = message["channel"].decode("utf-8")
+                    try:
+                        event = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        continue
+                    self.dispatch(channel[len(EVENTS_CHANNEL_PREFIX):], event)
+            except (RedisError, OSError) as exc:
+                logger.warning("Event bus disconnected: %s", exc)
+            finally:
+                self.connected = False
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except (RedisError, OSError):
+                    pass
+            await asyncio.sleep(settings.redis_retry_seconds)
+
+
+event_bus = EventBus()
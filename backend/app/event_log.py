@@ -0,0 +1,71 @@
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import redis_call
+from .settings import settings
+
+# Log append-only por usuario (Redis Stream con MAXLEN aproximado); compartido con el worker.
+EVENT_LOG_PREFIX = "events:log:user:"
+STREAM_ID_RE = re.compile(r"^(\d+)-(\d+)$")
+
+
+def log_key(user_id: str) -> str:
+    return f"{EVENT_LOG_PREFIX}{user_id}"
+
+
+def parse_stream_id(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    if not value:
+        return None
+    match = STREAM_ID_RE.match(value.strip())
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def stream_id_to_datetime(value: str) -> datetime:
+    millis, _ = parse_stream_id(value)
+    return datetime.utcfromtimestamp(millis / 1000)
+
+
+def append_event(client, user_id: str, event: Dict[str, Any]) -> str:
+    # El TTL se renueva con cada evento: el log de usuarios inactivos expira y un
+    # reconnect posterior cae al catch-up por DB (read_event_log devuelve None).
+    pipe = client.pipeline(transaction=False)
+    pipe.xadd(
+        log_key(user_id),
+        {"event": json.dumps(event, default=str)},
+        maxlen=settings.event_log_maxlen,
+        approximate=True,
+    )
+    pipe.expire(log_key(user_id), settings.event_log_ttl_seconds)
+    stream_id, _ = pipe.execute()
+    return stream_id.decode("utf-8")
+
+
+def latest_stream_id(user_id: str) -> Optional[str]:
+    entries = redis_call(lambda client: client.xrevrange(log_key(user_id), count=1))
+    if not entries:
+        return None
+    return entries[0][0].decode("utf-8")
+
+
+def read_event_log(user_id: str, last_id: str) -> Optional[List[Dict[str, Any]]]:
+    # None = no se puede reanudar desde el log (Redis caido o el id ya fue recortado).
+    def _read(client):
+        key = log_key(user_id)
+        first = client.xrange(key, count=1)
+        if not first:
+            return None
+        if parse_stream_id(first[0][0].decode("utf-8")) > parse_stream_id(last_id):
+            return None
+        entries = client.xrange(key, min=f"({last_id}", count=settings.event_log_maxlen)
+        events = []
+        for stream_id, fields in entries:
+            event = json.loads(fields[b"event"])
+            event["stream_id"] = stream_id.decode("utf-8")
+            events.append(event)
+        return events
+
+    return redis_call(_read)
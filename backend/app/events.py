@@ -1,20 +1,60 @@
+import json
+import uuid
 from datetime import datetime
 from typing import Any, Optional
 
 from sqlalchemy.orm import Session
 
-from .models import Event
+from .cache import redis_call
+from .event_bus import user_channel
+from .event_log import append_event
+from .models import AudioSubmission, Event
+
+
+def serialize_event(
+    event_id: str,
+    event_name: str,
+    submission_id: Optional[str],
+    timestamp: datetime,
+    payload: Any | None,
+) -> dict:
+    return {
+        "id": event_id,
+        "event_name": event_name,
+        "submission_id": submission_id,
+        "timestamp": timestamp.isoformat(),
+        "payload": payload,
+    }
+
+
+def publish_event(user_id: Optional[str], event: dict) -> None:
+    if not user_id:
+        return
+
+    def _send(client) -> None:
+        stream_id = append_event(client, user_id, event)
+        message = json.dumps({**event, "stream_id": stream_id}, default=str)
+        client.publish(user_channel(user_id), message)
+
+    redis_call(_send)
 
 
 def record_event(
     db: Session, event_name: str, submission_id: Optional[str], payload: Any | None
 ) -> None:
     event = Event(
+        id=uuid.uuid4().hex,
         event_name=event_name,
         submission_id=submission_id,
         payload=payload,
         timestamp=datetime.utcnow(),
     )
+    # Antes del commit: la submission suele estar en el identity map (sin query extra).
+    submission = db.get(AudioSubmission, submission_id) if submission_id else None
+    user_id = submission.user_id if submission else None
+    event_id, timestamp = event.id, event.timestamp
     db.add(event)
     db.commit()
-
+    publish_event(
+        user_id, serialize_event(event_id, event_name, submission_id, timestamp, payload)
+    )
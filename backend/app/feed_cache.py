@@ -0,0 +1,72 @@
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from .cache import TTLCache, etag_matches, redis_call
+from .responses import compress, negotiate_encoding, render_json
+from .settings import settings
+
+# Compartido con el worker (worker/feed_cache.py).
+FEED_GENERATION_KEY = "feed:generation"
+
+_feed_cache = TTLCache(
+    "feed_responses",
+    maxsize=settings.feed_cache_size,
+    ttl=settings.feed_cache_ttl_seconds,
+)
+_local_generation = 0
+_generation_lock = threading.Lock()
+
+
+def current_generation() -> str:
+    remote = redis_call(lambda client: client.get(FEED_GENERATION_KEY))
+    return f"{int(remote or 0)}.{_local_generation}"
+
+
+def invalidate_feed() -> None:
+    global _local_generation
+    with _generation_lock:
+        _local_generation += 1
+    redis_call(lambda client: client.incr(FEED_GENERATION_KEY))
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+async def cached_json_response(
+    request: Request,
+    key: Tuple[Hashable, ...],
+    build: Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]],
+) -> Response:
+    # Redis es sync: se consulta en el threadpool para no bloquear el event loop.
+    cache_key = (await run_in_threadpool(current_generation), *key)
+    entry = _feed_cache.get(cache_key)
+    if entry is None:
+        content, extra_headers = await build()
+        body = render_json(content)
+        # El ultimo elemento guarda el body ya comprimido por encoding.
+        entry = (make_etag(body), body, extra_headers, {})
+        _feed_cache.set(cache_key, entry)
+
+    etag, body, extra_headers, encoded = entry
+    # no-cache: el cliente guarda la respuesta pero revalida siempre (304 barato).
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+        **extra_headers,
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding and len(body) >= settings.compression_min_bytes:
+        # Se comprime una vez por entrada de cache, no por request.
+        if encoding not in encoded:
+            encoded[encoding] = await run_in_threadpool(compress, body, encoding)
+        headers["Content-Encoding"] = encoding
+        body = encoded[encoding]
+    return Response(content=body, media_type="application/json", headers=headers)
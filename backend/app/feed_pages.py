@@ -0,0 +1,106 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cache import redis_call
+
+# Formato compartido con el worker (worker/feed_pages.py), que arma las paginas al publicar.
+FEED_PAGE_SIZE = 50
+GLOBAL_PAGE_KEY = "feed:page:global"
+TAG_PAGE_PREFIX = "feed:page:tag:"
+VOTE_COUNTS_KEY = "feed:votes"
+# Paginas borradas por la API (delete/reproceso) que el worker debe rearmar.
+STALE_PAGES_KEY = "feed:page:stale"
+# Vecinos por historia (worker/related.py): id -> [[id, score], ...] ordenado.
+RELATED_KEY = "feed:related"
+
+
+def page_key(tag: Optional[str]) -> str:
+    if tag:
+        return f"{TAG_PAGE_PREFIX}{tag}"
+    return GLOBAL_PAGE_KEY
+
+
+def _page_keys(tags: Optional[Iterable]) -> List[str]:
+    keys = [GLOBAL_PAGE_KEY]
+    for tag in tags or []:
+        value = str(tag).strip().lower()
+        if value:
+            keys.append(page_key(value))
+    return keys
+
+
+def load_first_page(tag_list: List[str]) -> Optional[Tuple[List[Dict[str, Any]], bool]]:
+    keys = [page_key(tag) for tag in tag_list] or [GLOBAL_PAGE_KEY]
+    raw_pages = redis_call(lambda client: client.mget(keys))
+    if not raw_pages or any(raw is None for raw in raw_pages):
+        return None
+
+    # Varias etiquetas (OR): el top de la union sale del top de cada pagina.
+    merged: Dict[str, Dict[str, Any]] = {}
+    has_more = False
+    for raw in raw_pages:
+        document = json.loads(raw)
+        size = len(document.get("items", []))
+        if size == 0 or (document.get("has_more") and size < FEED_PAGE_SIZE):
+            # Documento vacio o recortado: la DB tiene la pagina completa.
+            return None
+        has_more = has_more or bool(document.get("has_more"))
+        for item in document.get("items", []):
+            merged.setdefault(item["id"], item)
+    items = sorted(
+        merged.values(),
+        key=lambda item: (item.get("published_at") or "", item["id"]),
+        reverse=True,
+    )
+    if len(items) > FEED_PAGE_SIZE:
+        has_more = True
+        items = items[:FEED_PAGE_SIZE]
+
+    if items:
+        ids = [item["id"] for item in items]
+        counts = redis_call(lambda client: client.hmget(VOTE_COUNTS_KEY, ids))
+        if counts:
+            for item, count in zip(items, counts):
+                if count is not None:
+                    item["vote_count"] = int(count)
+    return items, has_more
+
+
+def increment_vote_count(item_id: str) -> None:
+    redis_call(lambda client: client.hincrby(VOTE_COUNTS_KEY, item_id, 1))
+
+
+def remove_from_feed_pages(item_id: str, tags: Optional[Iterable]) -> None:
+    # Se borran en vez de recortarlas: sin documento la API lee la DB y el
+    # worker las rearma completas (worker/feed_pages.py refresh_stale_feed_pages).
+    keys = _page_keys(tags)
+
+    def _remove(client) -> None:
+        pipe = client.pipeline(transaction=False)
+        pipe.delete(*keys)
+        pipe.sadd(STALE_PAGES_KEY, *keys)
+        pipe.hdel(VOTE_COUNTS_KEY, item_id)
+        pipe.execute()
+
+    redis_call(_remove)
+
+
+def mark_feed_pages_stale(tags: Optional[Iterable]) -> None:
+    # Paginas con datos viejos de historias que siguen publicadas (p. ej. la foto
+    # de perfil usada como portada): mismo borrado + rearmado por el worker.
+    keys = _page_keys(tags)
+
+    def _mark(client) -> None:
+        pipe = client.pipeline(transaction=False)
+        pipe.delete(*keys)
+        pipe.sadd(STALE_PAGES_KEY, *keys)
+        pipe.execute()
+
+    redis_call(_mark)
+
+
+def load_related_ids(item_id: str) -> Optional[List[str]]:
+    raw = redis_call(lambda client: client.hget(RELATED_KEY, item_id))
+    if raw is None:
+        return None
+    return [entry[0] for entry in json.loads(raw)]
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import redis
+from sqlalchemy import text
+
+from .db import engine
+from .settings import settings
+from .storage import create_s3_client
+
+logger = logging.getLogger("app.health")
+
+
+@dataclass
+class DependencyState:
+    ready: bool = False
+    latency_ms: Optional[float] = None
+    last_checked: Optional[datetime] = None
+    last_success: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+_probe_s3_client = None
+_probe_redis_client = None
+
+
+def _probe_db() -> None:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+def _probe_storage() -> None:
+    # Un HEAD de un bucket (sin reintentos) en vez de list_buckets.
+    global _probe_s3_client
+    if _probe_s3_client is None:
+        _probe_s3_client = create_s3_client(
+            settings.s3_endpoint, timeout=settings.health_probe_timeout_seconds
+        )
+    _probe_s3_client.head_bucket(Bucket=settings.s3_private_bucket)
+
+
+def _probe_queue() -> None:
+    global _probe_redis_client
+    if _probe_redis_client is None:
+        _probe_redis_client = redis.Redis.from_url(
+            settings.redis_url,
+            socket_timeout=settings.health_probe_timeout_seconds,
+            socket_connect_timeout=settings.health_probe_timeout_seconds,
+        )
+    if not _probe_redis_client.ping():
+        raise RuntimeError("ping returned false")
+
+
+PROBES: Dict[str, Callable[[], None]] = {
+    "db": _probe_db,
+    "storage": _probe_storage,
+    "queue": _probe_queue,
+}
+
+
+class HealthMonitor:
+    # Una tarea por proceso sondea cada N segundos; /health solo lee este estado.
+
+    def __init__(self, probes: Dict[str, Callable[[], None]]) -> None:
+        self._probes = probes
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(probes), thread_name_prefix="health-probe"
+        )
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.states: Dict[str, DependencyState] = {name: DependencyState() for name in probes}
+        self.checked_at: Optional[datetime] = None
+
+    def ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._inflight.clear()
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def check_once(self) -> None:
+        await asyncio.gather(*(self._check(name, probe) for name, probe in self._probes.items()))
+        self.checked_at = datetime.utcnow()
+
+    async def _check(self, name: str, probe: Callable[[], None]) -> None:
+        state = self.states[name]
+        # Si una dependencia cuelga, la siguiente ronda espera el mismo probe
+        # en vez de apilar otro hilo.
+        future = self._inflight.get(name)
+        if future is None or future.done():
+            future = asyncio.get_running_loop().run_in_executor(self._executor, probe)
+            self._inflight[name] = future
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(future), timeout=settings.health_probe_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            state.ready = False
+            state.error = "timeout"
+        except Exception as exc:
+            state.ready = False
+            state.error = f"{type(exc).__name__}: {exc}"[:200]
+        else:
+            state.ready = True
+            state.error = None
+            state.last_success = datetime.utcnow()
+        state.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        state.last_checked = datetime.utcnow()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check_once()
+            except Exception as exc:
+                logger.warning("Health check round failed: %s", exc)
+            await asyncio.sleep(settings.health_check_interval_seconds)
+
+
+health_monitor = HealthMonitor(PROBES)
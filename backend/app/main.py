@@ -1,17 +1,19 @@
+from dataclasses import asdict
+from typing import Dict
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from botocore.exceptions import BotoCoreError, ClientError
-from redis.exceptions import RedisError
-from sqlalchemy import text
-
-from .api import auth, events, feed, profile, submissions, votes
-from .db import Base, engine, ensure_schema
-from .schemas import HealthResponse
-from .queue import get_redis_client
+
+from .api import auth, events, feed, media, profile, radio, submissions, uploads, votes
+from .cache import cache_stats
+from .db import ensure_schema
+from .event_bus import event_bus
+from .health import health_monitor
+from .responses import CompressionMiddleware, FastJSONResponse
+from .schemas import DependencyHealth, HealthResponse
 from .settings import settings
-from .storage import get_internal_s3_client
 
-app = FastAPI(title="Winivox MVP API")
+app = FastAPI(title="Winivox MVP API", default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,57 +21,61 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
+app.add_middleware(CompressionMiddleware)
 
 
 @app.on_event("startup")
 def startup() -> None:
-    Base.metadata.create_all(bind=engine)
+    # Migraciones versionadas: si la base esta al dia es una sola consulta.
     ensure_schema()
+    health_monitor.ensure_started()
 
 
-@app.get("/health", response_model=HealthResponse)
-def health() -> HealthResponse:
-    db_ready = False
-    storage_ready = False
-    queue_ready = False
-
-    try:
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        db_ready = True
-    except Exception:
-        db_ready = False
-
-    try:
-        client = get_internal_s3_client()
-        client.list_buckets()
-        storage_ready = True
-    except (BotoCoreError, ClientError):
-        storage_ready = False
-    except Exception:
-        storage_ready = False
-
-    try:
-        client = get_redis_client()
-        queue_ready = bool(client.ping())
-    except RedisError:
-        queue_ready = False
-    except Exception:
-        queue_ready = False
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await event_bus.stop()
+    await health_monitor.stop()
+
+
+@app.get("/health/live", response_model=Dict[str, str])
+def health_live() -> Dict[str, str]:
+    # Liveness: no toca dependencias.
+    return {"status": "ok"}
 
+
+@app.get("/health", response_model=HealthResponse)
+async def health() -> HealthResponse:
+    health_monitor.ensure_started()
+    if health_monitor.checked_at is None:
+        # Primer request antes del primer sondeo.
+        await health_monitor.check_once()
+    states = health_monitor.states
     return HealthResponse(
-        status="ok",
+        status="ok" if all(state.ready for state in states.values()) else "degraded",
         llm_ready=bool(settings.openai_api_key),
-        db_ready=db_ready,
-        storage_ready=storage_ready,
-        queue_ready=queue_ready,
+        db_ready=states["db"].ready,
+        storage_ready=states["storage"].ready,
+        queue_ready=states["queue"].ready,
+        checked_at=health_monitor.checked_at,
+        dependencies={
+            name: DependencyHealth(**asdict(state)) for name, state in states.items()
+        },
     )
 
 
+@app.get("/health/cache", response_model=Dict[str, Dict[str, float]])
+def health_cache() -> Dict[str, Dict[str, float]]:
+    return cache_stats()
+
+
 app.include_router(auth.router)
 app.include_router(profile.router)
 app.include_router(submissions.router)
+app.include_router(uploads.router)
 app.include_router(feed.router)
+app.include_router(radio.router)
 app.include_router(votes.router)
 app.include_router(events.router)
+app.include_router(media.router)
@@ -0,0 +1,368 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger("app.migrations")
+
+# Lock de sesion en Postgres: una sola instancia migra, el resto espera.
+MIGRATION_LOCK_ID = 72_460_001
+
+CONCURRENT_INDEX_RE = re.compile(r"CREATE INDEX CONCURRENTLY IF NOT EXISTS (\w+)")
+# NULL si el indice no existe; si no, si quedo valido (un build CONCURRENTLY
+# cancelado o fallido deja el indice con indisvalid = false).
+INDEX_VALID_SQL = "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: Sequence[str]
+    # CREATE INDEX CONCURRENTLY no puede correr dentro de una transaccion;
+    # esos pasos van en autocommit y tienen que ser idempotentes (IF NOT EXISTS).
+    transactional: bool = True
+
+
+def concurrent_index(
+    name: str, table: str, columns: str, where: Optional[str] = None, using: str = ""
+) -> str:
+    method = f" USING {using}" if using else ""
+    predicate = f" WHERE {where}" if where else ""
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+        f"ON {table}{method} ({columns}){predicate}"
+    )
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "baseline",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id VARCHAR PRIMARY KEY,
+                email VARCHAR NOT NULL,
+                password_hash VARCHAR NOT NULL,
+                bio TEXT,
+                social_links JSON,
+                profile_image_key VARCHAR,
+                created_at TIMESTAMP NOT NULL
+            )
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+            """
+            CREATE TABLE IF NOT EXISTS audio_submissions (
+                id VARCHAR PRIMARY KEY,
+                user_id VARCHAR NOT NULL REFERENCES users (id),
+                status VARCHAR NOT NULL,
+                processing_step INTEGER NOT NULL,
+                original_audio_key VARCHAR,
+                public_audio_key VARCHAR,
+                transcript_preview TEXT,
+                title TEXT,
+                summary TEXT,
+                tags JSON,
+                viral_analysis INTEGER,
+                moderation_result VARCHAR,
+                anonymization_mode VARCHAR NOT NULL,
+                description TEXT,
+                tags_suggested JSON,
+                cover_image_key VARCHAR,
+                created_at TIMESTAMP NOT NULL,
+                published_at TIMESTAMP
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS ix_audio_submissions_status "
+            "ON audio_submissions (status)",
+            """
+            CREATE TABLE IF NOT EXISTS votes (
+                id VARCHAR PRIMARY KEY,
+                user_id VARCHAR NOT NULL REFERENCES users (id),
+                audio_id VARCHAR NOT NULL REFERENCES audio_submissions (id),
+                created_at TIMESTAMP NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS events (
+                id VARCHAR PRIMARY KEY,
+                event_name VARCHAR NOT NULL,
+                event_version INTEGER NOT NULL,
+                submission_id VARCHAR,
+                timestamp TIMESTAMP NOT NULL,
+                payload JSON
+            )
+            """,
+            # Bases creadas con create_all antes de estas columnas (ex ensure_schema).
+            "ALTER TABLE users ADD COLUMN IF NOT EXISTS bio TEXT",
+            "ALTER TABLE users ADD COLUMN IF NOT EXISTS social_links JSON",
+            "ALTER TABLE users ADD COLUMN IF NOT EXISTS profile_image_key TEXT",
+            "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS summary TEXT",
+            "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS title TEXT",
+            "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS viral_analysis INTEGER",
+            "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS description TEXT",
+            "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS tags_suggested JSON",
+            "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS cover_image_key TEXT",
+        ],
+    ),
+    Migration(
+        2,
+        "hot_path_indexes",
+        [
+            concurrent_index(
+                "ix_audio_submissions_status_published",
+                "audio_submissions",
+                "status, published_at, id",
+            ),
+            concurrent_index(
+                "ix_audio_submissions_status_viral",
+                "audio_submissions",
+                "status, viral_analysis, published_at",
+            ),
+            concurrent_index(
+                "ix_audio_submissions_user_created", "audio_submissions", "user_id, created_at"
+            ),
+            concurrent_index("ix_votes_audio_id", "votes", "audio_id"),
+            concurrent_index("ix_votes_user_audio", "votes", "user_id, audio_id"),
+            concurrent_index(
+                "ix_events_submission_timestamp", "events", "submission_id, timestamp"
+            ),
+            # Solo Postgres (no esta en models.py): filtro por tag del feed,
+            # CAST(tags AS JSONB) @> '["tag"]'.
+            concurrent_index(
+                "ix_audio_submissions_tags",
+                "audio_submissions",
+                "(tags::jsonb) jsonb_path_ops",
+                using="gin",
+            ),
+        ],
+        transactional=False,
+    ),
+    Migration(
+        3,
+        "partition_events_by_month",
+        [
+            # Particionado por rango mensual de timestamp; la PK tiene que incluirlo.
+            "ALTER TABLE events RENAME TO events_legacy",
+            "ALTER INDEX IF EXISTS events_pkey RENAME TO events_legacy_pkey",
+            "ALTER INDEX IF EXISTS ix_events_submission_timestamp "
+            "RENAME TO ix_events_legacy_submission_timestamp",
+            """
+            CREATE TABLE events (
+                id VARCHAR NOT NULL,
+                event_name VARCHAR NOT NULL,
+                event_version INTEGER NOT NULL,
+                submission_id VARCHAR,
+                timestamp TIMESTAMP NOT NULL,
+                payload JSON,
+                PRIMARY KEY (id, timestamp)
+            ) PARTITION BY RANGE (timestamp)
+            """,
+            "CREATE TABLE events_default PARTITION OF events DEFAULT",
+            "CREATE INDEX ix_events_submission_timestamp ON events (submission_id, timestamp)",
+            # Una particion por mes desde el evento mas viejo hasta el mes que viene;
+            # despues las crea el worker (worker/event_archive.py).
+            """
+            DO $$
+            DECLARE
+                month_start date;
+            BEGIN
+                FOR month_start IN
+                    SELECT generate_series(
+                        date_trunc('month', COALESCE((SELECT min(timestamp) FROM events_legacy), now())),
+                        date_trunc('month', now()) + interval '1 month',
+                        interval '1 month'
+                    )::date
+                LOOP
+                    EXECUTE format(
+                        'CREATE TABLE IF NOT EXISTS %I PARTITION OF events FOR VALUES FROM (%L) TO (%L)',
+                        'events_' || to_char(month_start, 'YYYY_MM'),
+                        month_start,
+                        (month_start + interval '1 month')::date
+                    );
+                END LOOP;
+            END $$
+            """,
+            "INSERT INTO events SELECT id, event_name, event_version, submission_id, "
+            "timestamp, payload FROM events_legacy",
+            "DROP TABLE events_legacy",
+        ],
+    ),
+    Migration(
+        4,
+        "submissions_updated_at",
+        [
+            "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP",
+            "UPDATE audio_submissions SET updated_at = COALESCE(published_at, created_at) "
+            "WHERE updated_at IS NULL",
+        ],
+    ),
+    Migration(
+        5,
+        "submissions_updated_at_index",
+        [
+            # Watermark del export de analytics (worker/analytics_export.py).
+            concurrent_index(
+                "ix_audio_submissions_updated", "audio_submissions", "updated_at, id"
+            ),
+        ],
+        transactional=False,
+    ),
+    Migration(
+        6,
+        "submissions_search_vector",
+        [
+            "CREATE EXTENSION IF NOT EXISTS unaccent",
+            # spanish + unaccent: minusculas y sin tildes, igual que llm._normalize_text.
+            """
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'winivox_es') THEN
+                    CREATE TEXT SEARCH CONFIGURATION winivox_es (COPY = spanish);
+                    ALTER TEXT SEARCH CONFIGURATION winivox_es
+                        ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+                END IF;
+            END
+            $$
+            """,
+            "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS search_vector tsvector",
+            """
+            CREATE OR REPLACE FUNCTION audio_submissions_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector :=
+                    setweight(to_tsvector('winivox_es', coalesce(NEW.title, '')), 'A')
+                    || setweight(to_tsvector('winivox_es', coalesce(NEW.summary, '')), 'B')
+                    || setweight(
+                        to_tsvector('winivox_es', coalesce(NEW.transcript_preview, '')), 'C'
+                    );
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS audio_submissions_search_vector ON audio_submissions",
+            # Solo se recalcula cuando el worker escribe transcript/metadata.
+            "CREATE TRIGGER audio_submissions_search_vector "
+            "BEFORE INSERT OR UPDATE OF title, summary, transcript_preview "
+            "ON audio_submissions FOR EACH ROW EXECUTE FUNCTION audio_submissions_search_vector()",
+            "UPDATE audio_submissions SET title = title WHERE search_vector IS NULL",
+        ],
+    ),
+    Migration(
+        7,
+        "submissions_search_index",
+        [
+            concurrent_index(
+                "ix_audio_submissions_search", "audio_submissions", "search_vector", using="gin"
+            ),
+        ],
+        transactional=False,
+    ),
+    Migration(
+        8,
+        "submissions_multipart_upload",
+        [
+            "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS upload_id VARCHAR",
+            "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS upload_size BIGINT",
+            "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS upload_part_size INTEGER",
+            "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS upload_parts JSON",
+        ],
+    ),
+]
+
+# El worker exige esta version al arrancar (worker/db.py: REQUIRED_SCHEMA_VERSION).
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn: Connection) -> int:
+    exists = conn.execute(text("SELECT to_regclass('schema_migrations')")).scalar()
+    if not exists:
+        return 0
+    return int(
+        conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+    )
+
+
+def _record(conn: Connection, migration: Migration) -> None:
+    conn.execute(
+        text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+        {"version": migration.version, "name": migration.name},
+    )
+
+
+def _index_valid(conn: Connection, name: str) -> Optional[bool]:
+    return conn.execute(text(INDEX_VALID_SQL), {"name": name}).scalar()
+
+
+def _run_concurrent(conn: Connection, statement: str) -> None:
+    match = CONCURRENT_INDEX_RE.search(statement)
+    if not match:
+        conn.execute(text(statement))
+        return
+    name = match.group(1)
+    # IF NOT EXISTS no reconstruye un indice INVALID de un intento previo: se
+    # descarta antes y se verifica despues.
+    if _index_valid(conn, name) is False:
+        logger.warning("Dropping invalid index %s before rebuilding it", name)
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    conn.execute(text(statement))
+    if not _index_valid(conn, name):
+        raise RuntimeError(f"Index {name} is not valid after CREATE INDEX CONCURRENTLY")
+
+
+def _apply(engine: Engine, migration: Migration) -> None:
+    if migration.transactional:
+        with engine.begin() as conn:
+            for statement in migration.statements:
+                conn.execute(text(statement))
+            _record(conn, migration)
+        return
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in migration.statements:
+            _run_concurrent(conn, statement)
+        _record(conn, migration)
+
+
+def run_migrations(engine: Engine) -> int:
+    # Camino rapido: una consulta si la base ya esta al dia (arranques normales).
+    with engine.connect() as conn:
+        version = current_version(conn)
+    if version >= SCHEMA_VERSION:
+        return version
+
+    with engine.connect() as lock_conn:
+        lock_conn = lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            lock_conn.execute(
+                text(
+                    "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                    "version INTEGER PRIMARY KEY, "
+                    "name VARCHAR NOT NULL, "
+                    "applied_at TIMESTAMP NOT NULL DEFAULT now())"
+                )
+            )
+            # Otra instancia pudo haber migrado mientras esperabamos el lock.
+            version = current_version(lock_conn)
+            for migration in MIGRATIONS:
+                if migration.version <= version:
+                    continue
+                logger.info("Applying migration %s_%s", migration.version, migration.name)
+                _apply(engine, migration)
+                version = migration.version
+        finally:
+            lock_conn.execute(
+                text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID}
+            )
+    return version
+
+
+if __name__ == "__main__":
+    from .db import engine
+
+    logging.basicConfig(level=logging.INFO)
+    print(f"schema version {run_migrations(engine)}")
@@ -3,13 +3,16 @@ from datetime import datetime
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
 )
+from sqlalchemy.orm import deferred
 
 from .db import Base
 
@@ -28,6 +31,14 @@ class User(Base):
 
 class AudioSubmission(Base):
     __tablename__ = "audio_submissions"
+    # Indices pensados para las rutas (feed, low-serendipia, listados por usuario).
+    # Se crean en Postgres via migrations.py; en SQLite/tests via create_all.
+    __table_args__ = (
+        Index("ix_audio_submissions_status_published", "status", "published_at", "id"),
+        Index("ix_audio_submissions_status_viral", "status", "viral_analysis", "published_at"),
+        Index("ix_audio_submissions_user_created", "user_id", "created_at"),
+        Index("ix_audio_submissions_updated", "updated_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: uuid.uuid4().hex)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -35,18 +46,27 @@ class AudioSubmission(Base):
     processing_step = Column(Integer, default=0, nullable=False)
     original_audio_key = Column(String, nullable=True)
     public_audio_key = Column(String, nullable=True)
-    transcript_preview = Column(Text, nullable=True)
+    # Textos largos: solo se cargan en endpoints de detalle (undefer_group("detail")).
+    transcript_preview = deferred(Column(Text, nullable=True), group="detail")
     title = Column(Text, nullable=True)
     summary = Column(Text, nullable=True)
     tags = Column(JSON, nullable=True)
     viral_analysis = Column(Integer, nullable=True)
     moderation_result = Column(String, nullable=True)
     anonymization_mode = Column(String, default="SOFT", nullable=False)
-    description = Column(Text, nullable=True)
+    description = deferred(Column(Text, nullable=True), group="detail")
     tags_suggested = Column(JSON, nullable=True)
     cover_image_key = Column(String, nullable=True)
+    # Upload multipart en curso (app/uploads.py); solo lo cargan esas rutas.
+    upload_id = deferred(Column(String, nullable=True), group="upload")
+    upload_size = deferred(Column(BigInteger, nullable=True), group="upload")
+    upload_part_size = deferred(Column(Integer, nullable=True), group="upload")
+    upload_parts = deferred(Column(JSON, nullable=True), group="upload")
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     published_at = Column(DateTime, nullable=True)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True
+    )
 
     @property
     def high_potential(self) -> bool | None:
@@ -57,6 +77,10 @@ class AudioSubmission(Base):
 
 class Vote(Base):
     __tablename__ = "votes"
+    __table_args__ = (
+        Index("ix_votes_audio_id", "audio_id"),
+        Index("ix_votes_user_audio", "user_id", "audio_id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: uuid.uuid4().hex)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -66,6 +90,10 @@ class Vote(Base):
 
 class Event(Base):
     __tablename__ = "events"
+    # En Postgres la tabla esta particionada por mes (PK real: id + timestamp).
+    __table_args__ = (
+        Index("ix_events_submission_timestamp", "submission_id", "timestamp"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: uuid.uuid4().hex)
     event_name = Column(String, nullable=False)
@@ -0,0 +1,112 @@
+import json
+import logging
+import subprocess
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from .settings import settings
+from .storage import get_internal_s3_client
+
+logger = logging.getLogger("app.preflight")
+
+MISSING_OBJECT_CODES = {"404", "NoSuchKey", "NotFound"}
+
+
+class UploadMissing(Exception):
+    pass
+
+
+class UploadInvalid(Exception):
+    # El mensaje es el motivo que ve el cliente.
+    pass
+
+
+@dataclass(frozen=True)
+class AudioProbe:
+    codec: str
+    duration: Optional[float]
+
+
+def head_upload(bucket: str, key: str) -> int:
+    try:
+        head = get_internal_s3_client().head_object(Bucket=bucket, Key=key)
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in MISSING_OBJECT_CODES:
+            raise UploadMissing(key) from exc
+        raise
+    return head["ContentLength"]
+
+
+def probe_audio(url: str) -> Optional[AudioProbe]:
+    # ffprobe sobre HTTP pide solo los rangos que necesita (header, o el indice
+    # al final en MP4), acotado por -probesize. None: no se pudo verificar.
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-probesize",
+        str(settings.preflight_probe_bytes),
+        "-rw_timeout",
+        str(int(settings.preflight_probe_timeout_seconds * 1_000_000)),
+        "-show_entries",
+        "stream=codec_type,codec_name:format=duration",
+        "-of",
+        "json",
+        url,
+    ]
+    try:
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=settings.preflight_probe_timeout_seconds,
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired) as exc:
+        logger.warning("Preflight probe skipped: %s", exc)
+        return None
+    if result.returncode != 0:
+        raise UploadInvalid("File is not a readable audio file")
+    info = json.loads(result.stdout or "{}")
+    audio = next(
+        (stream for stream in info.get("streams", []) if stream.get("codec_type") == "audio"),
+        None,
+    )
+    if audio is None:
+        raise UploadInvalid("File has no audio stream")
+    duration = info.get("format", {}).get("duration")
+    # WebM de MediaRecorder no trae duracion en el header: no se rechaza por eso.
+    return AudioProbe(
+        codec=audio.get("codec_name") or "",
+        duration=float(duration) if duration not in (None, "N/A") else None,
+    )
+
+
+def check_probe(probe: AudioProbe) -> None:
+    if not any(fnmatch(probe.codec, pattern) for pattern in settings.preflight_allowed_codecs):
+        raise UploadInvalid(f"Unsupported audio codec: {probe.codec or 'unknown'}")
+    if probe.duration is None:
+        return
+    if probe.duration < settings.preflight_min_duration_seconds:
+        raise UploadInvalid("Recording is too short")
+    if probe.duration > settings.preflight_max_duration_seconds:
+        raise UploadInvalid("Recording is too long")
+
+
+def preflight_upload(bucket: str, key: str) -> None:
+    size = head_upload(bucket, key)
+    if size < settings.preflight_min_bytes:
+        raise UploadInvalid("File is empty")
+    if size > settings.upload_max_bytes:
+        raise UploadInvalid("File is too large")
+    url = get_internal_s3_client().generate_presigned_url(
+        "get_object",
+        Params={"Bucket": bucket, "Key": key},
+        ExpiresIn=max(int(settings.preflight_probe_timeout_seconds) * 2, 60),
+    )
+    probe = probe_audio(url)
+    if probe is not None:
+        check_probe(probe)
@@ -1,8 +1,13 @@
 import redis
+from redis.exceptions import RedisError
 
 from .settings import settings
 
 QUEUE_NAME = "audio:queue"
+# Quien encola un upload (/uploaded o la notificacion de MinIO, worker/ingest.py) lo
+# reclama con SET NX; el worker lo suelta si se detiene esperando las opciones.
+INGEST_QUEUED_PREFIX = "ingest:queued:"
+INGEST_CLAIM_TTL_SECONDS = 24 * 3600
 
 
 _redis_client = None
@@ -19,3 +24,18 @@ def enqueue_submission(submission_id: str) -> None:
     client = get_redis_client()
     client.rpush(QUEUE_NAME, submission_id)
 
+
+
+def claim_enqueue(submission_id: str) -> bool:
+    try:
+        return bool(
+            get_redis_client().set(
+                f"{INGEST_QUEUED_PREFIX}{submission_id}",
+                "api",
+                nx=True,
+                ex=INGEST_CLAIM_TTL_SECONDS,
+            )
+        )
+    except RedisError:
+        # Sin Redis tampoco hay notificaciones que compitan; enqueue_submission responde 503.
+        return True
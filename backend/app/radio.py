@@ -0,0 +1,107 @@
+import json
+import math
+import secrets
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .queue import get_redis_client
+from .settings import settings
+
+# Sesion de escucha: hash con filtros/cursor, lista con la cola y set con lo escuchado.
+RADIO_PREFIX = "radio:session:"
+
+Candidate = Tuple[str, Optional[datetime], int]
+
+
+def _keys(session_id: str) -> Tuple[str, str, str]:
+    base = f"{RADIO_PREFIX}{session_id}"
+    return base, f"{base}:queue", f"{base}:heard"
+
+
+def _touch(pipe, session_id: str) -> None:
+    for key in _keys(session_id):
+        pipe.expire(key, settings.radio_session_ttl_seconds)
+
+
+def create_session(tags: List[str]) -> str:
+    session_id = secrets.token_urlsafe(16)
+    meta, _, _ = _keys(session_id)
+    pipe = get_redis_client().pipeline()
+    pipe.hset(meta, mapping={"tags": json.dumps(tags), "cursor": "", "skips": 0})
+    _touch(pipe, session_id)
+    pipe.execute()
+    return session_id
+
+
+def load_session(session_id: str) -> Optional[Dict[str, str]]:
+    meta, _, _ = _keys(session_id)
+    raw = get_redis_client().hgetall(meta)
+    if not raw:
+        return None
+    return {key.decode("utf-8"): value.decode("utf-8") for key, value in raw.items()}
+
+
+def session_tags(session: Dict[str, str]) -> List[str]:
+    return json.loads(session.get("tags") or "[]")
+
+
+def queue_length(session_id: str) -> int:
+    _, queue, _ = _keys(session_id)
+    return get_redis_client().llen(queue)
+
+
+def advance(session_id: str, skipped: bool) -> Tuple[Optional[str], List[str]]:
+    # LPOP + SADD + LRANGE de 2: O(1) por pedido.
+    meta, queue, heard = _keys(session_id)
+    pipe = get_redis_client().pipeline()
+    pipe.lpop(queue)
+    pipe.lrange(queue, 0, 1)
+    current, upcoming = pipe.execute()
+    pipe = get_redis_client().pipeline()
+    if current:
+        pipe.sadd(heard, current)
+    if skipped:
+        pipe.hincrby(meta, "skips", 1)
+    _touch(pipe, session_id)
+    pipe.execute()
+    return (
+        current.decode("utf-8") if current else None,
+        [item.decode("utf-8") for item in upcoming],
+    )
+
+
+def rank_candidates(candidates: Sequence[Candidate], now: datetime) -> List[str]:
+    # Votos con retornos decrecientes, atenuados por antiguedad (vida media configurable).
+    def score(candidate: Candidate) -> float:
+        _, published_at, votes = candidate
+        age_hours = (now - published_at).total_seconds() / 3600 if published_at else 0.0
+        decay = 0.5 ** (max(age_hours, 0.0) / settings.radio_recency_half_life_hours)
+        return (1.0 + math.log1p(votes)) * decay
+
+    return [candidate[0] for candidate in sorted(candidates, key=score, reverse=True)]
+
+
+def extend_queue(session_id: str, ranked_ids: List[str], cursor: str) -> int:
+    meta, queue, heard = _keys(session_id)
+    client = get_redis_client()
+    queued = {item.decode("utf-8") for item in client.lrange(queue, 0, -1)}
+    fresh = [item for item in ranked_ids if item not in queued]
+    if fresh:
+        already_heard = client.smismember(heard, fresh)
+        fresh = [item for item, seen in zip(fresh, already_heard) if not seen]
+    pipe = client.pipeline()
+    if fresh:
+        pipe.rpush(queue, *fresh)
+    pipe.hset(meta, "cursor", cursor)
+    _touch(pipe, session_id)
+    pipe.execute()
+    return len(fresh)
+
+
+def start_new_lap(session_id: str) -> None:
+    # Se escucho todo lo que matchea: se vuelve a empezar.
+    meta, _, heard = _keys(session_id)
+    pipe = get_redis_client().pipeline()
+    pipe.delete(heard)
+    pipe.hset(meta, "cursor", "")
+    pipe.execute()
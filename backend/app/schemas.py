@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class UserCreate(BaseModel):
@@ -68,6 +68,46 @@ class SubmissionUploadResponse(BaseModel):
     object_key: str
 
 
+class MultipartInitRequest(BaseModel):
+    content_type: str
+    size: int = Field(gt=0)
+
+
+class MultipartPart(BaseModel):
+    part_number: int = Field(ge=1)
+    etag: str
+    size: int = Field(ge=0)
+
+
+class MultipartPartsReport(BaseModel):
+    parts: List[MultipartPart]
+
+
+class MultipartUrlsRequest(BaseModel):
+    # Vacio: las siguientes partes que faltan.
+    part_numbers: Optional[List[int]] = None
+
+
+class MultipartPartUrl(BaseModel):
+    part_number: int
+    url: str
+
+
+class MultipartUrlsResponse(BaseModel):
+    urls: List[MultipartPartUrl]
+    expires_in: int
+
+
+class MultipartStateResponse(BaseModel):
+    upload_id: str
+    size: int
+    part_size: int
+    part_count: int
+    parts_completed: int
+    bytes_uploaded: int
+    missing_parts: List[int]
+
+
 class SubmissionUploadedRequest(BaseModel):
     anonymization_mode: str = "SOFT"
     description: Optional[str] = None
@@ -108,6 +148,13 @@ class FeedItem(BaseModel):
     vote_count: int = 0
 
 
+class RadioResponse(BaseModel):
+    session_id: str
+    current: Optional[FeedItem] = None
+    # Siguientes dos, con URL firmada para que el player los precargue.
+    upcoming: List[FeedItem] = []
+
+
 class StoryResponse(BaseModel):
     id: str
     user_id: str
@@ -121,6 +168,17 @@ class StoryResponse(BaseModel):
     vote_count: int = 0
 
 
+class StoryBatchItem(BaseModel):
+    # Mismo ETag que devuelve /feed/{id} para esta historia.
+    etag: str
+    story: StoryResponse
+
+
+class StoryBatchResponse(BaseModel):
+    items: List[StoryBatchItem]
+    missing: List[str] = []
+
+
 class VoteCreate(BaseModel):
     audio_id: str
 
@@ -131,12 +189,22 @@ class VoteResponse(BaseModel):
     created_at: datetime
 
 
+class DependencyHealth(BaseModel):
+    ready: bool
+    latency_ms: Optional[float] = None
+    last_checked: Optional[datetime] = None
+    last_success: Optional[datetime] = None
+    error: Optional[str] = None
+
+
 class HealthResponse(BaseModel):
     status: str
     llm_ready: bool
     db_ready: bool = False
     storage_ready: bool = False
     queue_ready: bool = False
+    checked_at: Optional[datetime] = None
+    dependencies: Dict[str, DependencyHealth] = {}
 
 
 class EventResponse(BaseModel):
@@ -1,21 +1,42 @@
+import math
+import re
+import time
+from urllib.parse import quote
+
 from botocore.config import Config
 import boto3
 
+from .cache import TTLCache, redis_call
 from .settings import settings
 
+PRESIGN_REDIS_PREFIX = "presign:"
+# El worker publica `public-<sha256[:16]>.<ext>`: el contenido nunca cambia para esa key.
+VERSIONED_KEY_RE = re.compile(r"/public-[0-9a-f]{16}\.[a-z0-9]+$")
+
 
 _s3_client = None
 _internal_s3_client = None
+_presign_cache = TTLCache(
+    "presign",
+    maxsize=settings.presign_cache_size,
+    ttl=settings.presign_expires_seconds,
+)
 
 
-def create_s3_client(endpoint: str):
+def create_s3_client(endpoint: str, timeout: float | None = None):
+    config = Config(signature_version="s3v4", s3={"addressing_style": "path"})
+    if timeout is not None:
+        # Clientes de sondeo: fallar rapido, sin reintentos.
+        config = config.merge(
+            Config(connect_timeout=timeout, read_timeout=timeout, retries={"max_attempts": 1})
+        )
     return boto3.client(
         "s3",
         endpoint_url=endpoint,
         aws_access_key_id=settings.s3_access_key,
         aws_secret_access_key=settings.s3_secret_key,
         region_name=settings.s3_region,
-        config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+        config=config,
     )
 
 
@@ -42,10 +63,123 @@ def generate_presigned_put(bucket: str, key: str, content_type: str) -> str:
     )
 
 
-def generate_presigned_get(bucket: str, key: str) -> str:
+def create_multipart_upload(bucket: str, key: str, content_type: str) -> str:
+    response = get_internal_s3_client().create_multipart_upload(
+        Bucket=bucket, Key=key, ContentType=content_type
+    )
+    return response["UploadId"]
+
+
+def generate_presigned_upload_part(
+    bucket: str, key: str, upload_id: str, part_number: int
+) -> str:
+    # Firmado con el endpoint publico: el cliente sube cada parte directo a MinIO.
+    return get_s3_client().generate_presigned_url(
+        "upload_part",
+        Params={
+            "Bucket": bucket,
+            "Key": key,
+            "UploadId": upload_id,
+            "PartNumber": part_number,
+        },
+        ExpiresIn=settings.multipart_url_expires_seconds,
+    )
+
+
+def list_uploaded_parts(bucket: str, key: str, upload_id: str) -> list[dict]:
+    client = get_internal_s3_client()
+    parts: list[dict] = []
+    marker = 0
+    while True:
+        response = client.list_parts(
+            Bucket=bucket, Key=key, UploadId=upload_id, PartNumberMarker=marker
+        )
+        parts.extend(
+            {"part_number": part["PartNumber"], "etag": part["ETag"], "size": part["Size"]}
+            for part in response.get("Parts", [])
+        )
+        if not response.get("IsTruncated"):
+            return parts
+        marker = response["NextPartNumberMarker"]
+
+
+def complete_multipart_upload(
+    bucket: str, key: str, upload_id: str, parts: list[dict]
+) -> None:
+    get_internal_s3_client().complete_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={
+            "Parts": [
+                {"PartNumber": part["part_number"], "ETag": part["etag"]} for part in parts
+            ]
+        },
+    )
+
+
+def abort_multipart_upload(bucket: str, key: str, upload_id: str) -> None:
+    get_internal_s3_client().abort_multipart_upload(
+        Bucket=bucket, Key=key, UploadId=upload_id
+    )
+
+
+def _sign_get(bucket: str, key: str) -> str:
     client = get_s3_client()
     return client.generate_presigned_url(
         "get_object",
         Params={"Bucket": bucket, "Key": key},
-        ExpiresIn=3600,
+        ExpiresIn=settings.presign_expires_seconds,
+    )
+
+
+def _presign_window(now: float) -> tuple[int, float]:
+    # Ventanas fijas: toda URL firmada dentro de una ventana se reutiliza hasta
+    # que termina, y siempre le quedan al menos refresh_margin segundos de vida.
+    length = max(
+        settings.presign_expires_seconds - settings.presign_refresh_margin_seconds, 1
     )
+    window = int(now // length)
+    return window, (window + 1) * length - now
+
+
+def generate_presigned_get(bucket: str, key: str) -> str:
+    window, remaining = _presign_window(time.time())
+    cache_key = f"{bucket}/{key}@{window}"
+    url = _presign_cache.get(cache_key)
+    if url:
+        return url
+
+    redis_key = f"{PRESIGN_REDIS_PREFIX}{cache_key}"
+    if settings.presign_cache_redis:
+        cached = redis_call(lambda client: client.get(redis_key))
+        if cached:
+            url = cached.decode("utf-8")
+            _presign_cache.incr("redis_hits")
+            _presign_cache.set(cache_key, url, ttl=remaining)
+            return url
+
+    url = _sign_get(bucket, key)
+    _presign_cache.incr("signed")
+    _presign_cache.set(cache_key, url, ttl=remaining)
+    if settings.presign_cache_redis:
+        redis_call(
+            lambda client: client.set(redis_key, url, ex=max(math.ceil(remaining), 1))
+        )
+    return url
+
+
+def is_immutable_key(key: str) -> bool:
+    return bool(VERSIONED_KEY_RE.search(key))
+
+
+def stable_public_url(key: str) -> str | None:
+    mode = settings.audio_delivery_mode
+    if mode == "public":
+        base = settings.public_audio_base_url or (
+            f"{settings.s3_public_endpoint.rstrip('/')}/{settings.s3_public_bucket}"
+        )
+        return f"{base.rstrip('/')}/{quote(key)}"
+    if mode == "proxy":
+        return f"{settings.api_public_url.rstrip('/')}/media/{quote(key)}"
+    return None
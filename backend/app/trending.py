@@ -0,0 +1,55 @@
+import math
+import time
+from typing import List, Optional
+
+from .cache import redis_call
+from .settings import settings
+
+# Formato compartido con el worker (worker/trending.py), que suma al publicar y renormaliza.
+# Forward decay: cada aporte vale weight * e^(rate * (t - epoch)); el orden del zset es
+# el de los scores con decaimiento exponencial sin tener que reescribirlos.
+TRENDING_KEY = "feed:trending"
+TRENDING_EPOCH_KEY = "feed:trending:epoch"
+LISTEN_DEDUPE_PREFIX = "feed:trending:listen:"
+
+
+def decay_rate() -> float:
+    return math.log(2) / (settings.trending_half_life_hours * 3600)
+
+
+def bump_trending(item_id: str, weight: float, at: Optional[float] = None) -> None:
+    at = at or time.time()
+
+    def _bump(pipe) -> None:
+        # WATCH sobre el epoch: si el worker renormaliza en el medio, se reintenta.
+        epoch = pipe.get(TRENDING_EPOCH_KEY)
+        pipe.multi()
+        if epoch is None:
+            # Solo el worker crea el epoch, al reconstruir desde la DB: si la API lo
+            # creara, tras un flush el ranking quedaria con solo lo votado desde entonces.
+            return
+        score = weight * math.exp(decay_rate() * (at - float(epoch)))
+        pipe.zincrby(TRENDING_KEY, score, item_id)
+
+    redis_call(lambda client: client.transaction(_bump, TRENDING_EPOCH_KEY))
+
+
+def record_listen(item_id: str, listener: str) -> None:
+    # Una escucha por oyente e historia por ventana, para que recargar no infle el ranking.
+    key = f"{LISTEN_DEDUPE_PREFIX}{item_id}:{listener}"
+    first = redis_call(
+        lambda client: client.set(key, 1, nx=True, ex=settings.trending_listen_dedupe_seconds)
+    )
+    if first:
+        bump_trending(item_id, settings.trending_listen_weight)
+
+
+def load_trending_ids(offset: int, count: int) -> Optional[List[str]]:
+    raw = redis_call(lambda client: client.zrevrange(TRENDING_KEY, offset, offset + count - 1))
+    if raw is None:
+        return None
+    return [item.decode("utf-8") for item in raw]
+
+
+def remove_from_trending(item_id: str) -> None:
+    redis_call(lambda client: client.zrem(TRENDING_KEY, item_id))
@@ -0,0 +1,90 @@
+import math
+from typing import Dict, Iterable, List, Tuple
+
+from .models import AudioSubmission
+from .settings import settings
+from .storage import abort_multipart_upload, complete_multipart_upload, list_uploaded_parts
+
+# Limite de S3/MinIO por upload multipart.
+MAX_PARTS = 10_000
+
+
+class IncompleteUpload(Exception):
+    def __init__(self, missing: List[int]) -> None:
+        super().__init__(f"{len(missing)} parts missing")
+        self.missing = missing
+
+
+def part_layout(size: int) -> Tuple[int, int]:
+    # Partes del tamano configurado; si no alcanzan 10000, se agrandan.
+    part_size = max(settings.multipart_part_size_bytes, math.ceil(size / MAX_PARTS))
+    return part_size, max(math.ceil(size / part_size), 1)
+
+
+def part_count(submission: AudioSubmission) -> int:
+    return max(math.ceil(submission.upload_size / submission.upload_part_size), 1)
+
+
+def expected_part_size(submission: AudioSubmission, part_number: int) -> int:
+    if part_number < part_count(submission):
+        return submission.upload_part_size
+    return submission.upload_size - submission.upload_part_size * (part_number - 1)
+
+
+def _complete_parts(submission: AudioSubmission, parts: Iterable[dict]) -> Dict[int, dict]:
+    # Solo cuentan las partes con el tamano esperado (una parte cortada se resube).
+    return {
+        part["part_number"]: part
+        for part in parts
+        if 1 <= part["part_number"] <= part_count(submission)
+        and part["size"] == expected_part_size(submission, part["part_number"])
+    }
+
+
+def record_parts(submission: AudioSubmission, reported: Iterable[dict]) -> None:
+    merged = _complete_parts(submission, submission.upload_parts or [])
+    merged.update(_complete_parts(submission, reported))
+    submission.upload_parts = [merged[number] for number in sorted(merged)]
+
+
+def missing_parts(submission: AudioSubmission) -> List[int]:
+    done = {part["part_number"] for part in submission.upload_parts or []}
+    return [number for number in range(1, part_count(submission) + 1) if number not in done]
+
+
+def upload_progress(submission: AudioSubmission) -> dict:
+    parts = submission.upload_parts or []
+    return {
+        "upload_id": submission.upload_id,
+        "size": submission.upload_size,
+        "part_size": submission.upload_part_size,
+        "part_count": part_count(submission),
+        "parts_completed": len(parts),
+        "bytes_uploaded": sum(part["size"] for part in parts),
+        "missing_parts": missing_parts(submission),
+    }
+
+
+def finish_multipart(submission: AudioSubmission) -> None:
+    # MinIO es la fuente de verdad: una parte subida cuyo reporte se perdio
+    # (red inestable) igual cuenta.
+    bucket, key = settings.s3_private_bucket, submission.original_audio_key
+    submission.upload_parts = []
+    record_parts(submission, list_uploaded_parts(bucket, key, submission.upload_id))
+    missing = missing_parts(submission)
+    if missing:
+        raise IncompleteUpload(missing)
+    complete_multipart_upload(bucket, key, submission.upload_id, submission.upload_parts)
+    clear_multipart(submission)
+
+
+def abort_multipart(submission: AudioSubmission) -> None:
+    abort_multipart_upload(
+        settings.s3_private_bucket, submission.original_audio_key, submission.upload_id
+    )
+    clear_multipart(submission)
+
+
+def clear_multipart(submission: AudioSubmission) -> None:
+    submission.upload_id = None
+    submission.upload_parts = None
@@ -0,0 +1,61 @@
+import json
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from .cache import TTLCache, redis_call
+from .models import User
+from .settings import settings
+
+USER_REDIS_PREFIX = "user:snapshot:"
+
+_user_cache = TTLCache(
+    "users", maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds
+)
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    # Lo que usan las rutas autenticadas; bio/redes se leen de la DB en /profile.
+    id: str
+    email: str
+    profile_image_key: Optional[str]
+
+
+def get_cached_user(db: Session, user_id: str) -> Optional[CachedUser]:
+    cached = _user_cache.get(user_id)
+    if cached:
+        return cached
+    redis_key = f"{USER_REDIS_PREFIX}{user_id}"
+    if settings.user_cache_redis:
+        raw = redis_call(lambda client: client.get(redis_key))
+        if raw:
+            user = CachedUser(**json.loads(raw))
+            _user_cache.set(user_id, user)
+            _user_cache.incr("redis_hits")
+            return user
+
+    row = (
+        db.query(User.id, User.email, User.profile_image_key)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if not row:
+        return None
+    user = CachedUser(id=row.id, email=row.email, profile_image_key=row.profile_image_key)
+    _user_cache.set(user_id, user)
+    if settings.user_cache_redis:
+        redis_call(
+            lambda client: client.set(
+                redis_key, json.dumps(asdict(user)), ex=settings.user_cache_ttl_seconds
+            )
+        )
+    return user
+
+
+def invalidate_user(user_id: str) -> None:
+    # Otros procesos pueden tener la copia local hasta que venza el TTL (corto).
+    _user_cache.delete(user_id)
+    if settings.user_cache_redis:
+        redis_call(lambda client: client.delete(f"{USER_REDIS_PREFIX}{user_id}"))
@@ -1,6 +1,8 @@
 import importlib
 import os
 import sys
+from datetime import datetime
+from types import SimpleNamespace
 
 # Add /app to path for imports
 sys.path.insert(0, '/app')
@@ -44,6 +46,9 @@ def app_state(tmp_path_factory):
 @pytest.fixture()
 def client(app_state):
     app, app_db, _ = app_state
+    from app.cache import clear_caches
+
+    clear_caches()
     app_db.Base.metadata.drop_all(bind=app_db.engine)
     app_db.Base.metadata.create_all(bind=app_db.engine)
     with TestClient(app) as test_client:
@@ -58,3 +63,66 @@ def db_session(app_state, client):
         yield session
     finally:
         session.close()
+
+
+@pytest.fixture()
+def fake_redis(monkeypatch):
+    import fakeredis
+
+    from app import cache, queue
+
+    server = fakeredis.FakeRedis()
+    monkeypatch.setattr(queue, "_redis_client", server)
+    monkeypatch.setattr(cache, "_redis_down_until", 0.0)
+    return server
+
+
+@pytest.fixture()
+def signed_urls(monkeypatch):
+    from app.api import feed as feed_api
+
+    monkeypatch.setattr(
+        feed_api, "generate_presigned_get", lambda *args, **kwargs: "http://example.com/audio"
+    )
+
+
+@pytest.fixture()
+def listener(client):
+    register = client.post(
+        "/auth/register", json={"email": "listener@example.com", "password": "pass-123"}
+    )
+    headers = {"Authorization": f"Bearer {register.json()['access_token']}"}
+    user_id = client.get("/auth/me", headers=headers).json()["id"]
+    return SimpleNamespace(id=user_id, headers=headers)
+
+
+@pytest.fixture()
+def published_stories(db_session, listener, signed_urls):
+    # publish(count, campo=valor | campo=lambda index: valor) inserta historias
+    # aprobadas del listener y devuelve las filas.
+    from sqlalchemy import insert
+
+    from app.models import AudioSubmission
+
+    def publish(count, **fields):
+        now = datetime.utcnow()
+        rows = []
+        for index in range(count):
+            row = {
+                "id": f"sub-{index}",
+                "user_id": listener.id,
+                "status": "APPROVED",
+                "processing_step": 6,
+                "public_audio_key": f"pub-{index}.wav",
+                "anonymization_mode": "SOFT",
+                "created_at": now,
+                "published_at": now,
+            }
+            for name, value in fields.items():
+                row[name] = value(index) if callable(value) else value
+            rows.append(row)
+        db_session.execute(insert(AudioSubmission), rows)
+        db_session.commit()
+        return rows
+
+    return publish
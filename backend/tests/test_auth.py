@@ -15,3 +15,27 @@ def test_register_login_me(client):
     me_res = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
     assert me_res.status_code == 200
     assert me_res.json()["email"] == payload["email"]
+
+
+def test_login_rehashes_outdated_password(client, db_session):
+    from passlib.context import CryptContext
+
+    from backend.app.models import User
+    from backend.app.settings import settings
+
+    legacy = CryptContext(schemes=["argon2"], argon2__memory_cost=8192, argon2__time_cost=1)
+    user = User(email="legacy@example.com", password_hash=legacy.hash("old-pass-123"))
+    db_session.add(user)
+    db_session.commit()
+
+    res = client.post(
+        "/auth/login", data={"username": "legacy@example.com", "password": "old-pass-123"}
+    )
+    assert res.status_code == 200
+
+    db_session.refresh(user)
+    assert f"m={settings.argon2_memory_cost},t={settings.argon2_time_cost}" in user.password_hash
+    relogin = client.post(
+        "/auth/login", data={"username": "legacy@example.com", "password": "old-pass-123"}
+    )
+    assert relogin.status_code == 200
@@ -7,6 +7,7 @@ def test_events_for_submission(client, monkeypatch):
         lambda *args, **kwargs: "http://example.com/upload",
     )
     monkeypatch.setattr(submissions_api, "enqueue_submission", lambda *args: None)
+    monkeypatch.setattr(submissions_api, "preflight_upload", lambda *args: None)
 
     register = client.post(
         "/auth/register", json={"email": "events@example.com", "password": "pass-123"}
@@ -25,7 +26,11 @@ def test_events_for_submission(client, monkeypatch):
     )
     submission_id = created.json()["id"]
 
-    client.post(f"/submissions/{submission_id}/uploaded", headers=headers)
+    client.post(
+        f"/submissions/{submission_id}/uploaded",
+        json={"anonymization_mode": "SOFT"},
+        headers=headers,
+    )
 
     events = client.get(f"/events?submission_id={submission_id}", headers=headers)
     assert events.status_code == 200
@@ -42,6 +47,7 @@ def test_events_stream(client, monkeypatch):
         lambda *args, **kwargs: "http://example.com/upload",
     )
     monkeypatch.setattr(submissions_api, "enqueue_submission", lambda *args: None)
+    monkeypatch.setattr(submissions_api, "preflight_upload", lambda *args: None)
 
     register = client.post(
         "/auth/register", json={"email": "stream@example.com", "password": "pass-123"}
@@ -60,7 +66,11 @@ def test_events_stream(client, monkeypatch):
     )
     submission_id = created.json()["id"]
 
-    client.post(f"/submissions/{submission_id}/uploaded", headers=headers)
+    client.post(
+        f"/submissions/{submission_id}/uploaded",
+        json={"anonymization_mode": "SOFT"},
+        headers=headers,
+    )
 
     stream_url = f"/events/stream?token={token}&since=1970-01-01T00:00:00Z"
     with client.stream("GET", stream_url) as response:
@@ -72,3 +82,115 @@ def test_events_stream(client, monkeypatch):
                 break
 
     assert "audio.uploaded" in chunks
+
+
+def test_event_log_replay_and_gap(monkeypatch):
+    import json
+
+    from app import event_log
+
+    class StubStream:
+        def __init__(self, entries):
+            self.entries = entries
+
+        def xrange(self, key, min="-", max="+", count=None):
+            entries = self.entries
+            if min.startswith("("):
+                floor = event_log.parse_stream_id(min[1:])
+                entries = [
+                    entry
+                    for entry in entries
+                    if event_log.parse_stream_id(entry[0].decode()) > floor
+                ]
+            return entries[:count]
+
+    entries = [
+        (f"100-{index}".encode(), {b"event": json.dumps({"id": f"e{index}"}).encode()})
+        for index in range(3)
+    ]
+    stub = StubStream(entries)
+    monkeypatch.setattr(event_log, "redis_call", lambda fn, default=None: fn(stub))
+
+    replay = event_log.read_event_log("user-1", "100-0")
+    assert [event["id"] for event in replay] == ["e1", "e2"]
+    assert replay[-1]["stream_id"] == "100-2"
+
+    # El id pedido ya fue recortado del stream: hay que volver a la DB.
+    stub.entries = entries[2:]
+    assert event_log.read_event_log("user-1", "100-0") is None
+    assert event_log.parse_stream_id("not-an-id") is None
+
+
+def test_stream_reconnect_replays_log_without_db(monkeypatch):
+    import asyncio
+
+    from app.api import events as events_api
+
+    async def no_db(*args, **kwargs):
+        raise AssertionError("replay from the Redis Stream must not query Postgres")
+
+    async def authorized(*args, **kwargs):
+        return None
+
+    replayed = [
+        {
+            "id": "e2",
+            "event_name": "audio.tagged",
+            "submission_id": "sub-1",
+            "timestamp": "2026-10-19T12:00:01",
+            "payload": {},
+            "stream_id": "1760875201000-0",
+        }
+    ]
+    monkeypatch.setattr(events_api, "get_user_id_from_token", lambda token: "user-1")
+    monkeypatch.setattr(events_api, "_authorize_stream", authorized)
+    monkeypatch.setattr(events_api, "_fetch_events", no_db)
+    monkeypatch.setattr(events_api, "read_event_log", lambda user_id, last_id: list(replayed))
+    monkeypatch.setattr(events_api.event_bus, "connected", True)
+    live = {**replayed[0], "id": "e3", "event_name": "audio.published"}
+    live["stream_id"] = "1760875202000-0"
+
+    def subscribe(user_id):
+        queue = asyncio.Queue()
+        queue.put_nowait(dict(live))
+        return queue
+
+    monkeypatch.setattr(events_api.event_bus, "subscribe", subscribe)
+    monkeypatch.setattr(events_api.event_bus, "unsubscribe", lambda user_id, queue: None)
+
+    async def first_chunks():
+        # EventSource reconecta a la misma URL (con since) mas el Last-Event-ID.
+        response = await events_api.stream_events(
+            token="t",
+            submission_id=None,
+            since="2026-10-19T11:00:00",
+            last_event_id="1760875200000-0",
+        )
+        chunks = []
+        async for chunk in response.body_iterator:
+            chunks.append(chunk)
+            if len(chunks) == 3:
+                break
+        await response.body_iterator.aclose()
+        return chunks
+
+    chunks = asyncio.run(first_chunks())
+    assert chunks[0].startswith("retry:")
+    assert "audio.tagged" in chunks[1]
+    assert "id: 1760875201000-0" in chunks[1]
+    # Despues del replay sigue con el bus, sin catch-up desde "since".
+    assert "audio.published" in chunks[2]
+
+
+def test_event_log_append_expires_idle_streams(fake_redis):
+    from app import event_log
+    from app.settings import settings
+
+    stream_id = event_log.append_event(fake_redis, "user-1", {"id": "e1"})
+    assert event_log.parse_stream_id(stream_id)
+    ttl = fake_redis.ttl(event_log.log_key("user-1"))
+    assert 0 < ttl <= settings.event_log_ttl_seconds
+
+    # Stream expirado: no hay replay, el reconnect vuelve a la DB.
+    fake_redis.delete(event_log.log_key("user-1"))
+    assert event_log.read_event_log("user-1", stream_id) is None
@@ -1,3 +1,4 @@
+import time
 from datetime import datetime
 
 
@@ -80,3 +81,253 @@ def test_feed_and_tags(client, db_session, monkeypatch):
     low_items = low.json()
     assert len(low_items) == 1
     assert low_items[0]["id"] == "sub-a"
+
+
+def test_feed_etag_and_invalidation(client, db_session, signed_urls):
+    from app.models import AudioSubmission, User
+
+    user = User(email="etag@example.com", password_hash="hashed")
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    db_session.add(
+        AudioSubmission(
+            id="sub-etag",
+            user_id=user.id,
+            status="APPROVED",
+            processing_step=6,
+            original_audio_key="orig.wav",
+            public_audio_key="pub.wav",
+            title="Historia",
+            summary="resumen",
+            tags=["relato personal"],
+            viral_analysis=40,
+            anonymization_mode="SOFT",
+            created_at=datetime.utcnow(),
+            published_at=datetime.utcnow(),
+        )
+    )
+    db_session.commit()
+
+    first = client.get("/feed")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    cached = client.get("/feed", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    register = client.post(
+        "/auth/register", json={"email": "voter@example.com", "password": "pass-123"}
+    )
+    token = register.json()["access_token"]
+    vote = client.post(
+        "/votes",
+        json={"audio_id": "sub-etag"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert vote.status_code == 200
+
+    refreshed = client.get("/feed", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()[0]["vote_count"] == 1
+    assert refreshed.headers["etag"] != etag
+
+
+def test_feed_serves_materialized_first_page(client, signed_urls, monkeypatch):
+    from app.api import feed as feed_api
+
+    documents = [
+        {
+            "id": f"sub-{index}",
+            "user_id": "user-1",
+            "title": "Historia",
+            "summary": "resumen",
+            "tags": ["relato personal"],
+            "public_audio_key": f"pub-{index}.wav",
+            "cover_key": None,
+            "published_at": f"2026-01-{index + 1:02d}T10:00:00",
+            "vote_count": index,
+        }
+        for index in range(3)
+    ]
+    monkeypatch.setattr(
+        feed_api, "load_first_page", lambda tag_list: (documents, True)
+    )
+
+    res = client.get("/feed")
+    assert res.status_code == 200
+    assert [item["id"] for item in res.json()] == ["sub-0", "sub-1", "sub-2"]
+    assert res.json()[0]["public_url"] == "http://example.com/audio"
+    assert res.headers["x-next-cursor"]
+
+    # Paginas profundas siguen yendo a la DB (vacia en este test).
+    deeper = client.get(f"/feed?cursor={res.headers['x-next-cursor']}")
+    assert deeper.status_code == 200
+    assert deeper.json() == []
+
+
+def test_removed_story_drops_materialized_pages(client, fake_redis):
+    import json
+
+    from app import feed_pages
+
+    def document(count, has_more):
+        items = [{"id": f"sub-{index}", "published_at": None} for index in range(count)]
+        return json.dumps({"items": items, "has_more": has_more})
+
+    fake_redis.set(feed_pages.GLOBAL_PAGE_KEY, document(feed_pages.FEED_PAGE_SIZE, True))
+    fake_redis.set(feed_pages.page_key("noche"), document(3, False))
+    assert len(feed_pages.load_first_page([])[0]) == feed_pages.FEED_PAGE_SIZE
+    assert len(feed_pages.load_first_page(["noche"])[0]) == 3
+
+    # Paginas recortadas o vacias no se sirven: la DB tiene la pagina completa.
+    fake_redis.set(feed_pages.GLOBAL_PAGE_KEY, document(feed_pages.FEED_PAGE_SIZE - 1, True))
+    assert feed_pages.load_first_page([]) is None
+    fake_redis.set(feed_pages.GLOBAL_PAGE_KEY, document(0, False))
+    assert feed_pages.load_first_page([]) is None
+
+    feed_pages.remove_from_feed_pages("sub-1", ["Noche"])
+    assert fake_redis.get(feed_pages.page_key("noche")) is None
+    assert fake_redis.get(feed_pages.GLOBAL_PAGE_KEY) is None
+    assert fake_redis.smembers(feed_pages.STALE_PAGES_KEY) == {
+        feed_pages.GLOBAL_PAGE_KEY.encode(),
+        feed_pages.page_key("noche").encode(),
+    }
+
+
+def test_feed_search_ranks_and_paginates(client, published_stories):
+    published_stories(
+        60,
+        id=lambda index: f"sub-{index:02d}",
+        status=lambda index: "REJECTED" if index == 59 else "APPROVED",
+        title=lambda index: "Noche en la Comisaría" if index == 3 else f"Historia {index}",
+        summary="resumen",
+        transcript_preview=lambda index: (
+            "fui a la comisaria" if index < 55 else "comisaria" if index == 59 else "otra cosa"
+        ),
+        tags=[],
+    )
+
+    res = client.get("/feed/search", params={"q": "COMISARIA"})
+    assert res.status_code == 200
+    first = [item["id"] for item in res.json()]
+    assert len(first) == 50
+    # El match en el titulo (con tilde) pesa mas que el del transcript.
+    assert first[0] == "sub-03"
+
+    second = client.get(
+        "/feed/search", params={"q": "comisaría", "cursor": res.headers["x-next-cursor"]}
+    )
+    rest = [item["id"] for item in second.json()]
+    assert "x-next-cursor" not in second.headers
+    assert len(rest) == 5
+    assert set(first) | set(rest) == {f"sub-{index:02d}" for index in range(55)}
+
+    assert client.get("/feed/search", params={"q": "comisaria perro"}).json() == []
+    assert client.get("/feed/search", params={"q": "x"}).status_code == 422
+
+
+def test_feed_next_uses_precomputed_neighbors(client, published_stories, monkeypatch):
+    from app.api import feed as feed_api
+
+    published_stories(4)
+    neighbors = {"sub-0": ["sub-3", "deleted", "sub-1"]}
+    monkeypatch.setattr(feed_api, "load_related_ids", neighbors.get)
+
+    res = client.get("/feed/sub-0/next")
+    assert res.status_code == 200
+    assert [item["id"] for item in res.json()] == ["sub-3", "sub-1"]
+
+    # Sin lista precalculada: lo mas reciente, sin la historia actual.
+    fallback = client.get("/feed/sub-2/next", params={"limit": 2})
+    assert len(fallback.json()) == 2
+    assert "sub-2" not in [item["id"] for item in fallback.json()]
+
+
+def test_feed_trending_sort_follows_votes_and_listens(
+    client, fake_redis, listener, published_stories
+):
+    published_stories(3, tags=["noche"])
+
+    # Sin zset todavia: mismo orden que el feed por recencia.
+    assert client.get("/feed", params={"sort": "trending"}).status_code == 200
+    # La API no inicializa el ranking (lo reconstruye el worker): sin epoch no suma.
+    client.post("/feed/sub-0/listen")
+    assert not fake_redis.exists("feed:trending")
+    fake_redis.set("feed:trending:epoch", time.time())
+
+    vote = client.post("/votes", json={"audio_id": "sub-1"}, headers=listener.headers)
+    assert vote.status_code == 200
+    for _ in range(3):
+        assert client.post("/feed/sub-2/listen").status_code == 204
+    assert client.post("/feed/missing/listen").status_code == 404
+
+    res = client.get("/feed", params={"sort": "trending"})
+    # Un voto pesa mas que una escucha; las escuchas repetidas del mismo cliente no suman.
+    assert [item["id"] for item in res.json()] == ["sub-1", "sub-2"]
+    assert "x-next-cursor" not in res.headers
+    assert client.get("/feed", params={"sort": "hot"}).status_code == 422
+
+
+def test_feed_random_discovery_samples_redis_sets(client, fake_redis, published_stories):
+    from app.discovery import remove_from_discovery
+
+    published_stories(
+        5,
+        tags=lambda index: ["noche"] if index % 2 else ["dia"],
+        viral_analysis=lambda index: index * 20,
+    )
+
+    # Sin indice: /feed/shuffle sigue respondiendo desde la DB.
+    assert len(client.get("/feed/shuffle", params={"limit": 3}).json()) == 3
+
+    # Lo que indexa el worker al publicar.
+    fake_redis.sadd("feed:random:all", *[f"sub-{index}" for index in range(5)])
+    fake_redis.sadd("feed:random:band:low", "sub-0", "sub-1")
+    fake_redis.sadd("feed:random:tag:noche", "sub-1", "sub-3")
+    fake_redis.sadd("feed:random:tag:dia", "sub-0", "sub-2", "sub-4")
+    fake_redis.sadd("feed:random:tags", "noche", "dia")
+
+    res = client.get("/feed/shuffle", params={"tags": "noche", "limit": 5})
+    assert sorted(item["id"] for item in res.json()) == ["sub-1", "sub-3"]
+    assert len(client.get("/feed/shuffle", params={"limit": 4}).json()) == 4
+    low = client.get("/feed/low-serendipia").json()
+    assert sorted(item["id"] for item in low) == ["sub-0", "sub-1"]
+    # Cada request muestrea de nuevo: no pasa por el cache del feed.
+    picks = {
+        client.get("/feed/low-serendipia", params={"limit": 1}).json()[0]["id"]
+        for _ in range(20)
+    }
+    assert picks == {"sub-0", "sub-1"}
+    assert "etag" not in client.get("/feed/low-serendipia").headers
+    assert sorted(client.get("/feed/tags").json()) == ["dia", "noche"]
+
+    remove_from_discovery("sub-1", ["noche"])
+    remove_from_discovery("sub-3", ["noche"])
+    assert client.get("/feed/tags").json() == ["dia"]
+    assert not fake_redis.sismember("feed:random:band:low", "sub-1")
+
+
+def test_feed_batch_keeps_order_and_matches_story_etags(client, published_stories):
+    published_stories(
+        4,
+        status=lambda index: "APPROVED" if index < 3 else "PROCESSING",
+        transcript_preview=lambda index: f"transcript {index}",
+    )
+
+    res = client.get("/feed/batch", params={"ids": "sub-2,sub-0,missing,sub-3,sub-2"})
+    assert res.status_code == 200
+    body = res.json()
+    assert [entry["story"]["id"] for entry in body["items"]] == ["sub-2", "sub-0"]
+    assert body["items"][0]["story"]["transcript"] == "transcript 2"
+    assert body["missing"] == ["missing", "sub-3"]
+
+    single = client.get("/feed/sub-2")
+    assert single.headers["etag"] == body["items"][0]["etag"]
+    revalidate = client.get("/feed/sub-2", headers={"If-None-Match": body["items"][0]["etag"]})
+    assert revalidate.status_code == 304
+
+    too_many = ",".join(f"id-{index}" for index in range(51))
+    assert client.get("/feed/batch", params={"ids": too_many}).status_code == 400
+    assert client.get("/feed/batch", params={"ids": " , "}).status_code == 400
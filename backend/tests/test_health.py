@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+
+
+def test_health_served_from_background_probe(app_state, monkeypatch):
+    from backend.app import health
+
+    calls = {name: 0 for name in health.PROBES}
+
+    def probe(name, fail=False):
+        def run():
+            calls[name] += 1
+            if fail:
+                raise RuntimeError("bucket missing")
+
+        return run
+
+    monkeypatch.setitem(health.PROBES, "db", probe("db"))
+    monkeypatch.setitem(health.PROBES, "storage", probe("storage", fail=True))
+    monkeypatch.setitem(health.PROBES, "queue", probe("queue"))
+    monkeypatch.setattr(
+        health.health_monitor,
+        "states",
+        {name: health.DependencyState() for name in health.PROBES},
+    )
+    monkeypatch.setattr(health.health_monitor, "checked_at", None)
+
+    app, _, _ = app_state
+    with TestClient(app) as client:
+        assert client.get("/health/live").json() == {"status": "ok"}
+        for _ in range(5):
+            res = client.get("/health")
+            assert res.status_code == 200
+
+    body = res.json()
+    assert body["status"] == "degraded"
+    assert body["db_ready"] is True
+    assert body["storage_ready"] is False
+    assert body["dependencies"]["storage"]["error"] == "RuntimeError: bucket missing"
+    assert body["dependencies"]["db"]["last_success"]
+    assert body["dependencies"]["db"]["latency_ms"] is not None
+    # Los requests leen el estado en memoria; no disparan un sondeo cada uno.
+    assert calls == {"db": 1, "storage": 1, "queue": 1}
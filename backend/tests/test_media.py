@@ -0,0 +1,56 @@
+class DummyBody:
+    def __init__(self, data):
+        self.data = data
+
+    def iter_chunks(self, size):
+        for index in range(0, len(self.data), size):
+            yield self.data[index : index + size]
+
+
+class DummyS3:
+    def __init__(self, data):
+        self.data = data
+
+    def head_object(self, Bucket, Key):
+        return {
+            "ETag": '"abc123"',
+            "ContentLength": len(self.data),
+            "ContentType": "audio/wav",
+        }
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self.data
+        if Range:
+            start, end = Range.replace("bytes=", "").split("-")
+            data = data[int(start) : int(end) + 1]
+        return {"Body": DummyBody(data)}
+
+
+def test_media_proxy_range_and_etag(client, monkeypatch):
+    from app.api import media as media_api
+
+    data = bytes(range(256)) * 4
+    monkeypatch.setattr(media_api, "get_internal_s3_client", lambda: DummyS3(data))
+    media_api._head_cache.clear()
+    key = "user-1/sub-1/public-0123456789abcdef.wav"
+
+    full = client.get(f"/media/{key}")
+    assert full.status_code == 200
+    assert full.content == data
+    assert full.headers["etag"] == '"abc123"'
+    assert "immutable" in full.headers["cache-control"]
+
+    partial = client.get(f"/media/{key}", headers={"Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.content == data[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{len(data)}"
+
+    suffix = client.get(f"/media/{key}", headers={"Range": "bytes=-4"})
+    assert suffix.status_code == 206
+    assert suffix.content == data[-4:]
+
+    cached = client.get(f"/media/{key}", headers={"If-None-Match": '"abc123"'})
+    assert cached.status_code == 304
+
+    invalid = client.get(f"/media/{key}", headers={"Range": "bytes=5000-"})
+    assert invalid.status_code == 416
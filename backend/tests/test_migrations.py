@@ -0,0 +1,50 @@
+import pytest
+
+from app import migrations
+from app.migrations import MIGRATIONS, SCHEMA_VERSION, concurrent_index
+
+
+def test_migrations_are_strictly_ordered():
+    versions = [migration.version for migration in MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert versions[0] == 1
+    assert SCHEMA_VERSION == versions[-1]
+
+
+def test_concurrent_steps_run_outside_transactions():
+    for migration in MIGRATIONS:
+        concurrent = any("CONCURRENTLY" in statement for statement in migration.statements)
+        if concurrent:
+            assert not migration.transactional
+    statement = concurrent_index(
+        "ix_demo", "audio_submissions", "published_at DESC", where="status = 'APPROVED'"
+    )
+    assert statement.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_demo")
+    assert statement.endswith("WHERE status = 'APPROVED'")
+
+
+class FakeConnection:
+    def __init__(self, states):
+        # Estados sucesivos de pg_index.indisvalid para el indice.
+        self.states = list(states)
+        self.executed = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.executed.append(sql)
+        result = self.states.pop(0) if sql == migrations.INDEX_VALID_SQL else None
+        return type("Result", (), {"scalar": lambda _self: result})()
+
+
+def test_concurrent_index_rebuilds_invalid_leftovers():
+    statement = concurrent_index("ix_demo", "audio_submissions", "published_at DESC")
+    conn = FakeConnection([False, True])
+    migrations._run_concurrent(conn, statement)
+    assert conn.executed[1] == "DROP INDEX CONCURRENTLY IF EXISTS ix_demo"
+    assert conn.executed[2] == statement
+
+    # El build termino pero el indice sigue INVALID: la migracion no se registra.
+    conn = FakeConnection([None, False])
+    with pytest.raises(RuntimeError):
+        migrations._run_concurrent(conn, statement)
+    assert "DROP INDEX CONCURRENTLY IF EXISTS ix_demo" not in conn.executed
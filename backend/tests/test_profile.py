@@ -0,0 +1,71 @@
+from sqlalchemy import event
+
+
+def test_user_cache_skips_db_and_is_invalidated(client):
+    from backend.app import db as app_db
+    from backend.app import user_cache
+
+    register = client.post(
+        "/auth/register", json={"email": "cache@example.com", "password": "pass-123"}
+    )
+    headers = {"Authorization": f"Bearer {register.json()['access_token']}"}
+
+    user_queries = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            user_queries.append(statement)
+
+    event.listen(app_db.engine, "before_cursor_execute", capture)
+    try:
+        first = client.get("/auth/me", headers=headers)
+        second = client.get("/auth/me", headers=headers)
+    finally:
+        event.remove(app_db.engine, "before_cursor_execute", capture)
+    assert first.json() == second.json()
+    assert len(user_queries) == 1
+
+    user_id = first.json()["id"]
+    res = client.put(
+        "/profile", json={"profile_photo_key": f"{user_id}/profile/photo.jpg"}, headers=headers
+    )
+    assert res.status_code == 200
+    with app_db.SessionLocal() as db:
+        cached = user_cache.get_cached_user(db, user_id)
+    assert cached.profile_image_key == f"{user_id}/profile/photo.jpg"
+
+
+def test_profile_photo_change_marks_story_pages_stale(
+    client, fake_redis, listener, published_stories
+):
+    from app import feed_pages
+
+    published_stories(
+        3,
+        tags=lambda index: ["cocina"] if index == 2 else ["noche"],
+        cover_image_key=lambda index: "cover.jpg" if index == 2 else None,
+    )
+    for tag in (None, "noche", "cocina", "viajes"):
+        fake_redis.set(feed_pages.page_key(tag), "{}")
+
+    res = client.put(
+        "/profile",
+        json={"profile_photo_key": f"{listener.id}/profile/photo.jpg"},
+        headers=listener.headers,
+    )
+    assert res.status_code == 200
+    stale = {feed_pages.GLOBAL_PAGE_KEY.encode(), feed_pages.page_key("noche").encode()}
+    assert fake_redis.smembers(feed_pages.STALE_PAGES_KEY) == stale
+    assert fake_redis.get(feed_pages.page_key("noche")) is None
+    # La historia con portada propia y las de otros tags no cambian.
+    assert fake_redis.get(feed_pages.page_key("cocina")) == b"{}"
+    assert fake_redis.get(feed_pages.page_key("viajes")) == b"{}"
+
+    # Misma foto: no hay nada que rearmar.
+    fake_redis.delete(feed_pages.STALE_PAGES_KEY)
+    client.put(
+        "/profile",
+        json={"profile_photo_key": f"{listener.id}/profile/photo.jpg"},
+        headers=listener.headers,
+    )
+    assert not fake_redis.exists(feed_pages.STALE_PAGES_KEY)
@@ -0,0 +1,100 @@
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert, text
+
+HOT_TABLES = ("users", "audio_submissions", "votes", "events")
+FULL_SCAN_RE = re.compile(r"^SCAN (\w+)(?! USING)")
+
+
+def _seed(db_session, owner_id: str) -> None:
+    from backend.app.models import AudioSubmission, Event, User, Vote
+
+    now = datetime.utcnow()
+    users = [
+        {"id": f"user-{i}", "email": f"user-{i}@example.com", "password_hash": "x", "created_at": now}
+        for i in range(200)
+    ]
+    submissions = []
+    for i in range(5000):
+        approved = i % 5 != 0
+        submissions.append(
+            {
+                "id": f"sub-{i:05d}",
+                "user_id": owner_id if i % 100 == 0 else f"user-{i % 200}",
+                "status": "APPROVED" if approved else "REJECTED",
+                "processing_step": 6,
+                "public_audio_key": f"public-{i}.wav" if approved else None,
+                "title": f"historia {i}",
+                "tags": [f"tag-{i % 20}"],
+                "viral_analysis": i % 100,
+                "anonymization_mode": "SOFT",
+                "created_at": now - timedelta(minutes=i),
+                "published_at": now - timedelta(minutes=i) if approved else None,
+            }
+        )
+    votes = [
+        {
+            "id": f"vote-{i}",
+            "user_id": f"user-{i % 200}",
+            "audio_id": f"sub-{(i * 7) % 5000:05d}",
+            "created_at": now,
+        }
+        for i in range(10000)
+    ]
+    events = [
+        {
+            "id": f"event-{i}",
+            "event_name": "audio.uploaded",
+            "event_version": 1,
+            "submission_id": f"sub-{i % 5000:05d}",
+            "timestamp": now - timedelta(seconds=i),
+        }
+        for i in range(10000)
+    ]
+    db_session.execute(insert(User), users)
+    db_session.execute(insert(AudioSubmission), submissions)
+    db_session.execute(insert(Vote), votes)
+    db_session.execute(insert(Event), events)
+    db_session.commit()
+    db_session.execute(text("ANALYZE"))
+    db_session.commit()
+
+
+def test_hot_routes_use_indexes(client, db_session, listener, signed_urls):
+    from backend.app import db as app_db
+
+    headers = listener.headers
+    _seed(db_session, listener.id)
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(app_db.engine, "before_cursor_execute", capture)
+    try:
+        feed = client.get("/feed")
+        assert feed.status_code == 200
+        client.get("/feed", params={"cursor": feed.headers["X-Next-Cursor"]})
+        client.get("/feed", params={"tag": "tag-3"})
+        client.get("/feed/low-serendipia")
+        client.get("/feed/sub-00001")
+        client.get("/submissions", headers=headers)
+        client.get("/events", headers=headers)
+        client.get("/events", params={"submission_id": "sub-00100"}, headers=headers)
+        vote = client.post("/votes", json={"audio_id": "sub-00002"}, headers=headers)
+        assert vote.status_code == 200
+    finally:
+        event.remove(app_db.engine, "before_cursor_execute", capture)
+
+    assert captured
+    with app_db.engine.connect() as conn:
+        for statement, parameters in captured:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            for row in plan:
+                match = FULL_SCAN_RE.match(row[-1])
+                assert not (match and match.group(1) in HOT_TABLES), (
+                    f"full scan in plan {row[-1]!r} for:\n{statement}"
+                )
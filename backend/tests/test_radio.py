@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+
+def test_radio_session_serves_queue_and_prefetch(
+    client, db_session, fake_redis, listener, published_stories
+):
+    from app.models import Vote
+    from app.settings import settings
+
+    total = settings.radio_batch_size + 5
+    now = datetime.utcnow()
+    published_stories(
+        total,
+        id=lambda index: f"sub-{index:03d}",
+        tags=lambda index: ["noche"] if index % 2 else ["cocina"],
+        published_at=lambda index: now - timedelta(minutes=index),
+    )
+    # Una historia un poco mas vieja pero muy votada pasa adelante.
+    db_session.execute(
+        insert(Vote),
+        [{"user_id": listener.id, "audio_id": "sub-003", "created_at": now} for _ in range(5)],
+    )
+    db_session.commit()
+
+    res = client.post("/radio/sessions")
+    assert res.status_code == 200
+    body = res.json()
+    session_id = body["session_id"]
+    assert body["current"]["id"] == "sub-003"
+    assert len(body["upcoming"]) == 2
+    assert body["upcoming"][0]["public_url"] == "http://example.com/audio"
+
+    heard = [body["current"]["id"]]
+    for _ in range(total - 1):
+        step = client.post(f"/radio/sessions/{session_id}/next").json()
+        heard.append(step["current"]["id"])
+    # Se extiende sola al pasar la primera tanda y no repite nada.
+    assert sorted(heard) == [f"sub-{index:03d}" for index in range(total)]
+
+    # Todo escuchado: arranca otra vuelta.
+    again = client.post(f"/radio/sessions/{session_id}/skip").json()
+    assert again["current"]["id"] in heard
+
+    tagged = client.post("/radio/sessions", params={"tags": "cocina"}).json()
+    assert "cocina" in tagged["current"]["tags"]
+    assert all("cocina" in item["tags"] for item in tagged["upcoming"])
+
+    assert client.post("/radio/sessions/missing/next").status_code == 404
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+
+def test_negotiate_encoding_respects_quality(monkeypatch):
+    from app import responses
+
+    monkeypatch.setattr(responses, "brotli", object())
+    assert responses.negotiate_encoding("gzip, deflate, br") == "br"
+    assert responses.negotiate_encoding("br;q=0.5, gzip") == "gzip"
+    assert responses.negotiate_encoding("br;q=0, gzip;q=0") is None
+    assert responses.negotiate_encoding("*") == "br"
+    assert responses.negotiate_encoding(None) is None
+
+    monkeypatch.setattr(responses, "brotli", None)
+    assert responses.negotiate_encoding("br") is None
+    assert responses.negotiate_encoding("br, gzip") == "gzip"
+
+
+def test_list_responses_are_compressed_per_request(client, listener, published_stories):
+    now = datetime(2026, 10, 19, 12, 0, 0, 123456)
+    published_stories(
+        20,
+        summary="una historia larga " * 5,
+        tags=["noche"],
+        viral_analysis=90,
+        created_at=now,
+        published_at=now,
+    )
+    headers = listener.headers
+
+    plain = client.get("/feed", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    packed = client.get("/feed", headers={"Accept-Encoding": "gzip"})
+    assert packed.headers["content-encoding"] == "gzip"
+    assert packed.headers["etag"] == plain.headers["etag"]
+    assert packed.json() == plain.json()
+    assert plain.json()[0]["published_at"] == "2026-10-19T12:00:00.123456"
+
+    # Respuestas fuera del cache del feed pasan por el middleware.
+    mine = client.get("/submissions", headers={**headers, "Accept-Encoding": "gzip"})
+    assert mine.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in mine.headers["vary"].lower()
+    first = mine.json()[0]
+    assert first["high_potential"] is True
+    assert first["description"] is None
+    assert set(first) == {
+        "id", "status", "processing_step", "transcript_preview", "title", "summary",
+        "tags", "high_potential", "moderation_result", "anonymization_mode",
+        "description", "tags_suggested", "cover_url", "created_at", "published_at",
+    }
+
+    # Cuerpos chicos no se comprimen.
+    small = client.get("/health/live", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"status": "ok"}
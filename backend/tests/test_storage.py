@@ -0,0 +1,30 @@
+def test_presigned_get_is_cached_per_window(monkeypatch):
+    from app import storage
+    from app.settings import Settings
+
+    monkeypatch.setattr(storage, "settings", Settings(presign_cache_redis=False))
+    storage._presign_cache.clear()
+    signed_before = storage._presign_cache.stats().get("signed", 0)
+    signed = []
+
+    def fake_sign(bucket, key):
+        signed.append(key)
+        return f"http://example.com/{bucket}/{key}?sig={len(signed)}"
+
+    monkeypatch.setattr(storage, "_sign_get", fake_sign)
+    monkeypatch.setattr(storage.time, "time", lambda: 10_000.0)
+
+    first = storage.generate_presigned_get("audio-public", "a.wav")
+    second = storage.generate_presigned_get("audio-public", "a.wav")
+    assert first == second
+    assert signed == ["a.wav"]
+
+    # Next window re-signs so the URL never gets close to its expiry.
+    monkeypatch.setattr(storage.time, "time", lambda: 10_000.0 + 3300)
+    third = storage.generate_presigned_get("audio-public", "a.wav")
+    assert third != first
+    assert signed == ["a.wav", "a.wav"]
+
+    stats = storage._presign_cache.stats()
+    assert stats["hits"] >= 1
+    assert stats["signed"] - signed_before == 2
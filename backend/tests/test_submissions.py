@@ -1,3 +1,6 @@
+import json
+
+
 def test_submission_flow(client, monkeypatch):
     from app.api import submissions as submissions_api
 
@@ -7,6 +10,7 @@ def test_submission_flow(client, monkeypatch):
         lambda *args, **kwargs: "http://example.com/upload",
     )
     monkeypatch.setattr(submissions_api, "enqueue_submission", lambda *args: None)
+    monkeypatch.setattr(submissions_api, "preflight_upload", lambda *args: None)
 
     register = client.post(
         "/auth/register", json={"email": "uploader@example.com", "password": "pass-123"}
@@ -47,6 +51,12 @@ def test_submission_flow(client, monkeypatch):
     listed = client.get("/submissions", headers=headers)
     assert listed.status_code == 200
     assert len(listed.json()) == 1
+    # El listado no trae los campos de texto largos; el detalle si.
+    assert listed.json()[0]["description"] is None
+
+    detail = client.get(f"/submissions/{payload['id']}", headers=headers)
+    assert detail.status_code == 200
+    assert detail.json()["description"] == "Historia de prueba"
 
 
 def test_delete_submission(client, monkeypatch):
@@ -62,6 +72,7 @@ def test_delete_submission(client, monkeypatch):
         lambda *args, **kwargs: "http://example.com/upload",
     )
     monkeypatch.setattr(submissions_api, "enqueue_submission", lambda *args: None)
+    monkeypatch.setattr(submissions_api, "preflight_upload", lambda *args: None)
     monkeypatch.setattr(
         submissions_api,
         "get_internal_s3_client",
@@ -101,3 +112,200 @@ def test_delete_submission(client, monkeypatch):
     listed = client.get("/submissions", headers=headers)
     assert listed.status_code == 200
     assert listed.json() == []
+
+
+def test_multipart_upload_resume_and_complete(client, monkeypatch):
+    from app import uploads
+    from app.api import submissions as submissions_api
+    from app.api import uploads as uploads_api
+
+    mib = 1024 * 1024
+    stored = {}
+    completed = []
+    monkeypatch.setattr(
+        submissions_api, "generate_presigned_put", lambda *args, **kwargs: "http://example.com/put"
+    )
+    monkeypatch.setattr(submissions_api, "enqueue_submission", lambda *args: None)
+    monkeypatch.setattr(submissions_api, "preflight_upload", lambda *args: None)
+    monkeypatch.setattr(uploads_api, "create_multipart_upload", lambda *args: "upload-1")
+    monkeypatch.setattr(
+        uploads_api,
+        "generate_presigned_upload_part",
+        lambda bucket, key, upload_id, number: f"http://example.com/{upload_id}/{number}",
+    )
+    monkeypatch.setattr(uploads, "list_uploaded_parts", lambda *args: list(stored.values()))
+    monkeypatch.setattr(uploads, "complete_multipart_upload", lambda *args: completed.append(args))
+
+    register = client.post(
+        "/auth/register", json={"email": "multipart@example.com", "password": "pass-123"}
+    )
+    headers = {"Authorization": f"Bearer {register.json()['access_token']}"}
+    created = client.post(
+        "/submissions",
+        json={"filename": "long.m4a", "content_type": "audio/mp4"},
+        headers=headers,
+    ).json()
+    base = f"/submissions/{created['id']}/multipart"
+
+    state = client.post(
+        base, json={"content_type": "audio/mp4", "size": 20 * mib}, headers=headers
+    ).json()
+    assert state["part_size"] == 8 * mib
+    assert state["part_count"] == 3
+    assert state["missing_parts"] == [1, 2, 3]
+
+    urls = client.post(f"{base}/urls", json={}, headers=headers).json()["urls"]
+    assert [url["part_number"] for url in urls] == [1, 2, 3]
+    invalid = client.post(f"{base}/urls", json={"part_numbers": [4]}, headers=headers)
+    assert invalid.status_code == 400
+
+    # Parte 1 reportada; la 2 subio pero el reporte se perdio; la 3 llego cortada.
+    stored[1] = {"part_number": 1, "etag": '"a"', "size": 8 * mib}
+    stored[2] = {"part_number": 2, "etag": '"b"', "size": 8 * mib}
+    stored[3] = {"part_number": 3, "etag": '"c"', "size": mib}
+    progress = client.post(
+        f"{base}/parts", json={"parts": [stored[1]]}, headers=headers
+    ).json()
+    assert progress["bytes_uploaded"] == 8 * mib
+    assert progress["missing_parts"] == [2, 3]
+
+    # Reanudar con el mismo tamano devuelve el upload en curso.
+    resumed = client.post(
+        base, json={"content_type": "audio/mp4", "size": 20 * mib}, headers=headers
+    ).json()
+    assert resumed["upload_id"] == "upload-1"
+    assert resumed["parts_completed"] == 1
+
+    incomplete = client.post(f"{base}/complete", headers=headers)
+    assert incomplete.status_code == 409
+    assert incomplete.json()["detail"]["missing_parts"] == [3]
+    assert completed == []
+
+    stored[3] = {"part_number": 3, "etag": '"c2"', "size": 4 * mib}
+    done = client.post(
+        f"{base}/complete", json={"anonymization_mode": "SOFT"}, headers=headers
+    )
+    assert done.status_code == 200
+    assert done.json()["status"] == "UPLOADED"
+    assert [part["etag"] for part in completed[0][3]] == ['"a"', '"b"', '"c2"']
+    assert client.get(base, headers=headers).status_code == 404
+
+
+def test_mark_uploaded_preflight_rejects_bad_uploads(client, monkeypatch):
+    import subprocess
+
+    from botocore.exceptions import ClientError
+
+    from app import preflight
+    from app.api import submissions as submissions_api
+
+    objects = {}
+    enqueued = []
+
+    class FakeS3:
+        def head_object(self, Bucket, Key):
+            if Key not in objects:
+                raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+            return {"ContentLength": objects[Key]}
+
+        def generate_presigned_url(self, *args, **kwargs):
+            return "http://minio/signed"
+
+    probes = []
+
+    def fake_run(cmd, **kwargs):
+        stdout = probes.pop(0)
+        return subprocess.CompletedProcess(cmd, 0 if stdout else 1, stdout=stdout, stderr="")
+
+    monkeypatch.setattr(
+        submissions_api, "generate_presigned_put", lambda *args, **kwargs: "http://example.com/put"
+    )
+    monkeypatch.setattr(submissions_api, "enqueue_submission", enqueued.append)
+    monkeypatch.setattr(preflight, "get_internal_s3_client", lambda: FakeS3())
+    monkeypatch.setattr(preflight.subprocess, "run", fake_run)
+
+    register = client.post(
+        "/auth/register", json={"email": "preflight@example.com", "password": "pass-123"}
+    )
+    headers = {"Authorization": f"Bearer {register.json()['access_token']}"}
+
+    def create():
+        created = client.post(
+            "/submissions",
+            json={"filename": "clip.m4a", "content_type": "audio/mp4"},
+            headers=headers,
+        ).json()
+        return created["id"], created["object_key"]
+
+    def probe_output(codec_type, codec, duration):
+        streams = [{"codec_type": codec_type, "codec_name": codec}]
+        return json.dumps({"streams": streams, "format": {"duration": duration}})
+
+    def uploaded(submission_id):
+        return client.post(f"/submissions/{submission_id}/uploaded", json={}, headers=headers)
+
+    # Sin objeto todavia: 409 y la submission sigue esperando el upload.
+    missing_id, missing_key = create()
+    assert uploaded(missing_id).status_code == 409
+    detail = client.get(f"/submissions/{missing_id}", headers=headers).json()
+    assert detail["status"] == "CREATED"
+
+    cases = [
+        (0, None, "File is empty"),
+        (50_000, "", "File is not a readable audio file"),
+        (50_000, probe_output("video", "h264", "3.0"), "File has no audio stream"),
+        (50_000, probe_output("audio", "wmav2", "30.0"), "Unsupported audio codec: wmav2"),
+        (50_000, probe_output("audio", "aac", "9000.5"), "Recording is too long"),
+    ]
+    for size, stdout, reason in cases:
+        submission_id, key = create()
+        objects[key] = size
+        if stdout is not None:
+            probes.append(stdout)
+        res = uploaded(submission_id)
+        assert res.status_code == 422
+        assert res.json()["detail"] == reason
+        detail = client.get(f"/submissions/{submission_id}", headers=headers).json()
+        assert detail["status"] == "INVALID"
+    assert enqueued == []
+
+    # WebM sin duracion en el header: pasa y se encola.
+    objects[missing_key] = 50_000
+    probes.append(probe_output("audio", "opus", "N/A"))
+    assert uploaded(missing_id).status_code == 200
+    assert enqueued == [missing_id]
+
+
+def test_mark_uploaded_skips_enqueue_when_notification_queued_it(
+    client, fake_redis, listener, monkeypatch
+):
+    from app.api import submissions as submissions_api
+
+    enqueued = []
+    monkeypatch.setattr(
+        submissions_api, "generate_presigned_put", lambda *args, **kwargs: "http://example.com/put"
+    )
+    monkeypatch.setattr(submissions_api, "enqueue_submission", enqueued.append)
+    monkeypatch.setattr(submissions_api, "preflight_upload", lambda *args: None)
+
+    def create():
+        return client.post(
+            "/submissions",
+            json={"filename": "clip.m4a", "content_type": "audio/mp4"},
+            headers=listener.headers,
+        ).json()["id"]
+
+    # La notificacion de MinIO ya la encolo (worker/ingest.py): ese job sigue solo.
+    detected = create()
+    fake_redis.set(f"ingest:queued:{detected}", "ingest")
+    res = client.post(f"/submissions/{detected}/uploaded", json={}, headers=listener.headers)
+    assert res.status_code == 200
+    assert res.json()["status"] == "UPLOADED"
+    assert enqueued == []
+
+    # Sin notificacion (o el worker ya solto el reclamo): /uploaded reclama y encola.
+    direct = create()
+    res = client.post(f"/submissions/{direct}/uploaded", json={}, headers=listener.headers)
+    assert res.status_code == 200
+    assert enqueued == [direct]
+    assert fake_redis.get(f"ingest:queued:{direct}") == b"api"
@@ -119,7 +119,13 @@ function FeedPage() {
     const audio = audioRef.current;
     if (!audio) return;
 
-    const handlePlay = () => setPlayingId(currentTrack?.id || "");
+    const handlePlay = () => {
+      setPlayingId(currentTrack?.id || "");
+      // Escucha para el ranking de trending (la API deduplica por cliente).
+      if (currentTrack?.id) {
+        fetch(`${apiBase}/feed/${currentTrack.id}/listen`, { method: "POST" }).catch(() => {});
+      }
+    };
     const handlePause = () => setPlayingId("");
     const handleEnded = () => setPlayingId("");
 
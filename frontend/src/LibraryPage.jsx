@@ -14,7 +14,7 @@ const STEP_LABELS = {
   6: "Publicado"
 };
 
-const TERMINAL_STATUSES = new Set(["APPROVED", "REJECTED", "QUARANTINED"]);
+const TERMINAL_STATUSES = new Set(["APPROVED", "REJECTED", "QUARANTINED", "INVALID"]);
 
 function LibraryPage() {
   // Custom hooks
@@ -578,6 +578,7 @@ function getSubmissionTitle(item) {
 function describeSubmission(item) {
   if (item.status === "REJECTED") return "Rechazado por moderacion";
   if (item.status === "QUARANTINED") return "En revision";
+  if (item.status === "INVALID") return "Archivo invalido";
   if (item.status === "APPROVED") return "Publicado";
   if (item.status === "CREATED") return "Listo para subir";
   if (item.status === "UPLOADED") return "En cola para procesar";
@@ -676,6 +677,7 @@ function getStatusDotClass(status) {
   if (normalized === "APPROVED") return "bg-emerald-600";
   if (normalized === "REJECTED") return "bg-[#a24538]";
   if (normalized === "QUARANTINED") return "bg-amber-500";
+  if (normalized === "INVALID") return "bg-[#a24538]";
   if (normalized === "PROCESSING") return "bg-slate-400";
   if (normalized === "UPLOADED") return "bg-slate-400";
   if (normalized === "CREATED") return "bg-slate-400";
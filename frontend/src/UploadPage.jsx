@@ -4,6 +4,12 @@ import Layout from "./components/Layout.jsx";
 import { useAuth } from "./hooks/useAuth.js";
 import { apiBase, fetchJson, logDev } from "./lib/api.js";
 
+// Archivos grandes van en partes (reintento por parte en vez de resubir todo).
+const MULTIPART_THRESHOLD = 16 * 1024 * 1024;
+const PART_CONCURRENCY = 3;
+const PART_URL_BATCH = 20;
+const PART_RETRIES = 3;
+
 function UploadPage() {
   // Custom hooks
   const { token, email, password, authError, headers, setEmail, setPassword, handleRegister, handleLogin, handleLogout } = useAuth();
@@ -102,6 +108,66 @@ function UploadPage() {
     });
   }, []);
 
+  // Upload multipart: firma URLs por tandas, sube partes en paralelo y reporta progreso
+  const uploadMultipartWithProgress = useCallback(async (id, file, contentType) => {
+    const base = `${apiBase}/submissions/${id}/multipart`;
+    const jsonHeaders = { "Content-Type": "application/json", ...headers };
+    const post = (path, body) =>
+      fetchJson(`${base}${path}`, {
+        method: "POST",
+        headers: jsonHeaders,
+        body: body === undefined ? undefined : JSON.stringify(body),
+      });
+
+    const state = await post("", { content_type: contentType, size: file.size });
+    let uploaded = state.bytes_uploaded;
+    const showProgress = () =>
+      setUploadProgress({
+        status: "uploading",
+        message: "Subiendo archivo...",
+        percentage: Math.round((uploaded / file.size) * 100),
+      });
+
+    const uploadParts = async (partNumbers) => {
+      for (let offset = 0; offset < partNumbers.length; offset += PART_URL_BATCH) {
+        const { urls } = await post("/urls", {
+          part_numbers: partNumbers.slice(offset, offset + PART_URL_BATCH),
+        });
+        const done = [];
+        let next = 0;
+        const runner = async () => {
+          while (next < urls.length) {
+            const { part_number: partNumber, url } = urls[next++];
+            const start = (partNumber - 1) * state.part_size;
+            const blob = file.slice(start, Math.min(start + state.part_size, file.size));
+            const etag = await putPartWithRetry(url, blob);
+            if (etag) done.push({ part_number: partNumber, etag, size: blob.size });
+            uploaded += blob.size;
+            showProgress();
+          }
+        };
+        try {
+          await Promise.all(Array.from({ length: PART_CONCURRENCY }, runner));
+        } finally {
+          // Lo ya subido queda registrado aunque falle otra parte.
+          if (done.length) await post("/parts", { parts: done }).catch(() => {});
+        }
+      }
+    };
+
+    showProgress();
+    await uploadParts(state.missing_parts);
+    const complete = await fetch(`${base}/complete`, { method: "POST", headers });
+    if (complete.status === 409) {
+      // MinIO no tiene alguna parte (o llego cortada): segunda pasada solo con esas.
+      const detail = await complete.json();
+      await uploadParts(detail.detail.missing_parts);
+      await post("/complete");
+    } else if (!complete.ok) {
+      throw new Error(`Fallo la subida (${complete.status})`);
+    }
+  }, [headers]);
+
   const uploadImageToMinio = useCallback(async (url, file, contentType) => {
     const res = await fetch(url, {
       method: "PUT",
@@ -216,7 +282,11 @@ function UploadPage() {
       setSubmissionId(data.id);
 
       // 2. Upload a MinIO con tracking de progreso
-      await uploadToMinioWithProgress(data.upload_url, file, contentType);
+      if (file.size >= MULTIPART_THRESHOLD) {
+        await uploadMultipartWithProgress(data.id, file, contentType);
+      } else {
+        await uploadToMinioWithProgress(data.upload_url, file, contentType);
+      }
 
       // 3. Avanzar a paso 2
       setUploadProgress({ status: "uploaded", message: "Archivo subido", percentage: 100 });
@@ -230,7 +300,7 @@ function UploadPage() {
           : "Error de red. Proba de nuevo.";
       setUploadProgress({ status: "error", message, percentage: 0 });
     }
-  }, [headers, uploadToMinioWithProgress]);
+  }, [headers, uploadToMinioWithProgress, uploadMultipartWithProgress]);
 
   // Handler para file input
   const handleFileSelect = useCallback(async (event) => {
@@ -772,6 +842,21 @@ async function readErrorMessage(response, fallback) {
   return fallback;
 }
 
+async function putPartWithRetry(url, blob) {
+  let lastError;
+  for (let attempt = 0; attempt < PART_RETRIES; attempt += 1) {
+    try {
+      const res = await fetch(url, { method: "PUT", body: blob });
+      if (res.ok) return res.headers.get("ETag");
+      lastError = new Error(`Fallo la subida (${res.status})`);
+    } catch (error) {
+      lastError = error;
+    }
+    await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** attempt));
+  }
+  throw lastError;
+}
+
 function guessContentType(file) {
   if (file.type) return file.type;
   const lower = file.name.toLowerCase();
@@ -21,3 +21,11 @@ EOF
     mc cors set "$alias_name/$bucket" "$cors_file" || true
   done
 fi
+
+# Uploads terminados (PUT o multipart completo) -> worker/ingest.py via Redis.
+mc event add "$alias_name/audio-private" arn:minio:sqs::PRIMARY:redis --event put || true
+
+# AUDIO_DELIVERY_MODE=public: el bucket publico se sirve sin firma (browser/CDN).
+if [ "${MINIO_PUBLIC_READ:-false}" = "true" ]; then
+  mc anonymous set download "$alias_name/audio-public" || true
+fi
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# Latencia de otras rutas (por defecto /feed) con y sin una rafaga de logins.
+# Uso: python scripts/bench_login.py --api http://localhost:8000 --duration 20
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def probe(client: httpx.AsyncClient, path: str, stop_at: float, out: List[float]) -> None:
+    while time.monotonic() < stop_at:
+        started = time.perf_counter()
+        await client.get(path)
+        out.append((time.perf_counter() - started) * 1000)
+
+
+async def login_loop(
+    client: httpx.AsyncClient, email: str, password: str, stop_at: float, stats: dict
+) -> None:
+    while time.monotonic() < stop_at:
+        res = await client.post("/auth/login", data={"username": email, "password": password})
+        stats[res.status_code] = stats.get(res.status_code, 0) + 1
+
+
+async def run_phase(args, with_logins: bool) -> None:
+    latencies: List[float] = []
+    logins: dict = {}
+    limits = httpx.Limits(max_connections=args.logins + args.probes + 4)
+    async with httpx.AsyncClient(base_url=args.api, timeout=30, limits=limits) as client:
+        stop_at = time.monotonic() + args.duration
+        tasks = [probe(client, args.path, stop_at, latencies) for _ in range(args.probes)]
+        if with_logins:
+            tasks += [
+                login_loop(client, args.email, args.password, stop_at, logins)
+                for _ in range(args.logins)
+            ]
+        await asyncio.gather(*tasks)
+
+    label = f"con {args.logins} logins concurrentes" if with_logins else "sin logins"
+    print(f"\n{args.path} {label}: {len(latencies)} requests")
+    if latencies:
+        print(
+            f"  p50={statistics.median(latencies):.1f}ms "
+            f"p95={percentile(latencies, 95):.1f}ms p99={percentile(latencies, 99):.1f}ms"
+        )
+    if with_logins:
+        total = sum(logins.values())
+        print(f"  logins: {total} ({total / args.duration:.1f}/s) por status {logins}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Login load vs latencia de otras rutas")
+    parser.add_argument("--api", default="http://localhost:8000")
+    parser.add_argument("--path", default="/feed")
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--probes", type=int, default=4)
+    parser.add_argument("--email", default="bench-login@example.com")
+    parser.add_argument("--password", default="bench-pass-123")
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.api, timeout=30) as client:
+        await client.post("/auth/register", json={"email": args.email, "password": args.password})
+
+    await run_phase(args, with_logins=False)
+    await run_phase(args, with_logins=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# Micro-benchmark de serializacion de una pagina de feed de 50 items: camino
+# anterior (modelos Pydantic + jsonable_encoder + json) contra el actual
+# (dicts + orjson), y costo/tamano de gzip y brotli sobre el mismo body.
+# Uso: python scripts/bench_serialization.py --items 50 --rounds 2000
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.responses import brotli, compress, render_json  # noqa: E402
+from app.schemas import FeedItem  # noqa: E402
+
+
+def make_rows(count: int):
+    now = datetime(2026, 10, 19, 12, 0, 0)
+    return [
+        SimpleNamespace(
+            id=f"00000000-0000-0000-0000-{index:012d}",
+            user_id="11111111-2222-3333-4444-555555555555",
+            title=f"Historia numero {index}",
+            summary="Una noche en el colectivo alguien conto algo que nadie esperaba. " * 3,
+            tags=["noche", "ciudad", "colectivo"],
+            cover_url=f"http://localhost:9000/audio-public/covers/{index}.jpg",
+            public_url=f"http://localhost:9000/audio-public/{index}.mp3?X-Amz-Signature=abc",
+            published_at=now - timedelta(minutes=index),
+            vote_count=index % 7,
+        )
+        for index in range(count)
+    ]
+
+
+def old_path(rows) -> bytes:
+    items = [
+        FeedItem(
+            id=row.id,
+            user_id=row.user_id,
+            transcript_preview=None,
+            title=row.title,
+            summary=row.summary,
+            tags=row.tags,
+            cover_url=row.cover_url,
+            public_url=row.public_url,
+            published_at=row.published_at,
+            vote_count=row.vote_count,
+        )
+        for row in rows
+    ]
+    return JSONResponse(jsonable_encoder(items)).body
+
+
+def new_path(rows) -> bytes:
+    items = [
+        {
+            "id": row.id,
+            "user_id": row.user_id,
+            "transcript_preview": None,
+            "title": row.title,
+            "summary": row.summary,
+            "tags": row.tags,
+            "cover_url": row.cover_url,
+            "public_url": row.public_url,
+            "published_at": row.published_at,
+            "vote_count": row.vote_count,
+        }
+        for row in rows
+    ]
+    return render_json(items)
+
+
+def measure(label: str, fn, rounds: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    per_call = (time.perf_counter() - started) / rounds * 1_000_000
+    print(f"  {label:<28} {per_call:9.1f} us/op")
+    return per_call
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serializacion de una pagina de feed")
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.items)
+    body = new_path(rows)
+    print(f"\nFeed de {args.items} items, {len(body)} bytes sin comprimir")
+    old = measure("pydantic + json", lambda: old_path(rows), args.rounds)
+    new = measure("dicts + orjson", lambda: new_path(rows), args.rounds)
+    print(f"  speedup: {old / new:.1f}x")
+
+    print("\nCompresion (una vez por entrada de cache del feed)")
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    for encoding in encodings:
+        size = len(compress(body, encoding))
+        measure(f"{encoding} ({size} bytes)", lambda: compress(body, encoding), args.rounds // 10)
+    if brotli is None:
+        print("  (brotli no instalado: solo gzip)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import gzip
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from botocore.exceptions import BotoCoreError, ClientError
+from sqlalchemy import JSON, DateTime, bindparam, create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from db import engine
+from event_archive import serialize_event_row
+from redis_client import job_lock
+from settings import settings
+from storage import get_s3_client
+
+# Archivos para analisis offline: analytics/<dataset>/dt=YYYY-MM-DD/part-<run>.ndjson.gz
+ANALYTICS_PREFIX = "analytics/"
+WATERMARK_KEY = f"{ANALYTICS_PREFIX}_watermark.json"
+EXPORT_LOCK_KEY = "analytics:export:lock"
+EPOCH = "1970-01-01T00:00:00"
+
+# Sin transcript/description: el export es para metricas, no para el contenido.
+SUBMISSION_COLUMNS = (
+    "id",
+    "user_id",
+    "status",
+    "processing_step",
+    "title",
+    "summary",
+    "tags",
+    "viral_analysis",
+    "moderation_result",
+    "anonymization_mode",
+    "created_at",
+    "published_at",
+    "updated_at",
+)
+
+# dataset -> (query base, columna del watermark, tipos para decodificar filas)
+DATASETS: Dict[str, Tuple[str, str, Dict[str, Any]]] = {
+    "events": (
+        "SELECT id, event_name, event_version, submission_id, timestamp, payload "
+        "FROM events",
+        "timestamp",
+        {"timestamp": DateTime, "payload": JSON},
+    ),
+    "submissions": (
+        f"SELECT {', '.join(SUBMISSION_COLUMNS)} FROM audio_submissions",
+        "updated_at",
+        {
+            "tags": JSON,
+            "created_at": DateTime,
+            "published_at": DateTime,
+            "updated_at": DateTime,
+        },
+    ),
+}
+
+logger = logging.getLogger("worker.analytics_export")
+
+_export_engine = None
+
+
+def _get_engine():
+    # Opcional: leer de una replica para no competir con la API.
+    global _export_engine
+    if not settings.analytics_database_url:
+        return engine
+    if _export_engine is None:
+        _export_engine = create_engine(settings.analytics_database_url, pool_pre_ping=True)
+    return _export_engine
+
+
+def _serialize_submission(row) -> str:
+    return json.dumps(
+        {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in row._mapping.items()
+        }
+    )
+
+
+SERIALIZERS: Dict[str, Callable[[Any], str]] = {
+    "events": serialize_event_row,
+    "submissions": _serialize_submission,
+}
+
+
+def load_watermark(client) -> Dict[str, Dict[str, str]]:
+    try:
+        obj = client.get_object(Bucket=settings.s3_artifacts_bucket, Key=WATERMARK_KEY)
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in {"404", "NoSuchKey", "NotFound"}:
+            return {}
+        raise
+    return json.loads(obj["Body"].read())
+
+
+def save_watermark(client, watermark: Dict[str, Dict[str, str]]) -> None:
+    client.put_object(
+        Bucket=settings.s3_artifacts_bucket,
+        Key=WATERMARK_KEY,
+        Body=json.dumps(watermark, indent=2).encode("utf-8"),
+        ContentType="application/json",
+    )
+
+
+def export_dataset(
+    conn, client, dataset: str, mark: Dict[str, str], upper: datetime, run_id: str
+) -> Tuple[Dict[str, str], int]:
+    base_query, column, types = DATASETS[dataset]
+    serialize = SERIALIZERS[dataset]
+    # (columna, id) > watermark: cada corrida lee solo filas nuevas; el limite
+    # superior deja afuera commits recientes que todavia podrian llegar desordenados.
+    result = conn.execution_options(stream_results=True).execute(
+        text(
+            f"{base_query} WHERE ({column}, id) > (:mark_ts, :mark_id) "
+            f"AND {column} < :upper ORDER BY {column}, id LIMIT :limit"
+        )
+        .bindparams(bindparam("mark_ts", type_=DateTime), bindparam("upper", type_=DateTime))
+        .columns(**types),
+        {
+            "mark_ts": datetime.fromisoformat(mark.get("ts", EPOCH)),
+            "mark_id": mark.get("id", ""),
+            "upper": upper,
+            "limit": settings.analytics_export_batch_rows,
+        },
+    )
+    count = 0
+    last: Optional[Tuple[datetime, str]] = None
+    with tempfile.TemporaryDirectory() as workdir:
+        files: Dict[str, Any] = {}
+        try:
+            for row in result:
+                stamp = getattr(row, column)
+                day = stamp.date().isoformat()
+                if day not in files:
+                    files[day] = gzip.open(
+                        os.path.join(workdir, f"{day}.ndjson.gz"), "wt", encoding="utf-8"
+                    )
+                files[day].write(serialize(row) + "\n")
+                last = (stamp, row.id)
+                count += 1
+        finally:
+            for handle in files.values():
+                handle.close()
+        for day in files:
+            client.upload_file(
+                os.path.join(workdir, f"{day}.ndjson.gz"),
+                settings.s3_artifacts_bucket,
+                f"{ANALYTICS_PREFIX}{dataset}/dt={day}/part-{run_id}.ndjson.gz",
+                ExtraArgs={"ContentType": "application/x-ndjson", "ContentEncoding": "gzip"},
+            )
+    if last is None:
+        return mark, 0
+    return {"ts": last[0].isoformat(), "id": last[1]}, count
+
+
+def run_analytics_export(now: Optional[datetime] = None) -> None:
+    if not settings.analytics_export_enabled:
+        return
+    now = now or datetime.utcnow()
+    upper = now - timedelta(seconds=settings.analytics_export_lag_seconds)
+    run_id = now.strftime("%Y%m%dT%H%M%S")
+    with job_lock(EXPORT_LOCK_KEY, ttl=3600) as acquired:
+        if not acquired:
+            return
+        try:
+            client = get_s3_client()
+            watermark = load_watermark(client)
+            with _get_engine().connect() as conn:
+                for dataset in DATASETS:
+                    mark, count = export_dataset(
+                        conn, client, dataset, watermark.get(dataset, {}), upper, run_id
+                    )
+                    # Se avanza el watermark recien con los archivos ya subidos.
+                    watermark[dataset] = mark
+                    save_watermark(client, watermark)
+                    if count:
+                        logger.info("Exported %s %s rows", count, dataset)
+        except (SQLAlchemyError, BotoCoreError, ClientError) as exc:
+            logger.warning("Analytics export failed: %s", exc)
@@ -1,3 +1,6 @@
+import logging
+import time
+
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import declarative_base, sessionmaker
 
@@ -7,6 +10,9 @@ engine = create_engine(settings.database_url, pool_pre_ping=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
+# Debe coincidir con SCHEMA_VERSION en backend/app/migrations.py.
+REQUIRED_SCHEMA_VERSION = 8
+
 
 def get_db():
     db = SessionLocal()
@@ -16,16 +22,33 @@ def get_db():
         db.close()
 
 
-def ensure_schema() -> None:
-    with engine.begin() as conn:
-        conn.execute(
-            text("ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS summary TEXT")
-        )
-        conn.execute(
-            text("ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS title TEXT")
+def current_schema_version() -> int:
+    with engine.connect() as conn:
+        exists = conn.execute(text("SELECT to_regclass('schema_migrations')")).scalar()
+        if not exists:
+            return 0
+        return int(
+            conn.execute(
+                text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+            ).scalar()
         )
-        conn.execute(
-            text(
-                "ALTER TABLE audio_submissions ADD COLUMN IF NOT EXISTS viral_analysis INTEGER"
+
+
+def wait_for_schema() -> None:
+    # Las migraciones las aplica la API (backend/app/migrations.py); el worker solo verifica.
+    if engine.dialect.name != "postgresql":
+        Base.metadata.create_all(bind=engine)
+        return
+    deadline = time.monotonic() + settings.schema_wait_seconds
+    while True:
+        version = current_schema_version()
+        if version >= REQUIRED_SCHEMA_VERSION:
+            return
+        if time.monotonic() >= deadline:
+            raise RuntimeError(
+                f"Schema version {version} < required {REQUIRED_SCHEMA_VERSION}"
             )
+        logging.info(
+            "Waiting for schema version %s (current %s)", REQUIRED_SCHEMA_VERSION, version
         )
+        time.sleep(2)
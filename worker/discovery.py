@@ -0,0 +1,78 @@
+import logging
+from typing import Iterable, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from feed_pages import normalize_tags
+from models import AudioSubmission
+from redis_client import get_redis_client
+
+# Formato compartido con la API (backend/app/discovery.py): sets para SRANDMEMBER.
+DISCOVERY_ALL_KEY = "feed:random:all"
+DISCOVERY_BAND_PREFIX = "feed:random:band:"
+DISCOVERY_TAG_PREFIX = "feed:random:tag:"
+DISCOVERY_TAGS_KEY = "feed:random:tags"
+VIRAL_BANDS = (("low", 0, 40), ("mid", 40, 85), ("high", 85, 101))
+
+logger = logging.getLogger("worker.discovery")
+
+
+def viral_band(viral_analysis: Optional[int]) -> Optional[str]:
+    if viral_analysis is None:
+        return None
+    for band, lower, upper in VIRAL_BANDS:
+        if lower <= viral_analysis < upper:
+            return band
+    return None
+
+
+def _add(pipe, item_id: str, viral_analysis: Optional[int], tags: Optional[Iterable]) -> None:
+    pipe.sadd(DISCOVERY_ALL_KEY, item_id)
+    band = viral_band(viral_analysis)
+    if band:
+        pipe.sadd(f"{DISCOVERY_BAND_PREFIX}{band}", item_id)
+    for tag in normalize_tags(tags):
+        pipe.sadd(f"{DISCOVERY_TAG_PREFIX}{tag}", item_id)
+        pipe.sadd(DISCOVERY_TAGS_KEY, tag)
+
+
+def index_story(submission: AudioSubmission) -> None:
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        _add(pipe, submission.id, submission.viral_analysis, submission.tags)
+        pipe.execute()
+    except RedisError as exc:
+        logger.warning("Could not index %s for discovery: %s", submission.id, exc)
+
+
+def rebuild_discovery_index(db: Session) -> None:
+    try:
+        rows = db.execute(
+            select(
+                AudioSubmission.id, AudioSubmission.viral_analysis, AudioSubmission.tags
+            ).where(
+                AudioSubmission.status == "APPROVED",
+                AudioSubmission.public_audio_key.isnot(None),
+            )
+        ).all()
+        client = get_redis_client()
+        stale = [
+            f"{DISCOVERY_TAG_PREFIX}{tag.decode('utf-8')}"
+            for tag in client.smembers(DISCOVERY_TAGS_KEY)
+        ]
+        pipe = client.pipeline(transaction=True)
+        pipe.delete(
+            DISCOVERY_ALL_KEY,
+            DISCOVERY_TAGS_KEY,
+            *[f"{DISCOVERY_BAND_PREFIX}{band}" for band, _, _ in VIRAL_BANDS],
+            *stale,
+        )
+        for item_id, viral_analysis, tags in rows:
+            _add(pipe, item_id, viral_analysis, tags)
+        pipe.execute()
+    except (SQLAlchemyError, RedisError) as exc:
+        db.rollback()
+        logger.warning("Could not rebuild discovery index: %s", exc)
@@ -0,0 +1,160 @@
+import gzip
+import json
+import logging
+import re
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from db import engine
+from redis_client import job_lock
+from settings import settings
+from storage import get_s3_client
+
+# Particiones mensuales creadas por la migracion 3 (backend/app/migrations.py).
+PARTITION_RE = re.compile(r"^events_(\d{4})_(\d{2})$")
+ARCHIVE_PREFIX = "events/archive/"
+ARCHIVE_LOCK_KEY = "events:archive:lock"
+
+logger = logging.getLogger("worker.event_archive")
+
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def _next_month(value: date) -> date:
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month_start: date) -> str:
+    return f"events_{month_start:%Y_%m}"
+
+
+def partition_upper_bound(name: str) -> Optional[date]:
+    match = PARTITION_RE.match(name)
+    if not match:
+        return None
+    return _next_month(date(int(match.group(1)), int(match.group(2)), 1))
+
+
+def cold_partitions(names: List[str], now: datetime) -> List[str]:
+    # Fria: todo su rango quedo fuera de la ventana de retencion.
+    cutoff = (now - timedelta(days=settings.event_retention_days)).date()
+    cold = []
+    for name in sorted(names):
+        upper = partition_upper_bound(name)
+        if upper and upper <= cutoff:
+            cold.append(name)
+    return cold
+
+
+def _create_partition(conn, month: date) -> None:
+    name = partition_name(month)
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar():
+        return
+    bounds = {"start": month, "end": _next_month(month)}
+    # Si events_default ya tiene filas del rango, CREATE ... PARTITION OF falla:
+    # se sacan primero y se reinsertan en la particion nueva.
+    conn.execute(
+        text(
+            "CREATE TEMP TABLE events_moved ON COMMIT DROP AS "
+            "WITH moved AS (DELETE FROM events_default "
+            "WHERE timestamp >= :start AND timestamp < :end RETURNING *) "
+            "SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    conn.execute(
+        text(f"CREATE TABLE {name} PARTITION OF events FOR VALUES FROM (:start) TO (:end)"),
+        bounds,
+    )
+    moved = conn.execute(text("INSERT INTO events SELECT * FROM events_moved")).rowcount
+    if moved:
+        logger.info("Moved %s events from events_default into %s", moved, name)
+
+
+def ensure_partitions(now: datetime) -> None:
+    month = _month_start(now.date())
+    for _ in range(settings.event_partition_months_ahead + 1):
+        # Una transaccion por mes: un mes que falla no frena a los demas.
+        with engine.begin() as conn:
+            _create_partition(conn, month)
+        month = _next_month(month)
+
+
+def _list_partitions() -> List[str]:
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = 'events'"
+            )
+        ).all()
+    return [row[0] for row in rows]
+
+
+def serialize_event_row(row) -> str:
+    return json.dumps(
+        {
+            "id": row.id,
+            "event_name": row.event_name,
+            "event_version": row.event_version,
+            "submission_id": row.submission_id,
+            "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+            "payload": row.payload,
+        }
+    )
+
+
+def archive_partition(name: str) -> int:
+    count = 0
+    with tempfile.NamedTemporaryFile(suffix=".ndjson.gz") as tmp:
+        with gzip.open(tmp.name, "wt", encoding="utf-8") as out:
+            with engine.connect() as conn:
+                result = conn.execution_options(stream_results=True).execute(
+                    text(
+                        "SELECT id, event_name, event_version, submission_id, timestamp, payload "
+                        f"FROM {name} ORDER BY timestamp, id"
+                    )
+                )
+                for row in result:
+                    out.write(serialize_event_row(row) + "\n")
+                    count += 1
+        get_s3_client().upload_file(
+            tmp.name,
+            settings.s3_artifacts_bucket,
+            f"{ARCHIVE_PREFIX}{name}.ndjson.gz",
+            ExtraArgs={"ContentType": "application/x-ndjson", "ContentEncoding": "gzip"},
+        )
+    # Se borra solo despues de subir el archivo.
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE events DETACH PARTITION {name}"))
+        conn.execute(text(f"DROP TABLE {name}"))
+    return count
+
+
+def run_event_maintenance(now: Optional[datetime] = None) -> None:
+    if engine.dialect.name != "postgresql":
+        return
+    now = now or datetime.utcnow()
+    with job_lock(ARCHIVE_LOCK_KEY, ttl=3600) as acquired:
+        if not acquired:
+            return
+        try:
+            ensure_partitions(now)
+        except SQLAlchemyError as exc:
+            logger.warning("Event partition creation failed: %s", exc)
+        # El archivado no depende de que se hayan podido crear las particiones futuras.
+        try:
+            for name in cold_partitions(_list_partitions(), now):
+                count = archive_partition(name)
+                logger.info("Archived %s (%s events)", name, count)
+        except (SQLAlchemyError, BotoCoreError, ClientError) as exc:
+            logger.warning("Event archival failed: %s", exc)
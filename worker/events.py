@@ -1,19 +1,73 @@
+import json
+import logging
+import uuid
 from datetime import datetime
 from typing import Any, Optional
 
+from redis.exceptions import RedisError
 from sqlalchemy.orm import Session
 
-from models import Event
+from feed_cache import FEED_INVALIDATING_EVENTS, invalidate_feed
+from models import AudioSubmission, Event
+from redis_client import get_redis_client
+from settings import settings
+
+# Compartido con la API (backend/app/event_bus.py y backend/app/event_log.py).
+EVENTS_CHANNEL_PREFIX = "events:user:"
+EVENT_LOG_PREFIX = "events:log:user:"
+
+logger = logging.getLogger("worker.events")
+
+
+def publish_event(user_id: Optional[str], event: dict) -> None:
+    if not user_id:
+        return
+    try:
+        client = get_redis_client()
+        log_key = f"{EVENT_LOG_PREFIX}{user_id}"
+        # Mismo TTL que la API (backend/app/event_log.py append_event).
+        pipe = client.pipeline(transaction=False)
+        pipe.xadd(
+            log_key,
+            {"event": json.dumps(event, default=str)},
+            maxlen=settings.event_log_maxlen,
+            approximate=True,
+        )
+        pipe.expire(log_key, settings.event_log_ttl_seconds)
+        stream_id, _ = pipe.execute()
+        client.publish(
+            f"{EVENTS_CHANNEL_PREFIX}{user_id}",
+            json.dumps({**event, "stream_id": stream_id.decode("utf-8")}, default=str),
+        )
+    except RedisError as exc:
+        logger.warning("Could not publish event %s: %s", event.get("event_name"), exc)
 
 
 def record_event(
     db: Session, event_name: str, submission_id: Optional[str], payload: Any | None
 ) -> None:
     event = Event(
+        id=uuid.uuid4().hex,
         event_name=event_name,
         submission_id=submission_id,
         payload=payload,
         timestamp=datetime.utcnow(),
     )
+    # La submission en proceso ya esta en el identity map (a lo sumo un refresh).
+    submission = db.get(AudioSubmission, submission_id) if submission_id else None
+    user_id = submission.user_id if submission else None
+    event_id, timestamp = event.id, event.timestamp
     db.add(event)
     db.commit()
+    publish_event(
+        user_id,
+        {
+            "id": event_id,
+            "event_name": event_name,
+            "submission_id": submission_id,
+            "timestamp": timestamp.isoformat(),
+            "payload": payload,
+        },
+    )
+    if event_name in FEED_INVALIDATING_EVENTS:
+        invalidate_feed()
@@ -0,0 +1,18 @@
+import logging
+
+from redis.exceptions import RedisError
+
+from redis_client import get_redis_client
+
+# Compartido con la API (backend/app/feed_cache.py).
+FEED_GENERATION_KEY = "feed:generation"
+FEED_INVALIDATING_EVENTS = {"audio.published"}
+
+logger = logging.getLogger("worker.feed_cache")
+
+
+def invalidate_feed() -> None:
+    try:
+        get_redis_client().incr(FEED_GENERATION_KEY)
+    except RedisError as exc:
+        logger.warning("Could not invalidate feed cache: %s", exc)
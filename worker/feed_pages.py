@@ -0,0 +1,153 @@
+import json
+import logging
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import cast, column, func, select, table
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from models import AudioSubmission
+from redis_client import get_redis_client
+
+# Formato compartido con la API (backend/app/feed_pages.py).
+FEED_PAGE_SIZE = 50
+GLOBAL_PAGE_KEY = "feed:page:global"
+TAG_PAGE_PREFIX = "feed:page:tag:"
+VOTE_COUNTS_KEY = "feed:votes"
+STALE_PAGES_KEY = "feed:page:stale"
+
+logger = logging.getLogger("worker.feed_pages")
+
+# El worker no mapea users/votes; alcanza con las columnas que lee.
+_users = table("users", column("id"), column("profile_image_key"))
+_votes = table("votes", column("audio_id"))
+
+
+def page_key(tag: Optional[str]) -> str:
+    if tag:
+        return f"{TAG_PAGE_PREFIX}{tag}"
+    return GLOBAL_PAGE_KEY
+
+
+def normalize_tags(tags: Optional[Iterable]) -> List[str]:
+    normalized: List[str] = []
+    for tag in tags or []:
+        value = str(tag).strip().lower()
+        if value and value not in normalized:
+            normalized.append(value)
+    return normalized
+
+
+def _load_page(db: Session, tag: Optional[str]) -> tuple[list, bool]:
+    # Conteo correlacionado (ix_votes_audio_id), igual que la API.
+    vote_count = (
+        select(func.count())
+        .where(_votes.c.audio_id == AudioSubmission.id)
+        .correlate(AudioSubmission)
+        .scalar_subquery()
+        .label("vote_count")
+    )
+    stmt = (
+        select(AudioSubmission, _users.c.profile_image_key, vote_count)
+        .outerjoin(_users, AudioSubmission.user_id == _users.c.id)
+        .where(
+            AudioSubmission.status == "APPROVED",
+            AudioSubmission.public_audio_key.isnot(None),
+        )
+        .order_by(AudioSubmission.published_at.desc(), AudioSubmission.id.desc())
+    )
+    use_postgres = db.get_bind().dialect.name == "postgresql"
+    if tag and use_postgres:
+        stmt = stmt.where(cast(AudioSubmission.tags, JSONB).contains([tag]))
+    if tag and not use_postgres:
+        rows = [
+            row
+            for row in db.execute(stmt.limit(200)).all()
+            if tag in normalize_tags(row[0].tags)
+        ]
+    else:
+        rows = db.execute(stmt.limit(FEED_PAGE_SIZE + 1)).all()
+    return rows[:FEED_PAGE_SIZE], len(rows) > FEED_PAGE_SIZE
+
+
+def _serialize_item(item: AudioSubmission, profile_image_key, vote_count) -> dict:
+    return {
+        "id": item.id,
+        "user_id": item.user_id,
+        "title": item.title,
+        "summary": item.summary,
+        "tags": item.tags,
+        "public_audio_key": item.public_audio_key,
+        "cover_key": item.cover_image_key or profile_image_key,
+        "published_at": item.published_at.isoformat() if item.published_at else None,
+        "vote_count": vote_count or 0,
+    }
+
+
+def materialize_feed_pages(db: Session, tags: Optional[Iterable] = None) -> None:
+    targets: List[Optional[str]] = [None, *normalize_tags(tags)]
+    try:
+        client = get_redis_client()
+        pipe = client.pipeline(transaction=False)
+        vote_counts = {}
+        for tag in targets:
+            rows, has_more = _load_page(db, tag)
+            items = [_serialize_item(*row) for row in rows]
+            vote_counts.update({item["id"]: item["vote_count"] for item in items})
+            document = {
+                "items": items,
+                "has_more": has_more,
+                "generated_at": datetime.utcnow().isoformat(),
+            }
+            pipe.set(page_key(tag), json.dumps(document))
+        if vote_counts:
+            pipe.hset(VOTE_COUNTS_KEY, mapping=vote_counts)
+        pipe.execute()
+    except (SQLAlchemyError, RedisError) as exc:
+        db.rollback()
+        logger.warning("Could not materialize feed pages: %s", exc)
+
+
+def rebuild_all_feed_pages(db: Session) -> None:
+    rows = (
+        db.query(AudioSubmission.tags)
+        .filter(AudioSubmission.status == "APPROVED", AudioSubmission.tags.isnot(None))
+        .all()
+    )
+    tags = set()
+    for row in rows:
+        tags.update(normalize_tags(row[0]))
+    materialize_feed_pages(db, sorted(tags))
+
+
+def refresh_stale_feed_pages(db: Session) -> None:
+    # Paginas que la API borro al quitar una historia, o la global si Redis la perdio.
+    try:
+        client = get_redis_client()
+        if not client.exists(GLOBAL_PAGE_KEY):
+            client.delete(STALE_PAGES_KEY)
+            rebuild_all_feed_pages(db)
+            return
+        stale = client.spop(STALE_PAGES_KEY, 1000) or []
+    except RedisError as exc:
+        logger.warning("Could not read stale feed pages: %s", exc)
+        return
+    tags = [
+        key.decode("utf-8")[len(TAG_PAGE_PREFIX):]
+        for key in stale
+        if key.decode("utf-8").startswith(TAG_PAGE_PREFIX)
+    ]
+    if stale:
+        materialize_feed_pages(db, tags)
+
+
+def run_feed_page_refresh() -> None:
+    db = SessionLocal()
+    try:
+        refresh_stale_feed_pages(db)
+    finally:
+        db.close()
@@ -0,0 +1,174 @@
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from urllib.parse import unquote_plus
+
+from redis.exceptions import RedisError
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from events import record_event
+from models import AudioSubmission
+from preflight import preflight_reason
+from processing import STEPS
+from redis_client import (
+    INGEST_CLAIM_TTL_SECONDS,
+    INGEST_QUEUED_PREFIX,
+    QUEUE_NAME,
+    get_redis_client,
+    job_lock,
+)
+from settings import settings
+
+INGEST_SEEN_PREFIX = "ingest:seen:"
+INGEST_SWEEP_LOCK_KEY = "ingest:sweep:lock"
+
+logger = logging.getLogger("worker.ingest")
+
+
+def created_objects(raw: bytes) -> List[Tuple[str, str, str]]:
+    # Formato "access" del target Redis de MinIO: [{"Event": [registros S3], "EventTime": ...}].
+    payload = json.loads(raw)
+    entries = payload if isinstance(payload, list) else [payload]
+    objects = []
+    for entry in entries:
+        for record in entry.get("Event") or entry.get("Records") or []:
+            if not record.get("eventName", "").startswith("s3:ObjectCreated:"):
+                continue
+            bucket = record["s3"]["bucket"]["name"]
+            item = record["s3"]["object"]
+            objects.append((bucket, unquote_plus(item["key"]), item.get("eTag") or ""))
+    return objects
+
+
+def parse_original_key(key: str) -> Optional[Tuple[str, str]]:
+    # {user_id}/{submission_id}/original.ext (backend/app/api/submissions.py).
+    parts = key.split("/")
+    if len(parts) != 3 or not parts[2].startswith("original"):
+        return None
+    return parts[0], parts[1]
+
+
+def ingest_object(db: Session, bucket: str, key: str, etag: str) -> bool:
+    if bucket != settings.s3_private_bucket:
+        return False
+    parsed = parse_original_key(key)
+    if parsed is None:
+        return False
+    user_id, submission_id = parsed
+    submission = db.get(AudioSubmission, submission_id)
+    if not submission or submission.user_id != user_id or submission.original_audio_key != key:
+        return False
+    if submission.status != "CREATED" or submission.processing_step >= STEPS["tag"]:
+        # /uploaded ya la encolo, o el preproceso ya corrio.
+        return False
+    client = get_redis_client()
+    # MinIO reintenta entregas: se encola una vez por version del objeto.
+    first = client.set(
+        f"{INGEST_SEEN_PREFIX}{submission_id}:{etag}",
+        "1",
+        nx=True,
+        ex=settings.ingest_dedupe_ttl_seconds,
+    )
+    if not first:
+        return False
+    claimed = client.set(
+        f"{INGEST_QUEUED_PREFIX}{submission_id}", "ingest", nx=True, ex=INGEST_CLAIM_TTL_SECONDS
+    )
+    if not claimed:
+        # /uploaded llego antes y ya la encolo.
+        return False
+    reason = preflight_reason(bucket, key)
+    if reason is not None:
+        # No se preprocesa: /uploaded repite el chequeo y responde 422 con el motivo.
+        submission.status = "INVALID"
+        db.commit()
+        record_event(db, "audio.preflight_failed", submission_id, {"reason": reason})
+        return False
+    client.rpush(QUEUE_NAME, submission_id)
+    record_event(db, "audio.upload_detected", submission_id, {"object_key": key})
+    return True
+
+
+def handle_notification(raw: bytes) -> int:
+    try:
+        objects = created_objects(raw)
+    except (ValueError, KeyError, TypeError, AttributeError) as exc:
+        logger.warning("Ignoring malformed bucket notification: %s", exc)
+        return 0
+    db = SessionLocal()
+    try:
+        return sum(ingest_object(db, bucket, key, etag) for bucket, key, etag in objects)
+    finally:
+        db.close()
+
+
+def finalize_stalled_uploads(db: Session, now: Optional[datetime] = None) -> int:
+    # Subidas preprocesadas que quedaron sin anonimizar pasado el margen:
+    # - UPLOADED: /uploaded no pudo reclamar el encolado (el worker no solto el
+    #   reclamo o se cayo tras el preproceso); se vuelven a encolar.
+    # - CREATED: el cliente nunca llamo a /uploaded (pestana cerrada); solo si
+    #   INGEST_OPTIONS_GRACE_SECONDS > 0 se publican con las opciones por defecto.
+    now = now or datetime.utcnow()
+    waiting = [
+        and_(
+            AudioSubmission.status == "UPLOADED",
+            AudioSubmission.updated_at
+            < now - timedelta(seconds=settings.ingest_requeue_after_seconds),
+        )
+    ]
+    if settings.ingest_options_grace_seconds > 0:
+        waiting.append(
+            and_(
+                AudioSubmission.status == "CREATED",
+                AudioSubmission.updated_at
+                < now - timedelta(seconds=settings.ingest_options_grace_seconds),
+            )
+        )
+    stalled = (
+        db.query(AudioSubmission)
+        .filter(
+            or_(*waiting),
+            AudioSubmission.processing_step >= STEPS["tag"],
+            AudioSubmission.processing_step < STEPS["publish"],
+        )
+        .all()
+    )
+    if not stalled:
+        return 0
+    defaulted = {submission.id for submission in stalled if submission.status == "CREATED"}
+    for submission in stalled:
+        submission.status = "UPLOADED"
+        # Un job que vuelve a fallar se reintenta recien en el proximo margen.
+        submission.updated_at = now
+    db.commit()
+    client = get_redis_client()
+    for submission in stalled:
+        client.rpush(QUEUE_NAME, submission.id)
+        if submission.id in defaulted:
+            record_event(db, "audio.options_defaulted", submission.id, {})
+        else:
+            record_event(db, "audio.requeued", submission.id, {})
+    return len(stalled)
+
+
+def run_stalled_upload_sweep() -> None:
+    if settings.ingest_requeue_after_seconds <= 0:
+        return
+    with job_lock(INGEST_SWEEP_LOCK_KEY, ttl=600) as acquired:
+        if not acquired:
+            return
+        db = SessionLocal()
+        try:
+            count = finalize_stalled_uploads(db)
+        except (SQLAlchemyError, RedisError) as exc:
+            db.rollback()
+            logger.warning("Stalled upload sweep failed: %s", exc)
+            return
+        finally:
+            db.close()
+        if count:
+            logger.info("Enqueued %s stalled uploads", count)
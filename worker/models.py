@@ -24,6 +24,10 @@ class AudioSubmission(Base):
     anonymization_mode = Column(String, nullable=False)
     created_at = Column(DateTime, nullable=False)
     published_at = Column(DateTime, nullable=True)
+    # Lo usa el export de analytics como watermark de snapshots.
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True
+    )
 
 
 class Event(Base):
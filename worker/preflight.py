@@ -0,0 +1,84 @@
+import json
+import logging
+import subprocess
+from fnmatch import fnmatch
+from typing import Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from settings import settings
+from storage import get_s3_client
+
+logger = logging.getLogger("worker.preflight")
+
+
+def probe_reason(url: str) -> Optional[str]:
+    # Misma validacion que backend/app/preflight.py: ffprobe lee solo el header
+    # por HTTP (rangos), acotado por -probesize.
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-probesize",
+        str(settings.preflight_probe_bytes),
+        "-rw_timeout",
+        str(int(settings.preflight_probe_timeout_seconds * 1_000_000)),
+        "-show_entries",
+        "stream=codec_type,codec_name:format=duration",
+        "-of",
+        "json",
+        url,
+    ]
+    try:
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=settings.preflight_probe_timeout_seconds,
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired) as exc:
+        logger.warning("Preflight probe skipped: %s", exc)
+        return None
+    if result.returncode != 0:
+        return "File is not a readable audio file"
+    info = json.loads(result.stdout or "{}")
+    audio = next(
+        (stream for stream in info.get("streams", []) if stream.get("codec_type") == "audio"),
+        None,
+    )
+    if audio is None:
+        return "File has no audio stream"
+    codec = audio.get("codec_name") or ""
+    if not any(fnmatch(codec, pattern) for pattern in settings.preflight_allowed_codecs):
+        return f"Unsupported audio codec: {codec or 'unknown'}"
+    duration = info.get("format", {}).get("duration")
+    if duration in (None, "N/A"):
+        return None
+    if float(duration) < settings.preflight_min_duration_seconds:
+        return "Recording is too short"
+    if float(duration) > settings.preflight_max_duration_seconds:
+        return "Recording is too long"
+    return None
+
+
+def preflight_reason(bucket: str, key: str) -> Optional[str]:
+    # None: el objeto parece audio valido (o no se pudo verificar).
+    if not settings.preflight_enabled:
+        return None
+    s3_client = get_s3_client()
+    try:
+        size = s3_client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+        url = s3_client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": bucket, "Key": key},
+            ExpiresIn=max(int(settings.preflight_probe_timeout_seconds) * 2, 60),
+        )
+    except (BotoCoreError, ClientError) as exc:
+        logger.warning("Preflight head failed for %s: %s", key, exc)
+        return None
+    if size < settings.preflight_min_bytes:
+        return "File is empty"
+    if size > settings.upload_max_bytes:
+        return "File is too large"
+    return probe_reason(url)
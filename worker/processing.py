@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import math
 import os
@@ -7,15 +8,21 @@ import tempfile
 from datetime import datetime
 from typing import Optional
 
+from redis.exceptions import RedisError
 from sqlalchemy.orm import Session
 
+from discovery import index_story
 from events import record_event
+from feed_pages import materialize_feed_pages
 from llm import generate_metadata
 from moderation import moderate_text
 from models import AudioSubmission
+from redis_client import INGEST_QUEUED_PREFIX, get_redis_client
+from related import update_related
 from settings import settings
 from storage import get_s3_client
 from transcription import transcribe_audio
+from trending import bump_trending, publish_weight
 
 STEPS = {
     "normalize": 1,
@@ -129,6 +136,58 @@ def pitch_shift_audio(input_path: str, output_path: str, semitones: int) -> None
             shutil.copyfile(input_path, output_path)
 
 
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def publish_public_audio(s3_client, submission: AudioSubmission, path: str) -> str:
+    # Key versionada por contenido: se puede cachear como immutable en browser/CDN.
+    public_key = (
+        f"{submission.user_id}/{submission.id}/public-{_file_digest(path)[:16]}.wav"
+    )
+    s3_client.upload_file(
+        path,
+        settings.s3_public_bucket,
+        public_key,
+        ExtraArgs={
+            "ContentType": "audio/wav",
+            "CacheControl": settings.public_cache_control,
+        },
+    )
+    previous_key = submission.public_audio_key
+    if previous_key and previous_key != public_key:
+        try:
+            s3_client.delete_object(Bucket=settings.s3_public_bucket, Key=previous_key)
+        except Exception:
+            logger.warning("Could not delete previous public audio %s", previous_key)
+    return public_key
+
+
+def withdraw_public_audio(s3_client, submission: AudioSubmission) -> None:
+    # Un reproceso que termina rechazado no debe dejar la version anterior
+    # accesible en su URL estable.
+    previous_key = submission.public_audio_key
+    if not previous_key:
+        return
+    try:
+        s3_client.delete_object(Bucket=settings.s3_public_bucket, Key=previous_key)
+    except Exception:
+        logger.warning("Could not delete public audio %s", previous_key)
+    submission.public_audio_key = None
+
+
+def _release_ingest_claim(submission_id: str) -> None:
+    try:
+        get_redis_client().delete(f"{INGEST_QUEUED_PREFIX}{submission_id}")
+    except RedisError as exc:
+        # Sin soltar el reclamo, /uploaded no la encola: la publica el sweep de ingest.py.
+        logger.warning("Could not release ingest claim for %s: %s", submission_id, exc)
+
+
 def process_submission(db: Session, submission_id: str) -> None:
     submission = (
         db.query(AudioSubmission).filter(AudioSubmission.id == submission_id).first()
@@ -136,7 +195,7 @@ def process_submission(db: Session, submission_id: str) -> None:
     if not submission:
         return
 
-    if submission.status in {"REJECTED", "QUARANTINED"}:
+    if submission.status in {"REJECTED", "QUARANTINED", "INVALID"}:
         return
 
     if submission.status == "UPLOADED":
@@ -197,6 +256,8 @@ def process_submission(db: Session, submission_id: str) -> None:
                 submission.status = "REJECTED"
             elif decision == "QUARANTINE":
                 submission.status = "QUARANTINED"
+            if decision in {"REJECT", "QUARANTINE"}:
+                withdraw_public_audio(s3_client, submission)
             db.commit()
             record_event(
                 db,
@@ -220,6 +281,16 @@ def process_submission(db: Session, submission_id: str) -> None:
             submission.tags = tags
             submission.viral_analysis = viral_analysis
             submission.processing_step = STEPS["tag"]
+            # Bajo lock de fila, igual que /uploaded: o la API ya marco UPLOADED y
+            # este job sigue, o se suelta el reclamo y /uploaded la vuelve a encolar.
+            submission.status = (
+                db.query(AudioSubmission.status)
+                .filter(AudioSubmission.id == submission.id)
+                .with_for_update()
+                .scalar()
+            )
+            if submission.status == "CREATED":
+                _release_ingest_claim(submission.id)
             db.commit()
             record_event(
                 db,
@@ -233,6 +304,14 @@ def process_submission(db: Session, submission_id: str) -> None:
                 },
             )
 
+        if submission.status == "CREATED":
+            # Encolada por la notificacion de MinIO antes de /uploaded: lo que no
+            # depende de las opciones ya corrio; anonimizar espera a que lleguen.
+            db.refresh(submission)
+            if submission.status == "CREATED":
+                logger.info("Submission %s preprocessed, waiting for options", submission.id)
+                return
+
         if submission.processing_step < STEPS["anonymize"] or submission.processing_step < STEPS["publish"]:
             mode = submission.anonymization_mode or "SOFT"
             semitones = ANON_SEMITONES.get(mode, 2)
@@ -243,11 +322,14 @@ def process_submission(db: Session, submission_id: str) -> None:
                 record_event(db, "audio.anonymized", submission.id, {"mode": mode})
 
         if submission.processing_step < STEPS["publish"]:
-            public_key = f"{submission.user_id}/{submission.id}/public.wav"
-            s3_client.upload_file(anonymized_path, settings.s3_public_bucket, public_key)
+            public_key = publish_public_audio(s3_client, submission, anonymized_path)
             submission.public_audio_key = public_key
             submission.status = "APPROVED"
             submission.published_at = datetime.utcnow()
             submission.processing_step = STEPS["publish"]
             db.commit()
+            materialize_feed_pages(db, submission.tags)
+            update_related(submission)
+            bump_trending(submission.id, publish_weight(submission.viral_analysis))
+            index_story(submission)
             record_event(db, "audio.published", submission.id, {"key": public_key})
@@ -0,0 +1,57 @@
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+import redis
+from redis.exceptions import RedisError, WatchError
+
+from settings import settings
+
+
+# Cola de procesamiento (backend/app/queue.py encola con RPUSH).
+QUEUE_NAME = "audio:queue"
+# Reclamo de encolado compartido con la API (backend/app/queue.py claim_enqueue).
+INGEST_QUEUED_PREFIX = "ingest:queued:"
+INGEST_CLAIM_TTL_SECONDS = 24 * 3600
+
+_redis_client = None
+
+
+def get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.redis_url)
+    return _redis_client
+
+
+@contextmanager
+def job_lock(key: str, ttl: int) -> Iterator[bool]:
+    # Jobs periodicos: con varias replicas del worker corre uno solo por vez.
+    client = get_redis_client()
+    token = uuid.uuid4().hex
+    try:
+        acquired = bool(client.set(key, token, nx=True, ex=ttl))
+    except RedisError:
+        acquired = False
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            _release_lock(client, key, token)
+
+
+def _release_lock(client, key: str, token: str) -> None:
+    # Si el job duro mas que el TTL, el lock puede ser ya de otro worker: solo
+    # se borra si sigue teniendo nuestro token.
+    try:
+        with client.pipeline() as pipe:
+            pipe.watch(key)
+            current = pipe.get(key)
+            if current is None or current.decode("utf-8") != token:
+                pipe.unwatch()
+                return
+            pipe.multi()
+            pipe.delete(key)
+            pipe.execute()
+    except (WatchError, RedisError):
+        pass
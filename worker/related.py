@@ -0,0 +1,288 @@
+import json
+import logging
+import math
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from redis.exceptions import RedisError, WatchError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from feed_pages import normalize_tags
+from llm import _normalize_text
+from models import AudioSubmission
+from redis_client import get_redis_client, job_lock
+from settings import settings
+
+# Compartido con la API (backend/app/feed_pages.py): id -> [[id, score], ...].
+RELATED_KEY = "feed:related"
+# IDF por bucket del ultimo rebuild; lo usa la actualizacion incremental al publicar.
+RELATED_IDF_KEY = "feed:related:idf"
+# Fila TF-IDF (dispersa) de cada historia: al publicar solo se vectoriza la nueva.
+RELATED_VECTORS_KEY = "feed:related:vectors"
+# Indice invertido: un set de ids por bucket del hash; al publicar solo se puntuan
+# las historias que comparten buckets con la nueva.
+RELATED_POSTINGS_PREFIX = "feed:related:bucket:"
+RELATED_LOCK_KEY = "feed:related:lock"
+BLOCK_ROWS = 512
+REBUILD_ATTEMPTS = 3
+
+WORD_RE = re.compile(r"[a-z0-9]{3,}")
+# Peso de cada fuente de features: las etiquetas y el titulo dicen mas que el resumen.
+TAG_WEIGHT = 3.0
+TITLE_WEIGHT = 2.0
+SUMMARY_WEIGHT = 1.0
+
+logger = logging.getLogger("worker.related")
+
+StoryRow = Tuple[str, Optional[str], Optional[str], Optional[list]]
+
+
+def story_features(
+    title: Optional[str], summary: Optional[str], tags: Optional[Iterable]
+) -> Dict[str, float]:
+    features: Dict[str, float] = {}
+
+    def add(feature: str, weight: float) -> None:
+        features[feature] = features.get(feature, 0.0) + weight
+
+    for tag in normalize_tags(tags):
+        add(f"tag:{_normalize_text(tag)}", TAG_WEIGHT)
+    for text, weight in ((title, TITLE_WEIGHT), (summary, SUMMARY_WEIGHT)):
+        words = WORD_RE.findall(_normalize_text(text or ""))
+        for word in words:
+            add(word, weight)
+        for first, second in zip(words, words[1:]):
+            add(f"{first} {second}", weight / 2)
+    return features
+
+
+def hash_vector(features: Dict[str, float], dims: int) -> np.ndarray:
+    # Feature hashing con signo: sin vocabulario, el vector de una historia
+    # no depende del resto del corpus.
+    vector = np.zeros(dims, dtype=np.float32)
+    for feature, weight in features.items():
+        digest = zlib.crc32(feature.encode("utf-8"))
+        sign = 1.0 if digest & 0x80000000 else -1.0
+        vector[digest % dims] += sign * (1.0 + math.log(weight))
+    return vector
+
+
+def hashed_matrix(rows: Sequence[StoryRow]) -> np.ndarray:
+    dims = settings.related_hash_dims
+    matrix = np.zeros((len(rows), dims), dtype=np.float32)
+    for index, (_, title, summary, tags) in enumerate(rows):
+        matrix[index] = hash_vector(story_features(title, summary, tags), dims)
+    return matrix
+
+
+def compute_idf(matrix: np.ndarray) -> np.ndarray:
+    df = np.count_nonzero(matrix, axis=0).astype(np.float32)
+    return (np.log((1.0 + matrix.shape[0]) / (1.0 + df)) + 1.0).astype(np.float32)
+
+
+def tfidf(matrix: np.ndarray, idf: Optional[np.ndarray] = None) -> np.ndarray:
+    if idf is not None:
+        matrix = matrix * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_neighbors(
+    ids: Sequence[str], matrix: np.ndarray, k: int
+) -> Dict[str, List[Tuple[str, float]]]:
+    # Similitud coseno por bloques: memoria O(bloque x n), no O(n^2).
+    neighbors: Dict[str, List[Tuple[str, float]]] = {}
+    total = len(ids)
+    k = min(k, total - 1)
+    if k <= 0:
+        return {story_id: [] for story_id in ids}
+    for start in range(0, total, BLOCK_ROWS):
+        block = matrix[start : start + BLOCK_ROWS] @ matrix.T
+        for offset in range(block.shape[0]):
+            block[offset, start + offset] = -np.inf
+        candidates = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        for offset, row in enumerate(candidates):
+            scores = block[offset, row]
+            ordered = row[np.argsort(-scores, kind="stable")]
+            neighbors[ids[start + offset]] = [
+                (ids[index], round(float(block[offset, index]), 4))
+                for index in ordered
+                if block[offset, index] > 0
+            ]
+    return neighbors
+
+
+def _load_stories(db: Session) -> List[StoryRow]:
+    return db.execute(
+        select(
+            AudioSubmission.id,
+            AudioSubmission.title,
+            AudioSubmission.summary,
+            AudioSubmission.tags,
+        )
+        .where(
+            AudioSubmission.status == "APPROVED",
+            AudioSubmission.public_audio_key.isnot(None),
+        )
+        .order_by(AudioSubmission.id)
+    ).all()
+
+
+def _encode(neighbors: List[Tuple[str, float]]) -> str:
+    return json.dumps([[story_id, score] for story_id, score in neighbors])
+
+
+def encode_vector(vector: np.ndarray) -> bytes:
+    # ~100 features por historia sobre related_hash_dims: indices int32 + valores float32.
+    indices = np.flatnonzero(vector).astype("<i4")
+    return indices.tobytes() + vector[indices].astype("<f4").tobytes()
+
+
+def vector_scores(raw_vectors: Sequence[bytes], target: np.ndarray) -> np.ndarray:
+    # Producto punto de cada fila dispersa contra la historia nueva, sin armar la matriz densa.
+    sizes = [len(raw) // 8 for raw in raw_vectors]
+    indices = np.frombuffer(b"".join(raw[: 4 * n] for raw, n in zip(raw_vectors, sizes)), "<i4")
+    values = np.frombuffer(b"".join(raw[4 * n :] for raw, n in zip(raw_vectors, sizes)), "<f4")
+    rows = np.repeat(np.arange(len(raw_vectors)), sizes)
+    return np.bincount(rows, weights=values * target[indices], minlength=len(raw_vectors))
+
+
+def postings(ids: Sequence[str], matrix: np.ndarray) -> Dict[str, List[str]]:
+    rows, buckets = np.nonzero(matrix)
+    result: Dict[str, List[str]] = {}
+    for row, bucket in zip(rows, buckets):
+        result.setdefault(f"{RELATED_POSTINGS_PREFIX}{bucket}", []).append(ids[row])
+    return result
+
+
+def candidate_buckets(target: np.ndarray) -> List[int]:
+    # Los buckets de mas peso TF-IDF (features raras) discriminan mas; los comunes
+    # igual se muestrean, pero acotados por bucket.
+    indices = np.flatnonzero(target)
+    order = np.argsort(-np.abs(target[indices]), kind="stable")
+    return [int(index) for index in indices[order][: settings.related_candidate_buckets]]
+
+
+def rebuild_related(db: Session) -> int:
+    client = get_redis_client()
+    for _ in range(REBUILD_ATTEMPTS):
+        with client.pipeline(transaction=True) as pipe:
+            # Una publicacion que escribe durante el calculo invalida el resultado.
+            pipe.watch(RELATED_KEY)
+            rows = _load_stories(db)
+            if not rows:
+                pipe.unwatch()
+                return 0
+            matrix = hashed_matrix(rows)
+            idf = compute_idf(matrix)
+            ids = [row[0] for row in rows]
+            weighted = tfidf(matrix, idf)
+            neighbors = top_neighbors(ids, weighted, settings.related_top_k)
+            stale_postings = list(pipe.scan_iter(match=f"{RELATED_POSTINGS_PREFIX}*"))
+            pipe.multi()
+            pipe.delete(RELATED_KEY, RELATED_VECTORS_KEY, *stale_postings)
+            pipe.hset(
+                RELATED_KEY,
+                mapping={story_id: _encode(items) for story_id, items in neighbors.items()},
+            )
+            pipe.hset(
+                RELATED_VECTORS_KEY,
+                mapping={story_id: encode_vector(row) for story_id, row in zip(ids, weighted)},
+            )
+            for key, members in postings(ids, weighted).items():
+                pipe.sadd(key, *members)
+            pipe.set(RELATED_IDF_KEY, idf.tobytes())
+            try:
+                pipe.execute()
+                return len(rows)
+            except WatchError:
+                db.rollback()
+    logger.warning("Related stories rebuild kept racing publishes; retrying next run")
+    return 0
+
+
+def _load_idf(client) -> Optional[np.ndarray]:
+    raw = client.get(RELATED_IDF_KEY)
+    if not raw:
+        return None
+    idf = np.frombuffer(raw, dtype=np.float32)
+    return idf if idf.shape[0] == settings.related_hash_dims else None
+
+
+def update_related(submission: AudioSubmission) -> None:
+    # Al publicar: vecinos de la nueva historia + se la inserta en las listas
+    # de las historias mas parecidas. El rebuild periodico corrige el resto
+    # (y saca las historias borradas, que la API ya filtra al leer).
+    try:
+        client = get_redis_client()
+        idf = _load_idf(client)
+        target = tfidf(
+            hashed_matrix(
+                [(submission.id, submission.title, submission.summary, submission.tags)]
+            ),
+            idf,
+        )[0]
+        buckets = candidate_buckets(target)
+        pipe = client.pipeline(transaction=False)
+        for bucket in buckets:
+            pipe.srandmember(
+                f"{RELATED_POSTINGS_PREFIX}{bucket}", settings.related_candidates_per_bucket
+            )
+        candidates = {
+            member.decode("utf-8") for members in pipe.execute() for member in members
+        }
+        candidates.discard(submission.id)
+        ids = sorted(candidates)
+        raw_vectors = client.hmget(RELATED_VECTORS_KEY, ids) if ids else []
+        # Historias borradas o sin fila desde el ultimo rebuild: se ignoran.
+        vectors = {story_id: raw for story_id, raw in zip(ids, raw_vectors) if raw}
+        ids = list(vectors)
+        own: List[Tuple[str, float]] = []
+        if ids:
+            scores = vector_scores([vectors[story_id] for story_id in ids], target)
+            k = min(settings.related_top_k, len(ids))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            own = [(ids[i], round(float(scores[i]), 4)) for i in best if scores[i] > 0]
+
+        def _apply(pipe) -> None:
+            # WATCH sobre RELATED_KEY: si otro worker o el rebuild lo escriben en el
+            # medio, redis-py reintenta con las listas nuevas.
+            neighbor_ids = [story_id for story_id, _ in own]
+            existing = pipe.hmget(RELATED_KEY, neighbor_ids) if neighbor_ids else []
+            updates = {submission.id: _encode(own)}
+            for (story_id, score), raw in zip(own, existing):
+                current = [tuple(item) for item in json.loads(raw)] if raw else []
+                current = [item for item in current if item[0] != submission.id]
+                current.append((submission.id, score))
+                current.sort(key=lambda item: -item[1])
+                updates[story_id] = _encode(current[: settings.related_top_k])
+            pipe.multi()
+            pipe.hset(RELATED_KEY, mapping=updates)
+            pipe.hset(RELATED_VECTORS_KEY, submission.id, encode_vector(target))
+            for bucket in np.flatnonzero(target):
+                pipe.sadd(f"{RELATED_POSTINGS_PREFIX}{bucket}", submission.id)
+
+        client.transaction(_apply, RELATED_KEY)
+    except RedisError as exc:
+        logger.warning("Could not update related stories for %s: %s", submission.id, exc)
+
+
+def run_related_rebuild() -> None:
+    with job_lock(RELATED_LOCK_KEY, ttl=3600) as acquired:
+        if not acquired:
+            return
+        db = SessionLocal()
+        try:
+            count = rebuild_related(db)
+            logger.info("Rebuilt related stories for %s stories", count)
+        except (SQLAlchemyError, RedisError) as exc:
+            logger.warning("Related stories rebuild failed: %s", exc)
+        finally:
+            db.close()
@@ -0,0 +1,39 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict
+
+logger = logging.getLogger("worker.scheduler")
+
+Job = Callable[[], None]
+# Cada cuanto revisa el hilo de fondo si hay jobs vencidos.
+TICK_SECONDS = 1.0
+
+
+def run_due(jobs: Dict[Job, int], next_run: Dict[Job, float]) -> None:
+    for job, interval in jobs.items():
+        if time.monotonic() >= next_run.get(job, 0.0):
+            next_run[job] = time.monotonic() + interval
+            job()
+
+
+def _run_forever(jobs: Dict[Job, int], stop: threading.Event) -> None:
+    next_run: Dict[Job, float] = {}
+    while not stop.is_set():
+        for job in jobs:
+            try:
+                run_due({job: jobs[job]}, next_run)
+            except Exception as exc:
+                # Un job que falla no frena al resto: se reintenta en su proximo turno.
+                logger.exception("Background job %s failed: %s", job.__name__, exc)
+        stop.wait(TICK_SECONDS)
+
+
+def start_background(jobs: Dict[Job, int], stop: threading.Event) -> threading.Thread:
+    # Jobs pesados (export, archivado) fuera del loop de BLPOP: la cola no espera
+    # a que terminen. Cada job abre su propia sesion/conexion a la DB.
+    thread = threading.Thread(
+        target=_run_forever, args=(jobs, stop), name="worker-scheduler", daemon=True
+    )
+    thread.start()
+    return thread
@@ -24,6 +24,90 @@ class Settings:
     openai_moderation_model: str = os.getenv(
         "OPENAI_MODERATION_MODEL", "omni-moderation-latest"
     )
+    public_cache_control: str = os.getenv(
+        "MEDIA_IMMUTABLE_CACHE_CONTROL", "public, max-age=31536000, immutable"
+    )
+    event_log_maxlen: int = int(os.getenv("EVENT_LOG_MAXLEN", "1000"))
+    event_log_ttl_seconds: int = int(os.getenv("EVENT_LOG_TTL_SECONDS", "21600"))
+    # Retencion de eventos en Postgres (igual que la API) y archivado al bucket de artifacts.
+    event_retention_days: int = int(os.getenv("EVENT_RETENTION_DAYS", "90"))
+    event_partition_months_ahead: int = int(os.getenv("EVENT_PARTITION_MONTHS_AHEAD", "2"))
+    event_maintenance_interval_seconds: int = int(
+        os.getenv("EVENT_MAINTENANCE_INTERVAL_SECONDS", "3600")
+    )
+    # Export incremental para analytics (NDJSON gzip en el bucket de artifacts).
+    analytics_export_enabled: bool = (
+        os.getenv("ANALYTICS_EXPORT_ENABLED", "true").lower() == "true"
+    )
+    analytics_export_interval_seconds: int = int(
+        os.getenv("ANALYTICS_EXPORT_INTERVAL_SECONDS", "3600")
+    )
+    analytics_export_lag_seconds: int = int(os.getenv("ANALYTICS_EXPORT_LAG_SECONDS", "300"))
+    analytics_export_batch_rows: int = int(
+        os.getenv("ANALYTICS_EXPORT_BATCH_ROWS", "200000")
+    )
+    # Vacio: se lee de DATABASE_URL; idealmente una replica.
+    analytics_database_url: str = os.getenv("ANALYTICS_DATABASE_URL", "")
+    # Historias relacionadas (/feed/{id}/next): top-K vecinos por similitud de texto.
+    related_top_k: int = int(os.getenv("RELATED_TOP_K", "20"))
+    related_hash_dims: int = int(os.getenv("RELATED_HASH_DIMS", "2048"))
+    # Candidatos al publicar: buckets mas pesados de la historia nueva x historias por bucket.
+    related_candidate_buckets: int = int(os.getenv("RELATED_CANDIDATE_BUCKETS", "32"))
+    related_candidates_per_bucket: int = int(
+        os.getenv("RELATED_CANDIDATES_PER_BUCKET", "500")
+    )
+    related_rebuild_interval_seconds: int = int(
+        os.getenv("RELATED_REBUILD_INTERVAL_SECONDS", "21600")
+    )
+    # Rearmado de las paginas del feed que la API borra al quitar historias.
+    feed_page_refresh_interval_seconds: int = int(
+        os.getenv("FEED_PAGE_REFRESH_INTERVAL_SECONDS", "30")
+    )
+    # Trending (feed:trending): mismos parametros de decaimiento que la API.
+    trending_half_life_hours: float = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+    trending_vote_weight: float = float(os.getenv("TRENDING_VOTE_WEIGHT", "1.0"))
+    trending_publish_weight: float = float(os.getenv("TRENDING_PUBLISH_WEIGHT", "1.0"))
+    trending_viral_weight: float = float(os.getenv("TRENDING_VIRAL_WEIGHT", "2.0"))
+    trending_min_score: float = float(os.getenv("TRENDING_MIN_SCORE", "0.01"))
+    trending_renormalize_interval_seconds: int = int(
+        os.getenv("TRENDING_RENORMALIZE_INTERVAL_SECONDS", "3600")
+    )
+    # Notificaciones de MinIO (target Redis, formato access); vacio las desactiva.
+    minio_events_key: str = os.getenv("MINIO_EVENTS_KEY", "minio:events")
+    ingest_dedupe_ttl_seconds: int = int(os.getenv("INGEST_DEDUPE_TTL_SECONDS", "86400"))
+    # Margen para que llegue /uploaded antes de publicar con opciones por defecto.
+    # Opt-in: con 0 una subida en CREATED espera la accion del dueno indefinidamente.
+    ingest_options_grace_seconds: int = int(
+        os.getenv("INGEST_OPTIONS_GRACE_SECONDS", "0")
+    )
+    # Reencolado de subidas UPLOADED que quedaron sin avanzar tras el preproceso.
+    ingest_requeue_after_seconds: int = int(
+        os.getenv("INGEST_REQUEUE_AFTER_SECONDS", "3600")
+    )
+    ingest_sweep_interval_seconds: int = int(
+        os.getenv("INGEST_SWEEP_INTERVAL_SECONDS", "300")
+    )
+    # Preflight de los objetos notificados (mismos limites que la API).
+    preflight_enabled: bool = os.getenv("PREFLIGHT_ENABLED", "true").lower() == "true"
+    preflight_min_bytes: int = int(os.getenv("PREFLIGHT_MIN_BYTES", "1024"))
+    upload_max_bytes: int = int(os.getenv("UPLOAD_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+    preflight_min_duration_seconds: float = float(
+        os.getenv("PREFLIGHT_MIN_DURATION_SECONDS", "1")
+    )
+    preflight_max_duration_seconds: float = float(
+        os.getenv("PREFLIGHT_MAX_DURATION_SECONDS", "7200")
+    )
+    preflight_allowed_codecs: tuple[str, ...] = tuple(
+        os.getenv(
+            "PREFLIGHT_ALLOWED_CODECS", "aac,mp3,opus,vorbis,flac,alac,pcm_*,amr_nb,amr_wb"
+        ).split(",")
+    )
+    preflight_probe_bytes: int = int(os.getenv("PREFLIGHT_PROBE_BYTES", str(2 * 1024 * 1024)))
+    preflight_probe_timeout_seconds: float = float(
+        os.getenv("PREFLIGHT_PROBE_TIMEOUT_SECONDS", "10")
+    )
+    # Cuanto espera el worker a que la API aplique las migraciones al arrancar.
+    schema_wait_seconds: int = int(os.getenv("SCHEMA_WAIT_SECONDS", "120"))
     dev_logs: bool = os.getenv("WORKER_DEV_LOGS", "false").lower() == "true"
 
 
@@ -0,0 +1,57 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+from worker.analytics_export import export_dataset
+from worker.models import AudioSubmission, Event
+
+
+class RecordingS3:
+    def __init__(self):
+        self.objects = {}
+
+    def upload_file(self, path, bucket, key, ExtraArgs=None):
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            self.objects[key] = [json.loads(line) for line in handle]
+
+
+def test_export_is_incremental(db_session):
+    now = datetime(2026, 10, 19, 12, 0, 0)
+    db_session.add_all(
+        [
+            Event(id="e1", event_name="audio.uploaded", submission_id="s1", timestamp=now - timedelta(days=1)),
+            Event(id="e2", event_name="audio.published", submission_id="s1", timestamp=now - timedelta(hours=1)),
+            AudioSubmission(
+                id="s1",
+                user_id="u1",
+                status="APPROVED",
+                processing_step=6,
+                anonymization_mode="SOFT",
+                tags=["barrio"],
+                created_at=now - timedelta(days=1),
+                updated_at=now - timedelta(hours=1),
+            ),
+        ]
+    )
+    db_session.commit()
+    conn = db_session.connection()
+    s3 = RecordingS3()
+
+    mark, count = export_dataset(conn, s3, "events", {}, now, "run1")
+    assert count == 2
+    assert mark == {"ts": (now - timedelta(hours=1)).isoformat(), "id": "e2"}
+    assert sorted(s3.objects) == [
+        "analytics/events/dt=2026-10-18/part-run1.ndjson.gz",
+        "analytics/events/dt=2026-10-19/part-run1.ndjson.gz",
+    ]
+
+    _, count = export_dataset(conn, s3, "submissions", {}, now, "run1")
+    assert count == 1
+    snapshot = s3.objects["analytics/submissions/dt=2026-10-19/part-run1.ndjson.gz"][0]
+    assert snapshot["tags"] == ["barrio"]
+    assert "transcript_preview" not in snapshot
+
+    # Segunda corrida con el watermark: no hay filas nuevas.
+    again, count = export_dataset(conn, s3, "events", mark, now, "run2")
+    assert count == 0
+    assert again == mark
@@ -0,0 +1,13 @@
+from datetime import date, datetime
+
+from worker.event_archive import cold_partitions, partition_name, partition_upper_bound
+
+
+def test_partition_bounds_and_cold_selection():
+    assert partition_name(date(2026, 12, 1)) == "events_2026_12"
+    assert partition_upper_bound("events_2026_12") == date(2027, 1, 1)
+    assert partition_upper_bound("events_default") is None
+
+    names = ["events_default", "events_2026_05", "events_2026_06", "events_2026_07", "events_2026_10"]
+    # Retencion por defecto (90 dias) desde el 2026-10-19: corte en 2026-07-21.
+    assert cold_partitions(names, datetime(2026, 10, 19)) == ["events_2026_05", "events_2026_06"]
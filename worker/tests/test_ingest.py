@@ -0,0 +1,141 @@
+import json
+import shutil
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import fakeredis
+
+from worker import events, ingest
+from worker.models import AudioSubmission
+from worker.processing import process_submission
+
+
+class DummyS3:
+    def download_file(self, bucket, key, dest):
+        with open(dest, "wb") as handle:
+            handle.write(b"audio")
+
+
+def _notification(key, etag="abc", event="s3:ObjectCreated:Put", bucket="audio-private"):
+    record = {
+        "eventName": event,
+        "s3": {"bucket": {"name": bucket}, "object": {"key": key, "eTag": etag}},
+    }
+    return json.dumps([{"Event": [record], "EventTime": "2026-10-19T12:00:00Z"}]).encode()
+
+
+def _submission(status="CREATED"):
+    return AudioSubmission(
+        id="sub-1",
+        user_id="user-1",
+        status=status,
+        processing_step=0,
+        original_audio_key="user-1/sub-1/original.m4a",
+        anonymization_mode="SOFT",
+        created_at=datetime.utcnow(),
+    )
+
+
+def test_notifications_enqueue_created_submissions_once(db_session, monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(ingest, "get_redis_client", lambda: client)
+    monkeypatch.setattr(events, "get_redis_client", lambda: client)
+    monkeypatch.setattr(ingest, "preflight_reason", lambda bucket, key: None)
+    db_session.add(_submission())
+    db_session.commit()
+
+    objects = ingest.created_objects(_notification("user-1%2Fsub-1%2Foriginal.m4a"))
+    assert objects == [("audio-private", "user-1/sub-1/original.m4a", "abc")]
+    assert ingest.created_objects(_notification("x", event="s3:ObjectRemoved:Delete")) == []
+
+    assert ingest.ingest_object(db_session, *objects[0])
+    # Reentrega de MinIO: no se vuelve a encolar.
+    assert not ingest.ingest_object(db_session, *objects[0])
+    assert not ingest.ingest_object(db_session, "audio-public", objects[0][1], "abc")
+    assert not ingest.ingest_object(db_session, "audio-private", "user-2/sub-1/original.m4a", "d")
+    assert not ingest.ingest_object(db_session, "audio-private", "user-1/sub-1/cover.jpg", "e")
+    assert client.lrange("audio:queue", 0, -1) == [b"sub-1"]
+
+    # /uploaded reclamo el encolado antes que la notificacion: no se duplica el job.
+    client.delete("audio:queue", "ingest:queued:sub-1")
+    client.set("ingest:queued:sub-1", "api")
+    assert not ingest.ingest_object(db_session, *objects[0][:2], "new-etag")
+    assert client.lrange("audio:queue", 0, -1) == []
+
+
+def test_preprocessing_waits_for_owner_options(db_session, monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(ingest, "get_redis_client", lambda: client)
+    monkeypatch.setattr(events, "get_redis_client", lambda: client)
+    monkeypatch.setattr("worker.processing.get_s3_client", lambda: DummyS3())
+    monkeypatch.setattr("worker.processing.get_redis_client", lambda: client)
+    monkeypatch.setattr("worker.processing.normalize_audio", shutil.copyfile)
+    monkeypatch.setattr(
+        "worker.processing.encode_transcription_audio",
+        lambda input_path, output_path: input_path,
+    )
+    monkeypatch.setattr("worker.processing.transcribe_audio", lambda path: "hola mundo")
+    monkeypatch.setattr(
+        "worker.processing.moderate_text", lambda transcript: ("APPROVE", {"flagged": False})
+    )
+    monkeypatch.setattr(
+        "worker.processing.generate_metadata",
+        lambda transcript: ("Titulo", "resumen", ["noche"], 50, True),
+    )
+
+    def fail_pitch(*args):
+        raise AssertionError("anonymized before options arrived")
+
+    monkeypatch.setattr("worker.processing.pitch_shift_audio", fail_pitch)
+    db_session.add(_submission())
+    db_session.commit()
+    client.set("ingest:queued:sub-1", "ingest")
+
+    process_submission(db_session, "sub-1")
+    submission = db_session.get(AudioSubmission, "sub-1")
+    assert submission.status == "CREATED"
+    assert submission.processing_step == 4
+    # Se detuvo esperando opciones: suelta el reclamo para que /uploaded la encole.
+    assert not client.exists("ingest:queued:sub-1")
+    assert not ingest.ingest_object(db_session, "audio-private", submission.original_audio_key, "z")
+
+    # Por defecto nunca se publica sin la accion del dueno.
+    much_later = datetime.utcnow() + timedelta(days=30)
+    assert ingest.finalize_stalled_uploads(db_session, now=much_later) == 0
+    assert db_session.get(AudioSubmission, "sub-1").status == "CREATED"
+
+    # Opt-in: sin /uploaded dentro del margen se encola con las opciones por defecto.
+    monkeypatch.setattr(
+        ingest, "settings", replace(ingest.settings, ingest_options_grace_seconds=3600)
+    )
+    assert ingest.finalize_stalled_uploads(db_session) == 0
+    later = datetime.utcnow() + timedelta(seconds=3601)
+    assert ingest.finalize_stalled_uploads(db_session, now=later) == 1
+    assert db_session.get(AudioSubmission, "sub-1").status == "UPLOADED"
+    assert client.lrange("audio:queue", 0, -1) == [b"sub-1"]
+
+    # Ya UPLOADED y sin avanzar (el reclamo no se solto o el worker se cayo): se reencola.
+    much_later = later + timedelta(seconds=ingest.settings.ingest_requeue_after_seconds + 1)
+    assert ingest.finalize_stalled_uploads(db_session, now=later) == 0
+    assert ingest.finalize_stalled_uploads(db_session, now=much_later) == 1
+    assert client.lrange("audio:queue", 0, -1) == [b"sub-1", b"sub-1"]
+
+
+def test_notifications_skip_invalid_uploads(db_session, monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(ingest, "get_redis_client", lambda: client)
+    monkeypatch.setattr(events, "get_redis_client", lambda: client)
+    monkeypatch.setattr(
+        ingest, "preflight_reason", lambda bucket, key: "File has no audio stream"
+    )
+    db_session.add(_submission())
+    db_session.commit()
+
+    assert not ingest.ingest_object(db_session, "audio-private", "user-1/sub-1/original.m4a", "a")
+    assert db_session.get(AudioSubmission, "sub-1").status == "INVALID"
+    assert client.lrange("audio:queue", 0, -1) == []
+
+    # Un job viejo en la cola tampoco la procesa.
+    monkeypatch.setattr("worker.processing.get_s3_client", lambda: DummyS3())
+    process_submission(db_session, "sub-1")
+    assert db_session.get(AudioSubmission, "sub-1").status == "INVALID"
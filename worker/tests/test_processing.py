@@ -10,7 +10,7 @@ class DummyS3:
         with open(dest, "wb") as handle:
             handle.write(b"audio")
 
-    def upload_file(self, path, bucket, key):
+    def upload_file(self, path, bucket, key, ExtraArgs=None):
         return None
 
 
@@ -116,3 +116,45 @@ def test_process_submission_rejected(db_session, monkeypatch):
     assert refreshed.status == "REJECTED"
     assert refreshed.title is None
     assert refreshed.summary is None
+
+
+def test_reprocess_rejected_withdraws_public_audio(db_session, monkeypatch):
+    deleted = []
+
+    class TrackingS3(DummyS3):
+        def delete_object(self, Bucket, Key):
+            deleted.append(Key)
+
+    monkeypatch.setattr("worker.processing.get_s3_client", lambda: TrackingS3())
+    monkeypatch.setattr("worker.processing.normalize_audio", _copy_stub)
+    monkeypatch.setattr(
+        "worker.processing.encode_transcription_audio",
+        lambda input_path, output_path: input_path,
+    )
+    monkeypatch.setattr("worker.processing.transcribe_audio", lambda path: "bad stuff")
+    monkeypatch.setattr(
+        "worker.processing.moderate_text",
+        lambda transcript: ("REJECT", {"flagged": True}),
+    )
+
+    # Reproceso de una historia ya publicada: la API conserva public_audio_key.
+    db_session.add(
+        AudioSubmission(
+            id="sub-3",
+            user_id="user-1",
+            status="UPLOADED",
+            processing_step=0,
+            original_audio_key="user-1/sub-3/original.wav",
+            public_audio_key="user-1/sub-3/public-abc.wav",
+            anonymization_mode="SOFT",
+            created_at=datetime.utcnow(),
+        )
+    )
+    db_session.commit()
+
+    process_submission(db_session, "sub-3")
+
+    refreshed = db_session.query(AudioSubmission).filter_by(id="sub-3").first()
+    assert refreshed.status == "REJECTED"
+    assert refreshed.public_audio_key is None
+    assert deleted == ["user-1/sub-3/public-abc.wav"]
@@ -0,0 +1,37 @@
+import os
+import re
+
+import fakeredis
+import pytest
+
+from worker import db, redis_client
+
+BACKEND_MIGRATIONS = os.path.join(
+    os.path.dirname(__file__), "..", "..", "backend", "app", "migrations.py"
+)
+
+
+def test_job_lock_only_releases_its_own_token(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(redis_client, "get_redis_client", lambda: client)
+
+    with redis_client.job_lock("job:lock", ttl=60) as acquired:
+        assert acquired
+        with redis_client.job_lock("job:lock", ttl=60) as again:
+            assert not again
+        # El TTL vencio y otro worker tomo el lock mientras este seguia corriendo.
+        client.set("job:lock", "other-worker")
+    assert client.get("job:lock") == b"other-worker"
+
+    client.delete("job:lock")
+    with redis_client.job_lock("job:lock", ttl=60) as acquired:
+        assert acquired
+    assert client.get("job:lock") is None
+
+
+def test_required_schema_version_matches_backend_migrations():
+    if not os.path.exists(BACKEND_MIGRATIONS):
+        pytest.skip("backend no disponible (imagen del worker)")
+    with open(BACKEND_MIGRATIONS, encoding="utf-8") as handle:
+        versions = [int(value) for value in re.findall(r"Migration\(\s*(\d+),", handle.read())]
+    assert db.REQUIRED_SCHEMA_VERSION == max(versions)
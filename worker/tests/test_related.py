@@ -0,0 +1,95 @@
+import json
+from datetime import datetime
+
+import fakeredis
+import numpy as np
+
+from worker import related
+from worker.models import AudioSubmission
+
+
+STORIES = [
+    ("s1", "Me perdi en el subte", "Una noche en el subte de Buenos Aires", ["transporte"]),
+    ("s2", "El subte a las 3 de la mañana", "Otra noche rara en el subte", ["transporte"]),
+    ("s3", "Receta de la abuela", "Cocinando empanadas con mi abuela", ["cocina"]),
+    ("s4", "Empanadas quemadas", "Intente la receta de empanadas y sali mal", ["cocina"]),
+]
+
+
+def test_neighbors_follow_shared_tags_and_words():
+    rows = [(story_id, title, summary, tags) for story_id, title, summary, tags in STORIES]
+    raw = related.hashed_matrix(rows)
+    matrix = related.tfidf(raw, related.compute_idf(raw))
+    neighbors = related.top_neighbors([row[0] for row in rows], matrix, k=2)
+
+    assert neighbors["s1"][0][0] == "s2"
+    assert neighbors["s3"][0][0] == "s4"
+    assert all(story_id != "s1" for story_id, _ in neighbors["s1"])
+
+
+def test_sparse_vector_scores_match_dense_product():
+    rows = [(story_id, title, summary, tags) for story_id, title, summary, tags in STORIES]
+    raw = related.hashed_matrix(rows)
+    matrix = related.tfidf(raw, related.compute_idf(raw))
+    encoded = [related.encode_vector(row) for row in matrix]
+    scores = related.vector_scores(encoded, matrix[0])
+    assert np.allclose(scores, matrix @ matrix[0], atol=1e-5)
+
+
+def test_publish_inserts_story_into_neighbor_lists(db_session, monkeypatch):
+    now = datetime.utcnow()
+    for story_id, title, summary, tags in STORIES:
+        db_session.add(
+            AudioSubmission(
+                id=story_id,
+                user_id="u1",
+                status="APPROVED",
+                processing_step=6,
+                public_audio_key=f"public-{story_id}.wav",
+                title=title,
+                summary=summary,
+                tags=tags,
+                anonymization_mode="SOFT",
+                created_at=now,
+                published_at=now,
+            )
+        )
+    db_session.commit()
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(related, "get_redis_client", lambda: client)
+    assert related.rebuild_related(db_session) == len(STORIES)
+
+    def load_query(*args, **kwargs):
+        raise AssertionError("publish must not reload the corpus")
+
+    monkeypatch.setattr(related, "_load_stories", load_query)
+    monkeypatch.setattr(client, "hgetall", load_query)
+    scored = []
+    vector_scores = related.vector_scores
+
+    def spy_scores(raw_vectors, target):
+        scored.append(len(raw_vectors))
+        return vector_scores(raw_vectors, target)
+
+    monkeypatch.setattr(related, "vector_scores", spy_scores)
+    new = AudioSubmission(
+        id="s5",
+        title="Empanadas de la abuela",
+        summary="La receta secreta de empanadas",
+        tags=["Cocina"],
+    )
+    related.update_related(new)
+    buckets = related.candidate_buckets(
+        related.tfidf(
+            related.hashed_matrix([("s5", new.title, new.summary, new.tags)]),
+            related._load_idf(client),
+        )[0]
+    )
+
+    own = [story_id for story_id, _ in json.loads(client.hget(related.RELATED_KEY, "s5"))]
+    assert own[:2] in (["s3", "s4"], ["s4", "s3"])
+    assert "s5" in [story_id for story_id, _ in json.loads(client.hget(related.RELATED_KEY, "s4"))]
+    assert client.hexists(related.RELATED_VECTORS_KEY, "s5")
+    assert client.sismember(f"{related.RELATED_POSTINGS_PREFIX}{buckets[0]}", "s5")
+    # Solo se puntuan las historias que comparten buckets con la nueva.
+    assert scored == [2]
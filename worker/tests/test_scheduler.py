@@ -0,0 +1,40 @@
+import threading
+
+from worker import scheduler
+
+
+def test_background_jobs_survive_failures(monkeypatch):
+    monkeypatch.setattr(scheduler, "TICK_SECONDS", 0.01)
+    stop = threading.Event()
+    calls = []
+
+    def broken():
+        calls.append("broken")
+        raise RuntimeError("export down")
+
+    def archive():
+        calls.append("archive")
+        stop.set()
+
+    thread = scheduler.start_background({broken: 0, archive: 3600}, stop)
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert calls == ["broken", "archive"]
+
+
+def test_run_due_respects_intervals(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(scheduler.time, "monotonic", lambda: clock[0])
+    calls = []
+
+    def job():
+        calls.append(clock[0])
+
+    next_run = {}
+    scheduler.run_due({job: 30}, next_run)
+    clock[0] = 110.0
+    scheduler.run_due({job: 30}, next_run)
+    clock[0] = 131.0
+    scheduler.run_due({job: 30}, next_run)
+    assert calls == [100.0, 131.0]
@@ -0,0 +1,34 @@
+import fakeredis
+
+from worker import trending
+
+
+def test_forward_decay_ranks_and_renormalizes(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(trending, "get_redis_client", lambda: client)
+    day = 24 * 3600
+    start = 1_800_000_000.0
+
+    # Sin epoch no se suma nada: queda para el rebuild desde la DB.
+    trending.bump_trending("old", 4.0, at=start)
+    assert not client.exists(trending.TRENDING_KEY, trending.TRENDING_EPOCH_KEY)
+
+    client.set(trending.TRENDING_EPOCH_KEY, start)
+    trending.bump_trending("old", 4.0, at=start)
+    # Un dia despues (vida media 24h) "old" vale 2: "new" con 3 pasa adelante.
+    trending.bump_trending("new", 3.0, at=start + day)
+    trending.bump_trending("tiny", 0.01, at=start)
+    order = [item.decode() for item in client.zrevrange(trending.TRENDING_KEY, 0, -1)]
+    assert order == ["new", "old", "tiny"]
+
+    # Cinco dias sin actividad: renormalizar deja scores acotados y saca lo despreciable.
+    removed = trending.renormalize_trending(now=start + 5 * day)
+    assert removed == 1
+    scores = dict(client.zrange(trending.TRENDING_KEY, 0, -1, withscores=True))
+    assert abs(scores[b"old"] - 4.0 / 2**5) < 1e-9
+    assert abs(scores[b"new"] - 3.0 / 2**4) < 1e-9
+    assert float(client.get(trending.TRENDING_EPOCH_KEY)) == start + 5 * day
+
+    # Los aportes nuevos se suman en la escala del nuevo epoch.
+    trending.bump_trending("old", 1.0, at=start + 5 * day)
+    assert client.zscore(trending.TRENDING_KEY, "old") > 1.0
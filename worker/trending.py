@@ -0,0 +1,154 @@
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import column, select, table
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from models import AudioSubmission
+from redis_client import get_redis_client, job_lock
+from settings import settings
+
+# Formato compartido con la API (backend/app/trending.py): zset con forward decay,
+# score = suma de weight * e^(rate * (t - epoch)).
+TRENDING_KEY = "feed:trending"
+TRENDING_EPOCH_KEY = "feed:trending:epoch"
+TRENDING_LOCK_KEY = "feed:trending:lock"
+
+logger = logging.getLogger("worker.trending")
+
+_votes = table("votes", column("audio_id"), column("created_at"))
+
+
+def decay_rate() -> float:
+    return math.log(2) / (settings.trending_half_life_hours * 3600)
+
+
+def publish_weight(viral_analysis: Optional[int]) -> float:
+    return settings.trending_publish_weight + settings.trending_viral_weight * (
+        (viral_analysis or 0) / 100
+    )
+
+
+def _timestamp(value: datetime) -> float:
+    # Las fechas de la DB son UTC naive.
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+def bump_trending(item_id: str, weight: float, at: Optional[float] = None) -> None:
+    at = at or time.time()
+
+    def _bump(pipe) -> None:
+        epoch = pipe.get(TRENDING_EPOCH_KEY)
+        pipe.multi()
+        if epoch is None:
+            # Sin epoch el zset se reconstruye entero (run_trending_maintenance),
+            # incluida esta historia.
+            return
+        score = weight * math.exp(decay_rate() * (at - float(epoch)))
+        pipe.zincrby(TRENDING_KEY, score, item_id)
+
+    try:
+        get_redis_client().transaction(_bump, TRENDING_EPOCH_KEY)
+    except RedisError as exc:
+        logger.warning("Could not update trending for %s: %s", item_id, exc)
+
+
+def renormalize_trending(now: Optional[float] = None) -> int:
+    # Lleva el epoch a "ahora": los scores pasan a ser el valor decaido actual y
+    # quedan acotados. Lo que cae bajo el minimo sale del zset.
+    now = now or time.time()
+    client = get_redis_client()
+    removed = 0
+
+    def _renormalize(pipe) -> None:
+        nonlocal removed
+        epoch = pipe.get(TRENDING_EPOCH_KEY)
+        if epoch is None:
+            return
+        factor = math.exp(-decay_rate() * (now - float(epoch)))
+        members = pipe.zrange(TRENDING_KEY, 0, -1, withscores=True)
+        keep = {}
+        drop = []
+        for member, score in members:
+            value = score * factor
+            if value < settings.trending_min_score:
+                drop.append(member)
+            else:
+                keep[member] = value
+        pipe.multi()
+        pipe.set(TRENDING_EPOCH_KEY, now)
+        if drop:
+            pipe.zrem(TRENDING_KEY, *drop)
+        if keep:
+            pipe.zadd(TRENDING_KEY, keep)
+        removed = len(drop)
+
+    # WATCH sobre zset y epoch: si entra un voto en el medio, se reintenta.
+    client.transaction(_renormalize, TRENDING_KEY, TRENDING_EPOCH_KEY)
+    return removed
+
+
+def rebuild_trending(db: Session, now: Optional[float] = None) -> int:
+    # Primer arranque (o Redis vaciado): publicacion + votos desde la DB.
+    # Las escuchas solo viven en Redis y no se recuperan.
+    now = now or time.time()
+    rate = decay_rate()
+    scores: Dict[str, float] = {}
+    published = (
+        AudioSubmission.status == "APPROVED",
+        AudioSubmission.public_audio_key.isnot(None),
+    )
+    stories = db.execute(
+        select(
+            AudioSubmission.id, AudioSubmission.published_at, AudioSubmission.viral_analysis
+        ).where(*published)
+    )
+    for story_id, published_at, viral_analysis in stories:
+        at = _timestamp(published_at) if published_at else now
+        scores[story_id] = publish_weight(viral_analysis) * math.exp(rate * (at - now))
+    votes = db.execute(
+        select(_votes.c.audio_id, _votes.c.created_at)
+        .join(AudioSubmission, AudioSubmission.id == _votes.c.audio_id)
+        .where(*published)
+    )
+    for audio_id, created_at in votes:
+        # Publicada entre las dos consultas: no estaba en la primera.
+        scores[audio_id] = scores.get(audio_id, 0.0) + settings.trending_vote_weight * math.exp(
+            rate * (_timestamp(created_at) - now)
+        )
+    scores = {
+        key: value for key, value in scores.items() if value >= settings.trending_min_score
+    }
+    pipe = get_redis_client().pipeline(transaction=True)
+    pipe.delete(TRENDING_KEY)
+    if scores:
+        pipe.zadd(TRENDING_KEY, scores)
+    pipe.set(TRENDING_EPOCH_KEY, now)
+    pipe.execute()
+    return len(scores)
+
+
+def run_trending_maintenance() -> None:
+    with job_lock(TRENDING_LOCK_KEY, ttl=600) as acquired:
+        if not acquired:
+            return
+        try:
+            if not get_redis_client().exists(TRENDING_EPOCH_KEY):
+                db = SessionLocal()
+                try:
+                    count = rebuild_trending(db)
+                finally:
+                    db.close()
+                logger.info("Rebuilt trending scores for %s stories", count)
+                return
+            removed = renormalize_trending()
+            if removed:
+                logger.info("Trending renormalized, dropped %s stale stories", removed)
+        except (SQLAlchemyError, RedisError) as exc:
+            logger.warning("Trending maintenance failed: %s", exc)
@@ -1,29 +1,63 @@
 import logging
+import threading
 import time
 
-import redis
-
-from db import Base, SessionLocal, engine, ensure_schema
+from analytics_export import run_analytics_export
+from db import SessionLocal, wait_for_schema
+from discovery import rebuild_discovery_index
+from event_archive import run_event_maintenance
+from feed_pages import rebuild_all_feed_pages, run_feed_page_refresh
+from ingest import handle_notification, run_stalled_upload_sweep
 from processing import process_submission
+from redis_client import QUEUE_NAME, get_redis_client
+from related import run_related_rebuild
+from scheduler import run_due, start_background
+from trending import run_trending_maintenance
 from settings import settings
 
-QUEUE_NAME = "audio:queue"
-
 logging.basicConfig(level=logging.INFO, format="[worker] %(message)s")
 
 
 def main() -> None:
-    client = redis.Redis.from_url(settings.redis_url)
-    Base.metadata.create_all(bind=engine)
-    ensure_schema()
+    client = get_redis_client()
+    wait_for_schema()
+    db = SessionLocal()
+    try:
+        rebuild_all_feed_pages(db)
+        rebuild_discovery_index(db)
+    finally:
+        db.close()
     logging.info("Worker started")
+    # Jobs pesados en un hilo aparte, con su propia sesion de DB. El rebuild de
+    # relacionadas compite con update_related via WATCH sobre feed:related.
+    start_background(
+        {
+            run_event_maintenance: settings.event_maintenance_interval_seconds,
+            run_analytics_export: settings.analytics_export_interval_seconds,
+            run_related_rebuild: settings.related_rebuild_interval_seconds,
+        },
+        threading.Event(),
+    )
+    # Jobs periodicos baratos, corren entre items de la cola.
+    periodic = {
+        run_feed_page_refresh: settings.feed_page_refresh_interval_seconds,
+        run_trending_maintenance: settings.trending_renormalize_interval_seconds,
+        run_stalled_upload_sweep: settings.ingest_sweep_interval_seconds,
+    }
+    next_run = dict.fromkeys(periodic, 0.0)
+    # Notificaciones de MinIO en la misma espera; BLPOP atiende primero la cola.
+    keys = [QUEUE_NAME] + ([settings.minio_events_key] if settings.minio_events_key else [])
 
     while True:
         try:
-            result = client.blpop(QUEUE_NAME, timeout=5)
+            run_due(periodic, next_run)
+            result = client.blpop(keys, timeout=5)
             if result is None:
                 continue
-            _, raw_id = result
+            key, raw_id = result
+            if key.decode("utf-8") != QUEUE_NAME:
+                handle_notification(raw_id)
+                continue
             submission_id = raw_id.decode("utf-8")
             logging.info("Processing %s", submission_id)
 